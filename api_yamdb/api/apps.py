@@ -3,3 +3,9 @@ from django.apps import AppConfig
 
 class ApiConfig(AppConfig):
     name = 'api'
+
+    def ready(self):
+        from api_yamdb.db import health
+
+        from . import checks, signals  # noqa: F401
+        health.connect()
@@ -0,0 +1,50 @@
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import caches
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.settings import api_settings
+
+USER_KEY = 'jwt-user:{}'
+SNAPSHOT_FIELDS = ('id', 'username', 'role', 'is_superuser', 'is_active')
+
+
+def get_cache():
+    """Кэш снимков пользователей (settings.JWT_USER_CACHE)."""
+    return caches[settings.JWT_USER_CACHE['ALIAS']]
+
+
+def forget_user(user_id):
+    """Удаление снимка пользователя, например после смены роли."""
+    get_cache().delete(USER_KEY.format(user_id))
+
+
+class CachedJWTAuthentication(JWTAuthentication):
+    """JWT-аутентификация без запроса к таблице пользователей.
+
+    Разрешениям нужны только id, username, role и is_superuser, поэтому
+    в кэше на JWT_USER_CACHE['TIMEOUT'] секунд хранится снимок этих
+    полей. request.user собирается из снимка как объект с отложенными
+    остальными полями: они дочитываются из базы только при обращении.
+    Сигналы api.signals удаляют снимок при изменении пользователя.
+    """
+
+    def get_user(self, validated_token):
+        user_id = validated_token.get(api_settings.USER_ID_CLAIM)
+        if user_id is None:
+            return super().get_user(validated_token)
+        cache = get_cache()
+        key = USER_KEY.format(user_id)
+        snapshot = cache.get(key)
+        if snapshot is None:
+            user = super().get_user(validated_token)
+            snapshot = tuple(getattr(user, field)
+                             for field in SNAPSHOT_FIELDS)
+            cache.set(key, snapshot, settings.JWT_USER_CACHE['TIMEOUT'])
+            return user
+        # from_db раскладывает значения в порядке полей модели.
+        model = get_user_model()
+        values = dict(zip(SNAPSHOT_FIELDS, snapshot))
+        fields = [field.attname for field in model._meta.concrete_fields
+                  if field.attname in values]
+        return model.from_db(model.objects.db, fields,
+                             [values[field] for field in fields])
@@ -0,0 +1,162 @@
+import hashlib
+import time
+from functools import partial
+from urllib.parse import urlencode
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import transaction
+from django.http import HttpResponse, HttpResponseNotModified
+from django.utils.encoding import force_bytes
+from django.utils.http import parse_etags
+
+from api_yamdb.db.routers import read_from_primary
+
+VERSION_KEY = 'api-response:version:{}'
+CHANGED_KEY = 'api-response:changed:{}'
+RESPONSE_KEY = 'api-response:{}'
+CACHED_HEADERS = ('Content-Type', 'Vary', 'Allow')
+
+
+def get_cache():
+    """Кэш, выбранный для ответов API (settings.API_RESPONSE_CACHE)."""
+    return caches[settings.API_RESPONSE_CACHE['ALIAS']]
+
+
+def versions_are_shared():
+    """Видят ли версии групп все процессы: кэш ответов не в памяти
+    одного процесса (settings.PROCESS_LOCAL_CACHES)."""
+    alias = settings.API_RESPONSE_CACHE['ALIAS']
+    return (settings.CACHES[alias]['BACKEND']
+            not in settings.PROCESS_LOCAL_CACHES)
+
+
+def new_version():
+    """Начальная версия группы. Берём время, а не 0, чтобы после
+    вытеснения ключа версии не ожили старые записи."""
+    return int(time.time() * 1000)
+
+
+def get_versions(groups):
+    """Текущие версии групп кэша одним запросом к бэкенду."""
+    cache = get_cache()
+    keys = [VERSION_KEY.format(group) for group in groups]
+    versions = cache.get_many(keys)
+    for key in keys:
+        if key not in versions:
+            cache.add(key, new_version(), None)
+            versions[key] = cache.get(key)
+    return [versions[key] for key in keys]
+
+
+def bump_versions(groups):
+    """Инвалидация всех ответов, зависящих от перечисленных групп.
+    С репликами группы ещё REPLICA_STICKY_SECONDS считаются недавно
+    изменёнными (см. recently_changed)."""
+    cache = get_cache()
+    for group in groups:
+        key = VERSION_KEY.format(group)
+        try:
+            cache.incr(key)
+        except ValueError:
+            cache.set(key, new_version(), None)
+    if settings.REPLICA_DATABASES:
+        cache.set_many({CHANGED_KEY.format(group): True for group in groups},
+                       settings.REPLICA_STICKY_SECONDS)
+
+
+def recently_changed(groups):
+    """Изменялись ли группы за последние REPLICA_STICKY_SECONDS: ответ по
+    ним, прочитанный с отстающей реплики, попал бы в кэш и ETag под
+    новой версией со старыми данными."""
+    if not settings.REPLICA_DATABASES:
+        return False
+    return bool(get_cache().get_many(
+        [CHANGED_KEY.format(group) for group in groups]
+    ))
+
+
+def invalidate(*groups):
+    """Сброс групп кэша ответов после фиксации транзакции."""
+    transaction.on_commit(partial(bump_versions, groups))
+
+
+def get_fingerprint(request, groups):
+    """Отпечаток ответа: путь, нормализованная строка запроса, Accept
+    и версии групп, от которых зависит ответ. Служит и ключом кэша,
+    и ETag — тело ответа для этого не сериализуется."""
+    query = urlencode(sorted(
+        (name, value)
+        for name, values in request.GET.lists()
+        for value in values
+    ))
+    versions = get_versions(groups)
+    raw = '|'.join((
+        request.path,
+        query,
+        request.META.get('HTTP_ACCEPT', ''),
+        ','.join(f'{group}={version}'
+                 for group, version in zip(groups, versions)),
+    ))
+    return hashlib.md5(force_bytes(raw)).hexdigest()
+
+
+class VersionedResponseMixin:
+    """Условные GET-запросы и кэш ответов по версиям групп.
+
+    Представление описывает, от каких групп зависит ответ
+    (get_cache_groups), а сигналы api.signals сбрасывают версии групп
+    при изменении данных. Для conditional_actions ответ получает ETag,
+    и совпавший If-None-Match отдаёт 304 до аутентификации и запросов
+    к базе. Ответы cached_actions для анонимных клиентов дополнительно
+    хранятся в кэше целиком. Выключается
+    API_RESPONSE_CACHE['ENABLED'].
+    """
+    conditional_actions = ('list', 'retrieve')
+    cached_actions = ()
+
+    def get_cache_groups(self):
+        """Группы инвалидации для текущего запроса."""
+        raise NotImplementedError
+
+    def dispatch(self, request, *args, **kwargs):
+        action = self.action_map.get(request.method.lower())
+        if (not settings.API_RESPONSE_CACHE['ENABLED']
+                or request.method != 'GET'
+                or action not in self.conditional_actions):
+            return super().dispatch(request, *args, **kwargs)
+        self.action, self.kwargs = action, kwargs
+        groups = self.get_cache_groups()
+        if recently_changed(groups):
+            read_from_primary()
+        fingerprint = get_fingerprint(request, groups)
+        etag = f'"{fingerprint}"'
+        if etag in parse_etags(request.META.get('HTTP_IF_NONE_MATCH', '')):
+            response = HttpResponseNotModified()
+            response['ETag'] = etag
+            return response
+
+        cache = key = None
+        if (action in self.cached_actions
+                and 'HTTP_AUTHORIZATION' not in request.META):
+            cache, key = get_cache(), RESPONSE_KEY.format(fingerprint)
+            cached = cache.get(key)
+            if cached is not None:
+                content, headers = cached
+                response = HttpResponse(content)
+                for header, value in headers.items():
+                    response[header] = value
+                response['ETag'] = etag
+                return response
+
+        response = super().dispatch(request, *args, **kwargs)
+        if response.status_code != 200:
+            return response
+        response['ETag'] = etag
+        if key is not None:
+            response.render()
+            headers = {header: response[header] for header in CACHED_HEADERS
+                       if response.has_header(header)}
+            cache.set(key, (response.content, headers),
+                      settings.API_RESPONSE_CACHE['TIMEOUT'])
+        return response
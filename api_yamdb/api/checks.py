@@ -0,0 +1,22 @@
+from django.conf import settings
+from django.core.checks import Error, register
+
+from .cache import versions_are_shared
+
+
+@register()
+def check_response_cache(app_configs, **kwargs):
+    """ETag и кэш ответов строятся по версиям групп, которые сбрасывают
+    и воркеры, и команды manage.py (refresh_leaderboard, import_catalog
+    и другие). В кэше одного процесса остальные процессы сброса не
+    увидят и будут отвечать 304 на изменившиеся данные."""
+    config = settings.API_RESPONSE_CACHE
+    backend = settings.CACHES[config['ALIAS']]['BACKEND']
+    if config['ENABLED'] and not versions_are_shared():
+        return [Error(
+            f'Кэш ответов API включён на кэше процесса {backend}.',
+            hint='Укажите общий кэш (CACHE_BACKEND, например memcached) '
+                 'или выключите API_RESPONSE_CACHE_ENABLED.',
+            id='api.E001',
+        )]
+    return []
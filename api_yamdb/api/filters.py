@@ -1,6 +1,12 @@
 import django_filters
+from django.contrib.postgres.search import (SearchQuery, SearchRank,
+                                            TrigramSimilarity)
+from django.db import connections
+from django.db.models import F, Q
 from reviews.models import Title
 
+SEARCH_CONFIG = 'russian'
+
 
 class TitlesFilter(django_filters.FilterSet):
     """Фильтр для модели Произведений."""
@@ -11,7 +17,27 @@ class TitlesFilter(django_filters.FilterSet):
         lookup_expr='icontains'
     )
     year = django_filters.NumberFilter(field_name='year')
+    search = django_filters.CharFilter(method='filter_search')
 
     class Meta:
         model = Title
-        fields = ('category', 'genre', 'name', 'year')
+        fields = ('category', 'genre', 'name', 'year', 'search')
+
+    def filter_search(self, queryset, name, value):
+        """Поиск по названию и описанию с сортировкой по релевантности.
+        На PostgreSQL использует GIN-индексы tsvector и триграмм,
+        на остальных СУБД — простой icontains."""
+        value = value.strip()
+        if not value:
+            return queryset
+        if connections[queryset.db].vendor != 'postgresql':
+            return queryset.filter(
+                Q(name__icontains=value) | Q(description__icontains=value)
+            )
+        query = SearchQuery(value, config=SEARCH_CONFIG)
+        return queryset.filter(
+            Q(search_vector=query) | Q(name__trigram_similar=value)
+        ).annotate(
+            relevance=(SearchRank(F('search_vector'), query)
+                       + TrigramSimilarity('name', value))
+        ).order_by('-relevance', 'id')
@@ -0,0 +1,61 @@
+import json
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from api_yamdb.db.slowlog import aggregate, read_entries
+
+SORT_KEYS = ('total_ms', 'count', 'mean_ms', 'max_ms')
+
+
+class Command(BaseCommand):
+    """Отчёт по журналу медленных запросов (api_yamdb.db.slowlog)."""
+    help = ('Группирует медленные SQL-запросы по отпечатку '
+            'нормализованного SQL и выводит самые затратные')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--file',
+                            default=settings.SLOW_QUERY_LOG['FILE'],
+                            help='Файл журнала')
+        parser.add_argument('--sort', choices=SORT_KEYS,
+                            default='total_ms',
+                            help='Порядок: суммарное время по умолчанию')
+        parser.add_argument('--limit', type=int, default=20,
+                            help='Количество отпечатков в отчёте')
+        parser.add_argument('--json', action='store_true',
+                            help='Вывести отчёт в формате JSON')
+        parser.add_argument('--plans', action='store_true',
+                            help='Показывать планы EXPLAIN')
+
+    def handle(self, *args, **options):
+        groups = sorted(aggregate(read_entries(options['file'])),
+                        key=lambda group: group[options['sort']],
+                        reverse=True)[:options['limit']]
+        if options['json']:
+            self.stdout.write(json.dumps(groups, ensure_ascii=False,
+                                         indent=2))
+            return
+        if not groups:
+            self.stdout.write('Медленных запросов не найдено')
+            return
+        for group in groups:
+            self.stdout.write(self.style.SUCCESS(
+                f'{group["fingerprint"]}  {group["count"]} запросов, '
+                f'всего {group["total_ms"]} мс, в среднем '
+                f'{group["mean_ms"]} мс, максимум {group["max_ms"]} мс'
+            ))
+            self.stdout.write(f'  SQL: {group["normalized"]}')
+            self.stdout.write(f'  Параметры: {group["params_shape"]}')
+            self.stdout.write('  Представления: ' + ', '.join(
+                f'{name} ({count})'
+                for name, count in group['views'].most_common(5)
+            ))
+            if group['serializers']:
+                self.stdout.write('  Сериализаторы: ' + ', '.join(
+                    f'{name} ({count})'
+                    for name, count in group['serializers'].most_common(5)
+                ))
+            if options['plans'] and group.get('plan'):
+                self.stdout.write('  План:')
+                for line in group['plan'].splitlines():
+                    self.stdout.write(f'    {line}')
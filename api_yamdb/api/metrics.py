@@ -0,0 +1,314 @@
+"""Метрики запросов в формате Prometheus.
+
+MetricsMiddleware считает для каждого представления и действия DRF
+(например, TitlesViewSet.list) количество запросов, гистограммы
+длительности и размера ответа, число SQL-запросов и время в базе.
+Запись — несколько операций со словарём в памяти процесса; фоновый
+поток раз в METRICS['FLUSH_INTERVAL'] секунд сохраняет счётчики в файл
+<pid>-<время запуска>.json в METRICS['DIR']. Эндпоинт /metrics
+суммирует файлы всех воркеров gunicorn, поэтому Prometheus видит общие
+значения независимо от того, какой воркер ответил на запрос. Файлы
+завершившихся воркеров процесс при запуске переносит в свои счётчики
+и удаляет: счётчики не убывают, а файлов не больше, чем воркеров.
+"""
+import atexit
+import fcntl
+import hmac
+import json
+import os
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from functools import lru_cache
+
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.http import HttpResponse, HttpResponseForbidden
+
+DURATION_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5,
+                    10)
+SIZE_BUCKETS = (256, 1024, 4096, 16384, 65536, 262144, 1048576)
+UNRESOLVED = 'unresolved'
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+LOCK_NAME = '.lock'
+
+# Расположение значений в записи: счётчики, затем корзины гистограмм
+# (последняя корзина каждой гистограммы — +Inf).
+COUNT, DURATION, QUERIES, DB_TIME, SIZE = range(5)
+DURATION_START = 5
+SIZE_START = DURATION_START + len(DURATION_BUCKETS) + 1
+RECORD_SIZE = SIZE_START + len(SIZE_BUCKETS) + 1
+
+
+def process_file(pid, started):
+    return f'{pid}-{started}.json'
+
+
+def parse_process_file(name):
+    """(pid, время запуска) из имени файла воркера или None."""
+    pid, _, started = name[:-len('.json')].partition('-')
+    if not name.endswith('.json') or not (pid.isdigit()
+                                          and started.isdigit()):
+        return None
+    return int(pid), started
+
+
+def is_alive(pid):
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+@contextmanager
+def directory_lock(directory, mode):
+    """Блокировка каталога метрик: перенос файлов завершившихся
+    воркеров (LOCK_EX) не пересекается с их чтением в /metrics
+    (LOCK_SH), поэтому счётчики не видны ни дважды, ни ни разу."""
+    with open(os.path.join(directory, LOCK_NAME), 'a') as lock:
+        fcntl.flock(lock, mode)
+        try:
+            yield
+        finally:
+            fcntl.flock(lock, fcntl.LOCK_UN)
+
+
+def read_rows(path):
+    with open(path, encoding='utf-8') as file:
+        return json.load(file)
+
+
+class Registry:
+    """Счётчики процесса по ключу (представление, метод, статус)."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.records = {}
+        self.pid = None
+        self.started = None
+
+    def start(self):
+        """Запуск в новом процессе (в том числе после fork воркера
+        gunicorn): свой файл, перенос файлов завершившихся воркеров
+        и фоновая запись."""
+        with self.lock:
+            if self.pid == os.getpid():
+                return
+            self.pid = os.getpid()
+            self.started = time.time_ns()
+            self.records.clear()
+        self.adopt_dead()
+        threading.Thread(target=self.flush_periodically,
+                         args=(self.started,), name='metrics-flush',
+                         daemon=True).start()
+
+    def observe(self, key, seconds, queries, db_seconds, size):
+        if self.pid != os.getpid():
+            self.start()
+        with self.lock:
+            record = self.records.get(key)
+            if record is None:
+                record = self.records[key] = [0] * RECORD_SIZE
+            record[COUNT] += 1
+            record[DURATION] += seconds
+            record[QUERIES] += queries
+            record[DB_TIME] += db_seconds
+            record[DURATION_START
+                   + bisect_left(DURATION_BUCKETS, seconds)] += 1
+            if size is not None:
+                record[SIZE] += size
+                record[SIZE_START + bisect_left(SIZE_BUCKETS, size)] += 1
+
+    def flush_periodically(self, started):
+        while True:
+            time.sleep(settings.METRICS['FLUSH_INTERVAL'])
+            if self.started != started:
+                return
+            self.flush()
+
+    def snapshot(self):
+        with self.lock:
+            return [[*key, list(record)]
+                    for key, record in self.records.items()]
+
+    @property
+    def file_name(self):
+        return process_file(self.pid, self.started)
+
+    def flush(self):
+        """Атомарная запись счётчиков процесса в файл."""
+        directory = settings.METRICS['DIR']
+        os.makedirs(directory, exist_ok=True)
+        path = os.path.join(directory, self.file_name)
+        temporary = f'{path}.{threading.get_ident()}.tmp'
+        with open(temporary, 'w', encoding='utf-8') as file:
+            json.dump(self.snapshot(), file)
+        os.replace(temporary, path)
+
+    def adopt_dead(self):
+        """Перенос счётчиков завершившихся воркеров в свои: файл
+        прежнего процесса с тем же pid (pid переиспользован) или
+        процесса, которого больше нет, удаляется после записи своего
+        файла с их суммой."""
+        directory = settings.METRICS['DIR']
+        os.makedirs(directory, exist_ok=True)
+        with directory_lock(directory, fcntl.LOCK_EX):
+            dead = []
+            for name in os.listdir(directory):
+                process = parse_process_file(name)
+                if process is None or name == self.file_name:
+                    continue
+                pid, _ = process
+                if pid != self.pid and is_alive(pid):
+                    continue
+                try:
+                    rows = read_rows(os.path.join(directory, name))
+                except (OSError, ValueError):
+                    rows = []
+                with self.lock:
+                    add_rows(self.records, rows)
+                dead.append(name)
+            if not dead:
+                return
+            self.flush()
+            for name in dead:
+                os.remove(os.path.join(directory, name))
+
+    def collect(self):
+        """Сумма счётчиков всех процессов: файлы остальных воркеров
+        и свежие значения текущего."""
+        if self.pid != os.getpid():
+            self.start()
+        totals = {}
+        directory = settings.METRICS['DIR']
+        with directory_lock(directory, fcntl.LOCK_SH):
+            for name in os.listdir(directory):
+                if parse_process_file(name) is None or name == self.file_name:
+                    continue
+                try:
+                    rows = read_rows(os.path.join(directory, name))
+                except (OSError, ValueError):
+                    continue
+                add_rows(totals, rows)
+            add_rows(totals, self.snapshot())
+        return totals
+
+    def clear(self):
+        with self.lock:
+            self.records.clear()
+
+
+def add_rows(totals, rows):
+    for *key, record in rows:
+        total = totals.setdefault(tuple(key), [0] * RECORD_SIZE)
+        for index, value in enumerate(record):
+            total[index] += value
+
+
+registry = Registry()
+
+
+@atexit.register
+def flush_on_exit():
+    """Последние счётчики завершающегося воркера."""
+    if registry.pid == os.getpid() and registry.records:
+        registry.flush()
+
+
+@lru_cache(maxsize=1024)
+def view_name(view, method):
+    """Имя для меток: Класс.действие для DRF, модуль.функция для
+    остальных представлений."""
+    cls = getattr(view, 'cls', None)
+    if cls is None:
+        return f'{view.__module__}.{view.__name__}'
+    actions = getattr(view, 'actions', None) or {}
+    return f'{cls.__name__}.{actions.get(method.lower(), method.lower())}'
+
+
+class MetricsMiddleware:
+    """Сбор метрик запроса. Отключается METRICS['ENABLED']. Число и
+    время SQL-запросов берутся из request.query_log
+    (api_yamdb.db.instrumentation)."""
+
+    def __init__(self, get_response):
+        if not settings.METRICS['ENABLED']:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+
+    def __call__(self, request):
+        started = time.perf_counter()
+        response = self.get_response(request)
+        seconds = time.perf_counter() - started
+        log = request.query_log
+        size = None if response.streaming else len(response.content)
+        registry.observe(
+            (getattr(request, 'metrics_view', UNRESOLVED), request.method,
+             str(response.status_code)),
+            seconds, log.count, log.seconds, size,
+        )
+        return response
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        request.metrics_view = view_name(view_func, request.method)
+
+
+def escape(value):
+    return (value.replace('\\', r'\\').replace('"', r'\"')
+            .replace('\n', r'\n'))
+
+
+def histogram(lines, name, labels, record, start, bounds, total):
+    cumulative = 0
+    for bound, count in zip((*bounds, '+Inf'), record[start:]):
+        cumulative += count
+        lines.append(f'{name}_bucket{{{labels},le="{bound}"}} {cumulative}')
+    lines.append(f'{name}_sum{{{labels}}} {total}')
+    lines.append(f'{name}_count{{{labels}}} {cumulative}')
+
+
+def render(totals):
+    """Текстовый формат экспозиции Prometheus."""
+    families = (
+        ('yamdb_http_requests_total', 'counter',
+         'Количество запросов', COUNT),
+        ('yamdb_http_request_duration_seconds', 'histogram',
+         'Длительность обработки запроса', DURATION),
+        ('yamdb_http_response_size_bytes', 'histogram',
+         'Размер тела ответа', SIZE),
+        ('yamdb_db_queries_total', 'counter',
+         'Количество SQL-запросов', QUERIES),
+        ('yamdb_db_query_duration_seconds_total', 'counter',
+         'Время выполнения SQL-запросов', DB_TIME),
+    )
+    lines = []
+    for name, kind, description, index in families:
+        lines.append(f'# HELP {name} {description}')
+        lines.append(f'# TYPE {name} {kind}')
+        for (view, method, status), record in sorted(totals.items()):
+            labels = (f'view="{escape(view)}",method="{escape(method)}",'
+                      f'status="{status}"')
+            if index == DURATION:
+                histogram(lines, name, labels, record, DURATION_START,
+                          DURATION_BUCKETS, record[DURATION])
+            elif index == SIZE:
+                histogram(lines, name, labels, record, SIZE_START,
+                          SIZE_BUCKETS, record[SIZE])
+            else:
+                lines.append(f'{name}{{{labels}}} {record[index]}')
+    return '\n'.join(lines) + '\n'
+
+
+def metrics_view(request):
+    """Эндпоинт для Prometheus. Если задан METRICS['TOKEN'], требует
+    заголовок Authorization: Bearer <токен>."""
+    token = settings.METRICS['TOKEN']
+    if token and not hmac.compare_digest(
+        request.META.get('HTTP_AUTHORIZATION', ''), f'Bearer {token}'
+    ):
+        return HttpResponseForbidden()
+    return HttpResponse(render(registry.collect()), content_type=CONTENT_TYPE)
@@ -1,4 +1,4 @@
-from rest_framework import mixins, viewsets
+from rest_framework import mixins, permissions, viewsets
 
 
 class ListCreateDestroyViewSet(mixins.CreateModelMixin,
@@ -7,3 +7,62 @@ class ListCreateDestroyViewSet(mixins.CreateModelMixin,
                                viewsets.GenericViewSet):
     """Миксин для создания, удаления и получения списка объектов."""
     pass
+
+
+def get_request_parents(request):
+    """Родительские объекты вложенного маршрута, загруженные в рамках
+    запроса. Словарь живёт в request, поэтому один и тот же объект
+    видят представление, сериализаторы (context['request'])
+    и разрешения."""
+    if getattr(request, 'parents', None) is None:
+        request.parents = {}
+    return request.parents
+
+
+class NestedParentMixin:
+    """Миксин для загрузки родителя вложенного маршрута
+    (произведения, отзыва) не более одного раза за запрос."""
+
+    def get_parent(self, name, loader):
+        parents = get_request_parents(self.request)
+        if name not in parents:
+            parents[name] = loader()
+        return parents[name]
+
+
+class SparseQuerysetMixin:
+    """Миксин, сокращающий выборку под поля ответа (?fields= / ?omit=,
+    см. api.serializers.SparseFieldsMixin).
+
+    sparse_fields описывает, что нужно из базы каждому полю
+    сериализатора: поля модели загружаются, внешние ключи подключаются
+    select_related, связи многие ко многим — prefetch_related. Всё, что
+    нужно только убранным полям, не загружается. Поля сортировки курсора
+    (cursor_ordering) загружаются всегда.
+    """
+    sparse_fields = {}
+
+    def get_response_fields(self):
+        """Поля, которые попадут в ответ."""
+        if self.request.method not in permissions.SAFE_METHODS:
+            return set(self.sparse_fields)
+        return set(self.get_serializer().fields)
+
+    def prune_queryset(self, queryset):
+        response_fields = self.get_response_fields()
+        needed = {field.lstrip('-')
+                  for field in getattr(self, 'cursor_ordering', ())}
+        for name, sources in self.sparse_fields.items():
+            if name in response_fields:
+                needed.update(sources)
+        deferred = set()
+        for sources in self.sparse_fields.values():
+            for source in sources:
+                field = queryset.model._meta.get_field(source)
+                if source not in needed:
+                    deferred.add(source)
+                elif field.many_to_many:
+                    queryset = queryset.prefetch_related(source)
+                elif field.is_relation:
+                    queryset = queryset.select_related(source)
+        return queryset.defer(*sorted(deferred))
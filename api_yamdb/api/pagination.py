@@ -0,0 +1,144 @@
+import json
+from base64 import urlsafe_b64decode, urlsafe_b64encode
+from binascii import Error as BinasciiError
+
+from django.core.exceptions import ValidationError
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import PageNumberPagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+
+class KeysetPagination(PageNumberPagination):
+    """Постраничная пагинация с режимом курсора по запросу.
+
+    По умолчанию работает как PageNumberPagination. С параметром
+    ?pagination=cursor (или ?cursor=...) страница выбирается условием
+    по ключам сортировки представления (cursor_ordering), без COUNT(*)
+    и OFFSET, поэтому стоимость страницы не зависит от её глубины.
+    Параметры из cursor_exclusive_params представления задают свой
+    порядок (например, ?search= — по релевантности): с ними курсор не
+    используется и страницы выбираются по номерам.
+    """
+    cursor_query_param = 'cursor'
+    mode_query_param = 'pagination'
+    cursor_mode = 'cursor'
+    invalid_cursor_message = 'Некорректный курсор.'
+    default_ordering = ('id',)
+
+    def is_cursor_mode(self, request, view=None):
+        """Включён ли режим курсора для запроса."""
+        params = request.query_params
+        if any(params.get(name, '').strip()
+               for name in getattr(view, 'cursor_exclusive_params', ())):
+            return False
+        return (self.cursor_query_param in params
+                or params.get(self.mode_query_param) == self.cursor_mode)
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.use_cursor = self.is_cursor_mode(request, view)
+        if not self.use_cursor:
+            return super().paginate_queryset(queryset, request, view)
+
+        self.request = request
+        self.ordering = getattr(view, 'cursor_ordering',
+                                self.default_ordering)
+        page_size = self.get_page_size(request)
+        position, reverse = self.decode_cursor(request, queryset.model)
+
+        ordering = self.ordering
+        if reverse:
+            ordering = tuple(self.invert(field) for field in ordering)
+        queryset = queryset.order_by(*ordering)
+        if position is not None:
+            queryset = queryset.filter(self.after(ordering, position))
+
+        results = list(queryset[:page_size + 1])
+        has_more = len(results) > page_size
+        results = results[:page_size]
+        if reverse:
+            results.reverse()
+
+        self.next_position = self.previous_position = None
+        if results:
+            if has_more or reverse:
+                self.next_position = self.position_of(results[-1])
+            if (has_more and reverse) or (position is not None
+                                          and not reverse):
+                self.previous_position = self.position_of(results[0])
+        return results
+
+    def get_paginated_response(self, data):
+        if not self.use_cursor:
+            return super().get_paginated_response(data)
+        return Response({
+            'next': self.get_cursor_link(self.next_position, False),
+            'previous': self.get_cursor_link(self.previous_position, True),
+            'results': data,
+        })
+
+    @staticmethod
+    def invert(field):
+        """Обратное направление сортировки поля."""
+        return field[1:] if field.startswith('-') else f'-{field}'
+
+    @staticmethod
+    def after(ordering, position):
+        """Условие «строго после позиции» для составного ключа:
+        (a > x) OR (a = x AND b > y) OR ..."""
+        condition = Q()
+        equal = {}
+        for field, value in zip(ordering, position):
+            name = field.lstrip('-')
+            lookup = 'lt' if field.startswith('-') else 'gt'
+            condition |= Q(**equal, **{f'{name}__{lookup}': value})
+            equal[name] = value
+        return condition
+
+    def position_of(self, instance):
+        """Значения ключей сортировки объекта."""
+        return [getattr(instance, field.lstrip('-'))
+                for field in self.ordering]
+
+    def decode_cursor(self, request, model):
+        """Позиция и направление из параметра cursor. Значения
+        приводятся к типам полей сортировки модели: подделанный курсор
+        даёт 404, а не ошибку базы при фильтрации."""
+        encoded = request.query_params.get(self.cursor_query_param)
+        if not encoded:
+            return None, False
+        try:
+            data = json.loads(urlsafe_b64decode(encoded.encode('ascii')))
+            position, reverse = data['p'], bool(data.get('r'))
+        except (TypeError, ValueError, KeyError, BinasciiError):
+            raise NotFound(self.invalid_cursor_message)
+        if (not isinstance(position, list)
+                or len(position) != len(self.ordering)):
+            raise NotFound(self.invalid_cursor_message)
+        try:
+            position = [
+                model._meta.get_field(field.lstrip('-')).to_python(value)
+                for field, value in zip(self.ordering, position)
+            ]
+        except (ValidationError, TypeError, ValueError):
+            raise NotFound(self.invalid_cursor_message)
+        if None in position:
+            raise NotFound(self.invalid_cursor_message)
+        return position, reverse
+
+    def get_cursor_link(self, position, reverse):
+        """Ссылка на соседнюю страницу в режиме курсора."""
+        if position is None:
+            return None
+        data = {'p': position}
+        if reverse:
+            data['r'] = 1
+        encoded = urlsafe_b64encode(
+            json.dumps(data, cls=DjangoJSONEncoder).encode('utf-8')
+        ).decode('ascii')
+        url = remove_query_param(
+            self.request.build_absolute_uri(), self.page_query_param
+        )
+        return replace_query_param(url, self.cursor_query_param, encoded)
@@ -0,0 +1,185 @@
+"""Профилирование отдельного запроса по запросу администратора.
+
+Запрос с заголовком X-Profile: 1 или параметром ?_profile=1 от
+пользователя с правами IsAdmin выполняется под cProfile с записью всех
+SQL-запросов. Результат сохраняется в PROFILING['DIR']: <id>.prof
+(pstats, открывается snakeviz или pstats) и <id>.json с самыми
+затратными функциями и SQL. Идентификатор начинается с времени в
+наносекундах, поэтому строковый порядок совпадает с порядком
+создания. Хранятся последние PROFILING['KEEP'] профилей, их список
+отдаёт /api/v1/profiles/. Обычный запрос проверяет только наличие
+заголовка и параметра.
+"""
+import cProfile
+import json
+import os
+import pstats
+import re
+import threading
+import time
+import uuid
+from types import SimpleNamespace
+
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from rest_framework.exceptions import APIException
+
+from .authentication import CachedJWTAuthentication
+from .permissions import IsAdmin
+
+HEADER = 'HTTP_X_PROFILE'
+PARAM = '_profile'
+RESPONSE_HEADER = 'X-Profile-Id'
+PROFILE_ID = r'\d{20}-[0-9a-f]{8}'
+MAX_PARAMS_LENGTH = 200
+
+
+def requested(request):
+    if request.META.get(HEADER):
+        return True
+    return (PARAM in request.META.get('QUERY_STRING', '')
+            and request.GET.get(PARAM) not in (None, '', '0'))
+
+
+def is_admin(request):
+    """Проверка IsAdmin до DRF: пользователь берётся из JWT."""
+    try:
+        authenticated = CachedJWTAuthentication().authenticate(request)
+    except APIException:
+        return False
+    if authenticated is None:
+        return False
+    return IsAdmin().has_permission(
+        SimpleNamespace(user=authenticated[0]), None
+    )
+
+
+class SQLRecorder:
+    """Наблюдатель request.query_log: текст, параметры и длительность
+    запросов."""
+
+    def __init__(self):
+        self.queries = []
+
+    def __call__(self, sql, params, many, context, seconds):
+        self.queries.append({
+            'sql': sql,
+            'params': repr(params)[:MAX_PARAMS_LENGTH],
+            'many': many,
+            'ms': round(seconds * 1000, 3),
+        })
+
+
+def top_functions(profile, limit):
+    """Самые затратные функции по суммарному времени с вложенными."""
+    stats = pstats.Stats(profile).stats
+    rows = sorted(stats.items(), key=lambda item: item[1][3], reverse=True)
+    return [{
+        'function': f'{path}:{line}({name})',
+        'calls': calls,
+        'primitive_calls': primitive,
+        'tottime_ms': round(total * 1000, 3),
+        'cumtime_ms': round(cumulative * 1000, 3),
+    } for (path, line, name), (primitive, calls, total, cumulative, _)
+        in rows[:limit]]
+
+
+_last_stamp = 0
+_stamp_lock = threading.Lock()
+
+
+def new_profile_id():
+    """Время в наносекундах фиксированной ширины, строго растущее в
+    пределах процесса, и случайный суффикс против совпадений между
+    процессами."""
+    global _last_stamp
+    with _stamp_lock:
+        _last_stamp = max(time.time_ns(), _last_stamp + 1)
+        stamp = _last_stamp
+    return f'{stamp:020d}-{uuid.uuid4().hex[:8]}'
+
+
+def profile_path(profile_id, extension):
+    return os.path.join(settings.PROFILING['DIR'],
+                        f'{profile_id}.{extension}')
+
+
+def list_profiles():
+    """Идентификаторы сохранённых профилей, новые первыми."""
+    directory = settings.PROFILING['DIR']
+    if not os.path.isdir(directory):
+        return []
+    return sorted((name[:-len('.json')] for name in os.listdir(directory)
+                   if re.fullmatch(PROFILE_ID + r'\.json', name)),
+                  reverse=True)
+
+
+def load_profile(profile_id):
+    """Описание профиля или None, если его нет (или он удалён)."""
+    try:
+        with open(profile_path(profile_id, 'json'), encoding='utf-8') as file:
+            return json.load(file)
+    except (OSError, ValueError):
+        return None
+
+
+def apply_retention():
+    for profile_id in list_profiles()[settings.PROFILING['KEEP']:]:
+        for extension in ('json', 'prof'):
+            try:
+                os.remove(profile_path(profile_id, extension))
+            except FileNotFoundError:
+                pass
+
+
+def save_profile(profile, summary):
+    """Сохранение профиля и описания, старые профили сверх KEEP
+    удаляются. Возвращает идентификатор."""
+    os.makedirs(settings.PROFILING['DIR'], exist_ok=True)
+    profile_id = new_profile_id()
+    profile.dump_stats(profile_path(profile_id, 'prof'))
+    summary = {
+        'id': profile_id,
+        **summary,
+        'functions': top_functions(profile, settings.PROFILING['TOP']),
+    }
+    with open(profile_path(profile_id, 'json'), 'w',
+              encoding='utf-8') as file:
+        json.dump(summary, file, ensure_ascii=False)
+    apply_retention()
+    return profile_id
+
+
+class ProfilingMiddleware:
+    """Профилирование запроса администратора. Отключается
+    PROFILING['ENABLED']."""
+
+    def __init__(self, get_response):
+        if not settings.PROFILING['ENABLED']:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+
+    def __call__(self, request):
+        if not requested(request) or not is_admin(request):
+            return self.get_response(request)
+        recorder = SQLRecorder()
+        request.query_log.observe(recorder)
+        profile = cProfile.Profile()
+        started = time.perf_counter()
+        profile.enable()
+        try:
+            response = self.get_response(request)
+        finally:
+            profile.disable()
+        profile_id = save_profile(profile, {
+            'created': time.strftime('%Y-%m-%dT%H:%M:%S%z'),
+            'method': request.method,
+            'path': request.get_full_path(),
+            'status': response.status_code,
+            'duration_ms': round((time.perf_counter() - started) * 1000, 3),
+            'sql_ms': round(sum(query['ms']
+                                for query in recorder.queries), 3),
+            'sql': recorder.queries,
+        })
+        response[RESPONSE_HEADER] = profile_id
+        return response
@@ -0,0 +1,54 @@
+from reviews.models import Categories, Genres
+
+from .cache import get_versions, versions_are_shared
+
+
+class SlugRegistry:
+    """Реестр slug -> объект справочника в памяти процесса.
+
+    Справочник загружается целиком одним запросом и перечитывается,
+    когда меняется версия его группы в кэше ответов (её сбрасывают
+    сигналы api.signals при сохранении и удалении). Поэтому воркеры
+    узнают об изменениях без обращения к базе. Если кэш в памяти
+    процесса, сброс из другого воркера или команды manage.py сюда не
+    дойдёт, и реестр не используется: slug ищутся в базе одним
+    запросом.
+    """
+
+    def __init__(self, model, group):
+        self.model = model
+        self.group = group
+        self.version = None
+        self.objects = {}
+
+    def get_objects(self):
+        """Актуальный словарь slug -> объект."""
+        version, = get_versions((self.group,))
+        if version != self.version:
+            self.objects = {
+                obj.slug: obj
+                for obj in self.model.objects.only('id', 'name', 'slug')
+            }
+            self.version = version
+        return self.objects
+
+    def resolve(self, slugs):
+        """Объекты по списку slug. Отсутствующих в реестре дочитываем
+        одним запросом: версия могла ещё не обновиться после записи."""
+        if not versions_are_shared():
+            return {obj.slug: obj for obj in self.model.objects.only(
+                'id', 'name', 'slug'
+            ).filter(slug__in=set(slugs))}
+        objects = self.get_objects()
+        missing = {slug for slug in slugs if slug not in objects}
+        found = dict(objects)
+        if missing:
+            found.update(
+                (obj.slug, obj)
+                for obj in self.model.objects.filter(slug__in=missing)
+            )
+        return found
+
+
+categories_registry = SlugRegistry(Categories, 'categories')
+genres_registry = SlugRegistry(Genres, 'genres')
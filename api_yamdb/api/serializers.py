@@ -1,17 +1,63 @@
-from django.shortcuts import get_object_or_404
+from django.db import IntegrityError, connections, transaction
+from django.db.models import prefetch_related_objects
 from django.utils import timezone
 from rest_framework import serializers
+from rest_framework.permissions import SAFE_METHODS
+from rest_framework.relations import MANY_RELATION_KWARGS
+from rest_framework.settings import api_settings
 from rest_framework.validators import UniqueValidator
-from reviews.models import Categories, Comment, Genres, Review, Title
+from reviews.models import (Categories, Comment, Genres, GenreTitle,
+                            LeaderboardEntry, Review, Title, TitleStats)
 from users.models import User
 from users.validators import usernamevalidator
 
+from .cache import invalidate
+from .registry import categories_registry, genres_registry
+
 
 class ErrorResponse:
-    """Класс ошибок для сериализатора произведений."""
+    """Класс ошибок сериализаторов."""
     INCORRECT_RELEASE_YEAR = 'Год не может быть больше текущего'
     INCORRECT_GENRE = 'Жанр не входит в представленный список'
     INCORRECT_CATEGORY = 'Категория не входит в представленный список'
+    REVIEW_ALREADY_EXISTS = 'Отзыв уже существует!'
+    UNKNOWN_FIELDS = 'Неизвестные поля: {}.'
+
+
+def split_names(value):
+    """Имена полей из параметра вида 'id,name'."""
+    return [name.strip() for name in (value or '').split(',')
+            if name.strip()]
+
+
+class SparseFieldsMixin:
+    """Поля ответа по параметрам запроса: ?fields=id,name оставляет
+    только перечисленные поля, ?omit=description убирает перечисленные.
+    Действует на чтение и только для сериализатора верхнего уровня
+    (с request в контексте); вложенные сериализаторы отдают все поля.
+    Выборку под оставшиеся поля сокращает представление
+    (api.mixins.SparseQuerysetMixin)."""
+    fields_query_param = 'fields'
+    omit_query_param = 'omit'
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        request = self.context.get('request')
+        if request is None or request.method not in SAFE_METHODS:
+            return
+        params = request.query_params
+        requested = split_names(params.get(self.fields_query_param))
+        omitted = split_names(params.get(self.omit_query_param))
+        unknown = set(requested + omitted) - set(self.fields)
+        if unknown:
+            raise serializers.ValidationError({
+                self.fields_query_param: [ErrorResponse.UNKNOWN_FIELDS.format(
+                    ', '.join(sorted(unknown))
+                )]
+            })
+        for name in list(self.fields):
+            if (requested and name not in requested) or name in omitted:
+                self.fields.pop(name)
 
 
 class CategoriesSerializer(serializers.ModelSerializer):
@@ -25,8 +71,56 @@ class CategoriesSerializer(serializers.ModelSerializer):
         }
 
 
-class CategoriesField(serializers.SlugRelatedField):
+class RegistryManyRelatedField(serializers.ManyRelatedField):
+    """Список slug, разрешаемый реестром одним обращением."""
+    def to_internal_value(self, data):
+        if isinstance(data, str) or not hasattr(data, '__iter__'):
+            self.fail('not_a_list', input_type=type(data).__name__)
+        if not self.allow_empty and len(data) == 0:
+            self.fail('empty')
+        return self.child_relation.resolve(data)
+
+
+class RegistrySlugRelatedField(serializers.SlugRelatedField):
+    """Поле справочника, которое ищет slug в реестре процесса
+    вместо запроса к базе на каждое значение."""
+    registry = None
+
+    @classmethod
+    def many_init(cls, *args, **kwargs):
+        child_relation = cls(*args, **{
+            key: value for key, value in kwargs.items()
+            if key not in MANY_RELATION_KWARGS
+        })
+        return RegistryManyRelatedField(
+            child_relation=child_relation,
+            **{key: value for key, value in kwargs.items()
+               if key in MANY_RELATION_KWARGS}
+        )
+
+    def resolve(self, slugs):
+        """Объекты для списка slug в исходном порядке."""
+        slugs = [str(slug) for slug in slugs]
+        found = self.registry.resolve(slugs)
+        for slug in slugs:
+            if slug not in found:
+                self.fail('does_not_exist', slug_name=self.slug_field,
+                          value=slug)
+        return [found[slug] for slug in slugs]
+
+    def to_internal_value(self, data):
+        if not isinstance(data, (str, int)):
+            self.fail('invalid')
+        return self.resolve([data])[0]
+
+
+class CategoriesField(RegistrySlugRelatedField):
     """Сериализатор для поиска по катергорий."""
+    registry = categories_registry
+    default_error_messages = {
+        'does_not_exist': ErrorResponse.INCORRECT_CATEGORY,
+    }
+
     def to_representation(self, value):
         serializer = CategoriesSerializer(value)
         return serializer.data
@@ -44,13 +138,44 @@ class GenresSerializer(serializers.ModelSerializer):
         }
 
 
-class GenresField(serializers.SlugRelatedField):
+class GenresField(RegistrySlugRelatedField):
     """Сериализатор для поиска по Жанру."""
+    registry = genres_registry
+    default_error_messages = {
+        'does_not_exist': ErrorResponse.INCORRECT_GENRE,
+    }
+
     def to_representation(self, value):
         serializer = GenresSerializer(value)
         return serializer.data
 
 
+class TitlesListSerializer(serializers.ListSerializer):
+    """Пакетное создание произведений: одна вставка произведений
+    и одна вставка связей с жанрами в общей транзакции."""
+    def create(self, validated_data):
+        title_genres = [item.pop('genre', []) for item in validated_data]
+        titles = [Title(**item) for item in validated_data]
+        features = connections[Title.objects.db].features
+        with transaction.atomic():
+            if features.can_return_ids_from_bulk_insert:
+                Title.objects.bulk_create(titles)
+                TitleStats.objects.bulk_create(
+                    TitleStats(title=title) for title in titles
+                )
+            else:
+                for title in titles:
+                    title.save()
+            GenreTitle.objects.bulk_create(
+                GenreTitle(titles=title, genry=genre)
+                for title, genres in zip(titles, title_genres)
+                for genre in dict.fromkeys(genres)
+            )
+            invalidate('titles')
+        prefetch_related_objects(titles, 'genre')
+        return titles
+
+
 class TitlesSerializer(serializers.ModelSerializer):
     """Сериализатор произведений."""
     category = CategoriesField(
@@ -63,8 +188,9 @@ class TitlesSerializer(serializers.ModelSerializer):
     rating = serializers.IntegerField(read_only=True)
 
     class Meta:
-        fields = '__all__'
+        exclude = ('rating_sum', 'rating_count', 'search_vector')
         model = Title
+        list_serializer_class = TitlesListSerializer
 
     def validate_year(self, value):
         """Валидация года произведения."""
@@ -75,30 +201,10 @@ class TitlesSerializer(serializers.ModelSerializer):
             )
         return value
 
-    def validate_genre(self, value):
-        """Проверка жанра на существование."""
-        genre = Genres.objects.all()
-        for item in value:
-            if item not in genre:
-                raise serializers.ValidationError(
-                    ErrorResponse.INCORRECT_GENRE
-                )
-        return value
-
-    def validate_category(self, value):
-        """Проверка категорий на существование."""
-        category = Categories.objects.all()
-        if value not in category:
-            raise serializers.ValidationError(
-                ErrorResponse.INCORRECT_CATEGORY)
-        return value
 
-
-class ReadTitleSerializer(serializers.ModelSerializer):
+class ReadTitleSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     """Сериализатор предназначеный для чтения клиентами."""
-    rating = serializers.IntegerField(
-        source='reviews__score__avg', read_only=True
-    )
+    rating = serializers.IntegerField(read_only=True)
     genre = GenresSerializer(many=True, read_only=True)
     category = CategoriesSerializer(read_only=True)
 
@@ -109,7 +215,29 @@ class ReadTitleSerializer(serializers.ModelSerializer):
         )
 
 
-class ReviewSerializer(serializers.ModelSerializer):
+class LeaderboardEntrySerializer(serializers.ModelSerializer):
+    """Сериализатор места в рейтинге лучших произведений."""
+    title = ReadTitleSerializer(read_only=True)
+
+    class Meta:
+        model = LeaderboardEntry
+        fields = ('position', 'rating', 'review_count', 'title')
+
+
+class TitleStatsSerializer(serializers.ModelSerializer):
+    """Сериализатор статистики оценок произведения."""
+    average = serializers.FloatField(read_only=True)
+    histogram = serializers.DictField(
+        child=serializers.IntegerField(), read_only=True
+    )
+
+    class Meta:
+        model = TitleStats
+        fields = ('title', 'review_count', 'comment_count', 'average',
+                  'histogram')
+
+
+class ReviewSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     """Сериализатор отзывов к произведениям."""
     title = serializers.SlugRelatedField(
         slug_field='name',
@@ -125,20 +253,21 @@ class ReviewSerializer(serializers.ModelSerializer):
         model = Review
         fields = '__all__'
 
-    def validate(self, data):
-        """Проверка на то, что автор не может,
-        написать два отзыва к оджному произведению."""
-        request = self.context['request']
-        author = request.user
-        title_id = self.context.get('view').kwargs.get('title_id')
-        title = get_object_or_404(Title, pk=title_id)
-        if request.method == 'POST':
-            if Review.objects.filter(title=title, author=author).exists():
-                raise serializers.ValidationError('Отзыв уже существует!')
-        return data
+    def create(self, validated_data):
+        """Повторный отзыв отсекает ограничение unique_title_author
+        в базе, без предварительной проверки отдельным запросом."""
+        try:
+            with transaction.atomic():
+                return super().create(validated_data)
+        except IntegrityError:
+            raise serializers.ValidationError(
+                {api_settings.NON_FIELD_ERRORS_KEY: [
+                    ErrorResponse.REVIEW_ALREADY_EXISTS
+                ]}
+            )
 
 
-class CommentSerializer(serializers.ModelSerializer):
+class CommentSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     """Сериализатора Комметариев."""
     author = serializers.SlugRelatedField(
         read_only=True,
@@ -0,0 +1,83 @@
+from django.db.models.signals import m2m_changed, post_delete, post_save
+from django.dispatch import receiver
+from reviews.models import (Categories, Comment, Genres, GenreTitle, Review,
+                            Title)
+from reviews.signals import catalog_imported, leaderboard_refreshed
+from users.models import User
+
+from .authentication import forget_user
+from .cache import invalidate
+
+
+@receiver(post_save, sender=Title)
+@receiver(post_delete, sender=Title)
+def invalidate_title(sender, instance, **kwargs):
+    invalidate('titles', f'title:{instance.pk}')
+
+
+@receiver(post_save, sender=Review)
+@receiver(post_delete, sender=Review)
+def invalidate_review(sender, instance, **kwargs):
+    invalidate('titles', f'title:{instance.title_id}',
+               f'reviews:{instance.title_id}')
+
+
+@receiver(post_save, sender=Comment)
+@receiver(post_delete, sender=Comment)
+def invalidate_comment(sender, instance, **kwargs):
+    invalidate(f'comments:{instance.review_id}')
+
+
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+def forget_user_snapshot(sender, instance, **kwargs):
+    """Смена роли или блокировка должны действовать сразу, а не после
+    истечения снимка в кэше JWT-аутентификации."""
+    forget_user(instance.pk)
+
+
+@receiver(post_save, sender=User)
+def invalidate_authors(sender, instance, created, **kwargs):
+    """Ответы с отзывами и комментариями содержат username автора."""
+    if not created:
+        invalidate('authors')
+
+
+@receiver(post_save, sender=GenreTitle)
+@receiver(post_delete, sender=GenreTitle)
+def invalidate_title_genre(sender, instance, **kwargs):
+    invalidate('titles', f'title:{instance.titles_id}')
+
+
+@receiver(m2m_changed, sender=GenreTitle)
+def invalidate_title_genres(sender, instance, action, **kwargs):
+    if not action.startswith('post_'):
+        return
+    if isinstance(instance, Title):
+        invalidate('titles', f'title:{instance.pk}')
+    else:
+        invalidate('titles', 'taxonomy')
+
+
+@receiver(post_save, sender=Categories)
+@receiver(post_delete, sender=Categories)
+def invalidate_categories(sender, instance, **kwargs):
+    invalidate('categories', 'titles', 'taxonomy')
+
+
+@receiver(post_save, sender=Genres)
+@receiver(post_delete, sender=Genres)
+def invalidate_genres(sender, instance, **kwargs):
+    invalidate('genres', 'titles', 'taxonomy')
+
+
+@receiver(catalog_imported)
+def invalidate_catalog(sender, **kwargs):
+    """После массовой загрузки сбрасываем группы, от которых зависят
+    все ответы каталога."""
+    invalidate('titles', 'categories', 'genres', 'taxonomy', 'authors')
+
+
+@receiver(leaderboard_refreshed)
+def invalidate_leaderboard(sender, **kwargs):
+    invalidate('leaderboard')
@@ -0,0 +1,173 @@
+import math
+import threading
+from functools import lru_cache
+
+from django.conf import settings
+from django.core.cache import caches
+from django.utils.module_loading import import_string
+from rest_framework.settings import api_settings
+from rest_framework.throttling import SimpleRateThrottle
+
+DEFAULT_STORE = 'api.throttling.CacheWindowStore'
+
+
+class LocMemWindowStore:
+    """Счётчики окон в памяти процесса: без сериализации и сетевых
+    запросов, но у каждого воркера свои лимиты."""
+    max_keys = 10000
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.counters = {}
+
+    def get(self, key, window):
+        """Счётчики текущего и предыдущего окна."""
+        counts = self.counters.get(key, {})
+        return counts.get(window, 0), counts.get(window - 1, 0)
+
+    def incr(self, key, window, duration):
+        with self.lock:
+            if len(self.counters) > self.max_keys:
+                self.counters = {
+                    name: counts for name, counts in self.counters.items()
+                    if max(counts) >= window - 1
+                }
+            counts = self.counters.setdefault(key, {})
+            for old in [old for old in counts if old < window - 1]:
+                del counts[old]
+            counts[window] = counts.get(window, 0) + 1
+
+
+class CacheWindowStore:
+    """Счётчики окон в кэше Django (THROTTLE_CACHE_ALIAS): с общим
+    кэшем лимиты действуют на все воркеры и серверы."""
+    key_format = 'throttle:{}:{}'
+
+    def __init__(self):
+        alias = settings.REST_FRAMEWORK.get('THROTTLE_CACHE_ALIAS',
+                                            'default')
+        self.cache = caches[alias]
+
+    def get(self, key, window):
+        current = self.key_format.format(key, window)
+        previous = self.key_format.format(key, window - 1)
+        counts = self.cache.get_many((current, previous))
+        return counts.get(current, 0), counts.get(previous, 0)
+
+    def incr(self, key, window, duration):
+        name = self.key_format.format(key, window)
+        if not self.cache.add(name, 1, 2 * duration):
+            try:
+                self.cache.incr(name)
+            except ValueError:
+                self.cache.set(name, 1, 2 * duration)
+
+
+@lru_cache(maxsize=None)
+def get_store(path):
+    """Один экземпляр хранилища на процесс."""
+    return import_string(path)()
+
+
+class SlidingWindowThrottle(SimpleRateThrottle):
+    """Ограничение частоты по скользящему окну.
+
+    Хранится только два счётчика на ключ — текущего и предыдущего
+    окна; число запросов за последние duration секунд оценивается как
+    счётчик текущего окна плюс доля предыдущего. Хранилище задаёт
+    REST_FRAMEWORK['THROTTLE_STORE'], лимиты —
+    REST_FRAMEWORK['DEFAULT_THROTTLE_RATES'][scope]. Проверка не
+    обращается к базе данных.
+    """
+    methods = None
+
+    def __init__(self):
+        # Лимиты читаются при каждом создании, а не при импорте модуля.
+        self.rate = self.get_rate()
+        self.num_requests, self.duration = self.parse_rate(self.rate)
+
+    def get_rate(self):
+        return api_settings.DEFAULT_THROTTLE_RATES.get(self.scope)
+
+    def get_store(self):
+        return get_store(
+            settings.REST_FRAMEWORK.get('THROTTLE_STORE', DEFAULT_STORE)
+        )
+
+    def get_identity(self, request):
+        """Пользователь для аутентифицированных запросов, иначе IP."""
+        if request.user and request.user.is_authenticated:
+            return f'user:{request.user.pk}'
+        return f'ip:{self.get_ident(request)}'
+
+    def get_cache_key(self, request, view):
+        if self.methods is not None and request.method not in self.methods:
+            return None
+        identity = self.get_identity(request)
+        if identity is None:
+            return None
+        return f'{self.scope}:{identity}'
+
+    def allow_request(self, request, view):
+        if self.rate is None:
+            return True
+        key = self.get_cache_key(request, view)
+        if key is None:
+            return True
+        now = self.timer()
+        window, elapsed = divmod(now, self.duration)
+        window = int(window)
+        store = self.get_store()
+        current, previous = store.get(key, window)
+        weight = (self.duration - elapsed) / self.duration
+        if current + previous * weight >= self.num_requests:
+            self.wait_seconds = self.get_wait(current, previous, elapsed)
+            return False
+        store.incr(key, window, self.duration)
+        return True
+
+    def get_wait(self, current, previous, elapsed):
+        """Через сколько секунд оценка опустится ниже лимита."""
+        remaining = self.duration - elapsed
+        if current >= self.num_requests or not previous:
+            return remaining
+        # previous * (remaining - t) / duration + current < num_requests
+        return max(
+            remaining
+            - (self.num_requests - current) * self.duration / previous,
+            1,
+        )
+
+    def wait(self):
+        return math.ceil(self.wait_seconds)
+
+
+class SignupThrottle(SlidingWindowThrottle):
+    scope = 'signup'
+
+
+class TokenThrottle(SlidingWindowThrottle):
+    scope = 'token'
+
+
+class TokenUsernameThrottle(SlidingWindowThrottle):
+    """Попытки подобрать код подтверждения для одного пользователя
+    с разных адресов."""
+    scope = 'token_username'
+
+    def get_identity(self, request):
+        data = request.data
+        username = data.get('username') if hasattr(data, 'get') else None
+        if not isinstance(username, str) or not username:
+            return None
+        return f'username:{username.lower()}'
+
+
+class ReviewCreateThrottle(SlidingWindowThrottle):
+    scope = 'review_create'
+    methods = ('POST',)
+
+
+class CommentCreateThrottle(SlidingWindowThrottle):
+    scope = 'comment_create'
+    methods = ('POST',)
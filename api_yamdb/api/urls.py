@@ -2,14 +2,16 @@ from django.urls import include, path
 from rest_framework.routers import DefaultRouter
 
 from .views import (ApiSingUp, CategoriesViewSet, CommentViewSet,
-                    GenresViewSet, ReviewViewSet, TitlesViewSet, TokenView,
-                    UserViewSet)
+                    GenresViewSet, LeaderboardViewSet, ProfileViewSet,
+                    ReviewViewSet, TitlesViewSet, TokenView, UserViewSet)
 
 router_v1 = DefaultRouter()
 router_v1.register('categories', CategoriesViewSet, basename='category')
 router_v1.register('genres', GenresViewSet, basename='genre')
 router_v1.register('titles', TitlesViewSet, basename='title')
 router_v1.register('users', UserViewSet, basename='user')
+router_v1.register('leaderboard', LeaderboardViewSet, basename='leaderboard')
+router_v1.register('profiles', ProfileViewSet, basename='profile')
 router_v1.register(
     r'titles/(?P<title_id>\d+)/reviews',
     ReviewViewSet,
@@ -1,32 +1,44 @@
+from django.conf import settings
 from django.contrib.auth.tokens import default_token_generator
-from django.db.models import Avg
+from django.http import FileResponse
 from django.shortcuts import get_object_or_404
 from django_filters.rest_framework import DjangoFilterBackend
+from mailqueue.queue import enqueue
 from rest_framework import filters, permissions, status, viewsets
 from rest_framework.decorators import action
+from rest_framework.exceptions import NotFound
 from rest_framework.response import Response
 from rest_framework.views import APIView
 from rest_framework_simplejwt.tokens import AccessToken
-from reviews.models import Categories, Genres, Review, Title
+from reviews.models import (Categories, Genres, LeaderboardEntry, Review,
+                            Title, TitleStats)
 from users.models import User
 
+from .cache import VersionedResponseMixin
 from .filters import TitlesFilter
-from .mixins import ListCreateDestroyViewSet
+from .mixins import (ListCreateDestroyViewSet, NestedParentMixin,
+                     SparseQuerysetMixin)
+from .pagination import KeysetPagination
 from .permissions import AuthorModeratorAdminOrReadOnly, IsAdmin
+from .profiling import PROFILE_ID, list_profiles, load_profile, profile_path
 from .serializers import (CategoriesSerializer, CommentSerializer,
-                          GenresSerializer, ReadTitleSerializer,
-                          RegistrationSerializer, ReviewSerializer,
-                          TitlesSerializer, TokenSerializer,
+                          GenresSerializer, LeaderboardEntrySerializer,
+                          ReadTitleSerializer, RegistrationSerializer,
+                          ReviewSerializer, TitlesSerializer,
+                          TitleStatsSerializer, TokenSerializer,
                           UserEditSerializer, UserSerializer)
+from .throttling import (CommentCreateThrottle, ReviewCreateThrottle,
+                         SignupThrottle, TokenThrottle, TokenUsernameThrottle)
 
 
-class CategoriesViewSet(ListCreateDestroyViewSet):
+class CategoriesViewSet(VersionedResponseMixin, ListCreateDestroyViewSet):
     """Представление Категорий."""
     queryset = Categories.objects.all()
     serializer_class = CategoriesSerializer
     lookup_field = 'slug'
     filter_backends = (filters.SearchFilter,)
     search_fields = ('name',)
+    cached_actions = ('list',)
 
     def get_permissions(self):
         """Метод вызова разрешения, в зависимости от запроса."""
@@ -34,14 +46,18 @@ class CategoriesViewSet(ListCreateDestroyViewSet):
             return (permissions.AllowAny(),)
         return (IsAdmin(),)
 
+    def get_cache_groups(self):
+        return ('categories',)
 
-class GenresViewSet(ListCreateDestroyViewSet):
+
+class GenresViewSet(VersionedResponseMixin, ListCreateDestroyViewSet):
     """Представление Жанров."""
     queryset = Genres.objects.all()
     serializer_class = GenresSerializer
     lookup_field = 'slug'
     filter_backends = (filters.SearchFilter,)
     search_fields = ('name',)
+    cached_actions = ('list',)
 
     def get_permissions(self):
         """Метод вызова разрешения, в зависимости от запроса."""
@@ -49,42 +65,163 @@ class GenresViewSet(ListCreateDestroyViewSet):
             return (permissions.AllowAny(),)
         return (IsAdmin(),)
 
+    def get_cache_groups(self):
+        return ('genres',)
+
 
-class TitlesViewSet(viewsets.ModelViewSet):
+class TitlesViewSet(VersionedResponseMixin, SparseQuerysetMixin,
+                    viewsets.ModelViewSet):
     """Представление Произведений."""
-    queryset = Title.objects.all().annotate(
-        Avg('reviews__score')
-    ).order_by('name')
+    queryset = Title.objects.defer('search_vector').order_by('name')
     serializer_class = TitlesSerializer
     filter_backends = (DjangoFilterBackend,)
     filterset_class = TitlesFilter
+    pagination_class = KeysetPagination
+    cursor_ordering = ('name', 'id')
+    # Поиск сортирует по релевантности, а не по cursor_ordering.
+    cursor_exclusive_params = ('search',)
+    cached_actions = ('list', 'retrieve')
+    bulk_max_items = 500
+    # Нечисловой id — 404 ещё в маршрутизаторе, а не ValueError в stats.
+    lookup_value_regex = r'\d+'
+    sparse_fields = {
+        'name': ('name',),
+        'year': ('year',),
+        'rating': ('rating_sum', 'rating_count'),
+        'description': ('description',),
+        'genre': ('genre',),
+        'category': ('category',),
+    }
 
     def get_permissions(self):
         """Метод вызова разрешения, в зависимости от запроса."""
-        if self.action == 'list' or self.action == 'retrieve':
+        if self.action in ('list', 'retrieve', 'stats'):
             return (permissions.AllowAny(),)
         return (IsAdmin(),)
 
+    def get_queryset(self):
+        """Выборка под поля ответа (?fields= / ?omit=)."""
+        return self.prune_queryset(super().get_queryset())
+
     def get_serializer_class(self):
         """Метод вызова сериализатора, в зависимости от запроса."""
         if self.action in ('retrieve', 'list'):
             return ReadTitleSerializer
         return TitlesSerializer
 
+    @action(methods=['POST'], detail=False, url_path='bulk')
+    def bulk(self, request):
+        """Создание списка произведений одним запросом.
+        Ошибки возвращаются списком, по одному элементу на произведение."""
+        if not isinstance(request.data, list):
+            return Response(
+                {'detail': 'Ожидается список произведений.'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        if len(request.data) > self.bulk_max_items:
+            return Response(
+                {'detail': 'За один запрос можно создать не более '
+                           f'{self.bulk_max_items} произведений.'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        serializer = self.get_serializer(data=request.data, many=True)
+        serializer.is_valid(raise_exception=True)
+        serializer.save()
+        return Response(serializer.data, status=status.HTTP_201_CREATED)
+
+    @action(methods=['GET'], detail=True)
+    def stats(self, request, pk=None):
+        """Гистограмма оценок, количество отзывов и комментариев
+        из материализованной статистики: одно чтение по первичному ключу."""
+        stats = TitleStats.objects.filter(pk=pk).first()
+        if stats is None:
+            stats = TitleStats(title=get_object_or_404(Title, pk=pk))
+        return Response(TitleStatsSerializer(stats).data)
+
+    def get_cache_groups(self):
+        """Список зависит от всех произведений, карточка — от своего
+        произведения и справочников жанров и категорий."""
+        if self.action == 'list':
+            return ('titles',)
+        return (f'title:{self.kwargs.get("pk")}', 'taxonomy')
+
+
+class LeaderboardViewSet(VersionedResponseMixin, viewsets.GenericViewSet):
+    """Лучшие произведения: общий рейтинг, по категории и по жанру.
+
+    Места посчитаны заранее командой refresh_leaderboard, поэтому
+    чтение — выборка первых limit строк раздела по индексу и не
+    зависит от размера каталога.
+    """
+    serializer_class = LeaderboardEntrySerializer
+    permission_classes = (permissions.AllowAny,)
+    conditional_actions = cached_actions = ('list', 'category', 'genre')
+    limit_query_param = 'limit'
+    default_limit = 10
+
+    def get_limit(self):
+        """Количество мест из ?limit=, не больше размера рейтинга."""
+        try:
+            limit = int(self.request.query_params[self.limit_query_param])
+        except (KeyError, ValueError):
+            return self.default_limit
+        return min(max(limit, 1), settings.LEADERBOARD['SIZE'])
+
+    def get_board(self, scope, slug=''):
+        entries = LeaderboardEntry.objects.filter(
+            scope=scope, slug=slug, position__lte=self.get_limit()
+        ).select_related('title__category').prefetch_related(
+            'title__genre'
+        ).defer('title__search_vector').order_by('position')
+        return Response(self.get_serializer(entries, many=True).data)
+
+    def list(self, request):
+        return self.get_board(LeaderboardEntry.SCOPE_ALL)
+
+    @action(methods=['GET'], detail=False,
+            url_path=r'categories/(?P<slug>[-a-zA-Z0-9_]+)')
+    def category(self, request, slug=None):
+        return self.get_board(LeaderboardEntry.SCOPE_CATEGORY, slug)
 
-class ReviewViewSet(viewsets.ModelViewSet):
+    @action(methods=['GET'], detail=False,
+            url_path=r'genres/(?P<slug>[-a-zA-Z0-9_]+)')
+    def genre(self, request, slug=None):
+        return self.get_board(LeaderboardEntry.SCOPE_GENRE, slug)
+
+    def get_cache_groups(self):
+        """Места меняет пересчёт рейтинга, а данные произведений —
+        их изменение."""
+        return ('leaderboard', 'titles', 'taxonomy')
+
+
+class ReviewViewSet(VersionedResponseMixin, NestedParentMixin,
+                    SparseQuerysetMixin, viewsets.ModelViewSet):
     """Представление Отзывов."""
     serializer_class = ReviewSerializer
     permission_classes = (AuthorModeratorAdminOrReadOnly,)
+    throttle_classes = (ReviewCreateThrottle,)
+    pagination_class = KeysetPagination
+    cursor_ordering = ('pub_date', 'id')
+    sparse_fields = {
+        'text': ('text',),
+        'author': ('author',),
+        'score': ('score',),
+    }
 
     def get_title_or_404(self):
         """Получение объекта произведения."""
-        return get_object_or_404(Title, id=self.kwargs.get('title_id'))
+        return self.get_parent('title', lambda: get_object_or_404(
+            Title, id=self.kwargs.get('title_id')
+        ))
+
+    def get_cache_groups(self):
+        title_id = self.kwargs.get('title_id')
+        return (f'reviews:{title_id}', f'title:{title_id}', 'authors')
 
     def get_queryset(self):
         """Получение списка или объекта отзывов к произведению"""
         title = self.get_title_or_404()
-        return title.reviews.all()
+        return self.prune_queryset(title.reviews.all())
 
     def perform_create(self, serializer):
         """Создание отзыва к произведению"""
@@ -93,19 +230,38 @@ class ReviewViewSet(viewsets.ModelViewSet):
                         )
 
 
-class CommentViewSet(viewsets.ModelViewSet):
+class CommentViewSet(VersionedResponseMixin, NestedParentMixin,
+                     SparseQuerysetMixin, viewsets.ModelViewSet):
     """Представление Комментариев."""
     serializer_class = CommentSerializer
     permission_classes = (AuthorModeratorAdminOrReadOnly,)
+    throttle_classes = (CommentCreateThrottle,)
+    pagination_class = KeysetPagination
+    cursor_ordering = ('pub_date', 'id')
+    sparse_fields = {
+        'text': ('text',),
+        'author': ('author',),
+    }
 
     def get_review_or_404(self):
-        """Получение объекта отзыва."""
-        return get_object_or_404(Review, pk=self.kwargs.get('review_id'))
+        """Получение объекта отзыва вместе с произведением одним
+        запросом, с проверкой, что отзыв относится к title_id."""
+        review = self.get_parent('review', lambda: get_object_or_404(
+            Review.objects.select_related('title'),
+            pk=self.kwargs.get('review_id'),
+            title_id=self.kwargs.get('title_id'),
+        ))
+        self.get_parent('title', lambda: review.title)
+        return review
+
+    def get_cache_groups(self):
+        return (f'comments:{self.kwargs.get("review_id")}',
+                f'reviews:{self.kwargs.get("title_id")}', 'authors')
 
     def get_queryset(self):
         """Получение комметариев к отзыву."""
         review = self.get_review_or_404()
-        return review.comments.all()
+        return self.prune_queryset(review.comments.all())
 
     def perform_create(self, serializer):
         """Создание комментария к отзыву."""
@@ -129,8 +285,12 @@ class UserViewSet(viewsets.ModelViewSet):
             permission_classes=[permissions.IsAuthenticated],
             url_path='me')
     def user_self_profile(self, request):
-        """Отдельный путь для получения странички с профилем пользователя."""
+        """Отдельный путь для получения странички с профилем пользователя.
+        Если request.user — снимок из кэша аутентификации, профиль
+        читаем целиком одним запросом."""
         user = request.user
+        if user.get_deferred_fields():
+            user = get_object_or_404(User, pk=user.pk)
         if request.method == 'GET':
             serializer = self.get_serializer(user)
             return Response(serializer.data, status=status.HTTP_200_OK)
@@ -149,6 +309,7 @@ class UserViewSet(viewsets.ModelViewSet):
 class ApiSingUp(APIView):
     """Регистрация нового пользователя."""
     permission_classes = (permissions.AllowAny,)
+    throttle_classes = (SignupThrottle,)
 
     def post(self, request):
         """К url можно делать только POST запроосы.
@@ -161,13 +322,14 @@ class ApiSingUp(APIView):
             username=serializer.validated_data['username']
         )
         confirmation_code = default_token_generator.make_token(user)
-        user.email_user('Your code', confirmation_code)
+        enqueue('Your code', confirmation_code, user.email)
         return Response(serializer.data, status=status.HTTP_200_OK)
 
 
 class TokenView(APIView):
     """Представление для получения токена."""
     permission_classes = (permissions.AllowAny,)
+    throttle_classes = (TokenThrottle, TokenUsernameThrottle)
 
     def post(self, request):
         """К url можно делать только POST запроосы.
@@ -185,3 +347,37 @@ class TokenView(APIView):
             return Response({'token': str(token)},
                             status=status.HTTP_200_OK)
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+
+
+class ProfileViewSet(viewsets.ViewSet):
+    """Сохранённые профили запросов (api.profiling). Список содержит
+    краткие описания, профиль целиком — функции и SQL, download отдаёт
+    файл pstats."""
+    permission_classes = (IsAdmin,)
+    lookup_value_regex = PROFILE_ID
+
+    def list(self, request):
+        summaries = []
+        for profile_id in list_profiles():
+            profile = load_profile(profile_id)
+            if profile is None:
+                continue
+            sql = profile.pop('sql', [])
+            profile.pop('functions', None)
+            summaries.append({**profile, 'queries': len(sql)})
+        return Response(summaries)
+
+    def retrieve(self, request, pk=None):
+        profile = load_profile(pk)
+        if profile is None:
+            raise NotFound
+        return Response(profile)
+
+    @action(methods=['GET'], detail=True)
+    def download(self, request, pk=None):
+        try:
+            file = open(profile_path(pk, 'prof'), 'rb')
+        except FileNotFoundError:
+            raise NotFound
+        return FileResponse(file, as_attachment=True,
+                            filename=f'{pk}.prof')
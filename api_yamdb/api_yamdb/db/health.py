@@ -0,0 +1,63 @@
+"""Проверка постоянных соединений (как CONN_HEALTH_CHECKS в Django 4.1).
+
+При CONN_MAX_AGE > 0 соединение переживает запрос и могло быть закрыто
+сервером или сетью, пока воркер простаивал. В начале запроса
+соединения баз с CONN_HEALTH_CHECKS только помечаются как требующие
+проверки; сама проверка (is_usable, SELECT 1) выполняется при первом
+обращении к соединению (курсор, начало транзакции), не больше одного
+раза за запрос для каждой базы.
+Неработающее соединение закрывается, и Django тут же открывает новое
+вместо ошибки в запросе. Ответы, которые обходятся без базы (304, кэш,
+429), и базы, к которым запрос не обращается, не проверяются.
+"""
+from django.core.signals import request_started
+from django.db import connections
+from django.db.backends.signals import connection_created
+
+
+def close_if_health_check_failed(conn):
+    if conn.connection is None:
+        # Сейчас откроется новое соединение, его проверять не нужно.
+        conn.health_check_done = True
+        return
+    # Вне автокоммита SELECT 1 открыл бы транзакцию на соединении,
+    # которым уже управляет atomic.
+    if (conn.in_atomic_block or not conn.autocommit
+            or getattr(conn, 'health_check_done', True)):
+        return
+    conn.health_check_done = True
+    if not conn.is_usable():
+        conn.close()
+
+
+def request_health_checks(**kwargs):
+    """Пометка открытых соединений в начале запроса, без обращения
+    к базе."""
+    for conn in connections.all():
+        if (conn.connection is not None
+                and conn.settings_dict.get('CONN_HEALTH_CHECKS')):
+            conn.health_check_done = False
+
+
+def install_health_check(sender, connection, **kwargs):
+    """Проверка при первом обращении к соединению в запросе: все
+    курсоры и транзакции проходят через ensure_connection."""
+    if getattr(connection, 'health_check_installed', False):
+        return
+    connection.health_check_installed = True
+    ensure_connection = connection.ensure_connection
+
+    def checked_ensure_connection():
+        close_if_health_check_failed(connection)
+        ensure_connection()
+
+    connection.ensure_connection = checked_ensure_connection
+
+
+def connect():
+    """Подписка на начало запроса и открытие соединений; вызывается
+    из ApiConfig.ready."""
+    request_started.connect(request_health_checks,
+                            dispatch_uid='request_health_checks')
+    connection_created.connect(install_health_check,
+                               dispatch_uid='install_health_check')
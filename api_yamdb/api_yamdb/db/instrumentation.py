@@ -0,0 +1,66 @@
+"""Общий учёт SQL-запросов HTTP-запроса.
+
+QueryInstrumentationMiddleware подключает к соединениям одну обёртку
+execute_wrapper на весь HTTP-запрос и кладёт её журнал QueryLog в
+request.query_log. Счётчик и суммарное время запросов нужны метрикам
+(api.metrics) и заголовку X-DB-Queries (querycount); профилирование
+(api.profiling) и журнал медленных запросов (slowlog) подписываются
+на каждый запрос через QueryLog.observe. Так каждый SQL-запрос
+проходит через одну обёртку, сколько бы потребителей ни было включено.
+"""
+import time
+from contextlib import ExitStack
+
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connections
+
+
+class QueryLog:
+    """execute_wrapper: количество и суммарное время запросов ко всем
+    базам; наблюдатели получают каждый запрос с его длительностью."""
+
+    def __init__(self):
+        self.count = 0
+        self.seconds = 0.0
+        self.observers = []
+
+    def observe(self, observer):
+        """observer(sql, params, many, context, seconds) после каждого
+        запроса, в том числе завершившегося ошибкой."""
+        self.observers.append(observer)
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            seconds = time.perf_counter() - started
+            self.count += 1
+            self.seconds += seconds
+            for observer in self.observers:
+                observer(sql, params, many, context, seconds)
+
+
+def is_needed():
+    """Включён ли хотя бы один потребитель журнала запросов."""
+    return (settings.METRICS['ENABLED'] or settings.QUERY_COUNT_HEADER
+            or settings.PROFILING['ENABLED']
+            or settings.SLOW_QUERY_LOG['ENABLED'])
+
+
+class QueryInstrumentationMiddleware:
+    """Журнал запросов в request.query_log. Стоит в MIDDLEWARE раньше
+    своих потребителей; без них не подключается."""
+
+    def __init__(self, get_response):
+        if not is_needed():
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+
+    def __call__(self, request):
+        request.query_log = log = QueryLog()
+        with ExitStack() as stack:
+            for conn in connections.all():
+                stack.enter_context(conn.execute_wrapper(log))
+            return self.get_response(request)
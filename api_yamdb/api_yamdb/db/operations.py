@@ -0,0 +1,142 @@
+"""Операции миграций для больших таблиц.
+
+На PostgreSQL индексы строятся и удаляются с CONCURRENTLY: таблица
+остаётся доступной для записи всё время построения. CONCURRENTLY не
+работает внутри транзакции, поэтому миграция с этими операциями должна
+быть неатомарной (atomic = False). Прерванное построение оставляет
+нерабочий (invalid) индекс — при повторном запуске миграции он
+пересоздаётся. На остальных СУБД операции выполняются как обычные
+AddIndex, AddConstraint и AlterField.
+"""
+from django.db.migrations import AddConstraint, AddIndex, AlterField
+from django.db.models import UniqueConstraint
+
+
+def is_postgresql(schema_editor):
+    return schema_editor.connection.vendor == 'postgresql'
+
+
+def index_is_valid(schema_editor, name):
+    """None, если индекса нет, иначе его готовность."""
+    with schema_editor.connection.cursor() as cursor:
+        cursor.execute('SELECT indisvalid FROM pg_index '
+                       'WHERE indexrelid = to_regclass(%s)', [name])
+        row = cursor.fetchone()
+    return None if row is None else row[0]
+
+
+def drop_index(schema_editor, name):
+    schema_editor.execute('DROP INDEX CONCURRENTLY IF EXISTS '
+                          f'{schema_editor.quote_name(name)}')
+
+
+def create_index(schema_editor, model, name, fields_orders, unique=False):
+    """CREATE INDEX CONCURRENTLY; готовый индекс с тем же именем
+    пропускается, нерабочий удаляется и строится заново."""
+    valid = index_is_valid(schema_editor, name)
+    if valid:
+        return
+    if valid is not None:
+        drop_index(schema_editor, name)
+    quote = schema_editor.quote_name
+    columns = ', '.join(
+        f'{quote(model._meta.get_field(field).column)} {order}'.strip()
+        for field, order in fields_orders
+    )
+    schema_editor.execute(
+        f'CREATE {"UNIQUE " if unique else ""}INDEX CONCURRENTLY '
+        f'{quote(name)} ON {quote(model._meta.db_table)} ({columns})'
+    )
+
+
+class AddIndexConcurrently(AddIndex):
+    """AddIndex с CREATE INDEX CONCURRENTLY на PostgreSQL."""
+
+    def database_forwards(self, app_label, schema_editor, from_state,
+                          to_state):
+        if not is_postgresql(schema_editor):
+            super().database_forwards(app_label, schema_editor, from_state,
+                                      to_state)
+            return
+        model = to_state.apps.get_model(app_label, self.model_name)
+        if self.allow_migrate_model(schema_editor.connection.alias, model):
+            create_index(schema_editor, model, self.index.name,
+                         self.index.fields_orders)
+
+    def database_backwards(self, app_label, schema_editor, from_state,
+                           to_state):
+        if not is_postgresql(schema_editor):
+            super().database_backwards(app_label, schema_editor,
+                                       from_state, to_state)
+            return
+        model = from_state.apps.get_model(app_label, self.model_name)
+        if self.allow_migrate_model(schema_editor.connection.alias, model):
+            drop_index(schema_editor, self.index.name)
+
+
+class AddConstraintConcurrently(AddConstraint):
+    """AddConstraint для UniqueConstraint без условия: на PostgreSQL
+    уникальный индекс строится конкурентно, а ограничение создаётся
+    поверх готового индекса (ADD CONSTRAINT ... USING INDEX), что
+    блокирует таблицу лишь на мгновение. Дубликаты нужно удалить до
+    операции."""
+
+    def database_forwards(self, app_label, schema_editor, from_state,
+                          to_state):
+        constraint = self.constraint
+        if (not is_postgresql(schema_editor)
+                or not isinstance(constraint, UniqueConstraint)
+                or constraint.condition is not None):
+            super().database_forwards(app_label, schema_editor, from_state,
+                                      to_state)
+            return
+        model = to_state.apps.get_model(app_label, self.model_name)
+        if not self.allow_migrate_model(schema_editor.connection.alias,
+                                        model):
+            return
+        table = model._meta.db_table
+        with schema_editor.connection.cursor() as cursor:
+            cursor.execute('SELECT 1 FROM pg_constraint WHERE conname = %s '
+                           'AND conrelid = to_regclass(%s)',
+                           [constraint.name, table])
+            if cursor.fetchone():
+                return
+        create_index(schema_editor, model, constraint.name,
+                     [(field, '') for field in constraint.fields],
+                     unique=True)
+        quote = schema_editor.quote_name
+        schema_editor.execute(
+            f'ALTER TABLE {quote(table)} ADD CONSTRAINT '
+            f'{quote(constraint.name)} UNIQUE USING INDEX '
+            f'{quote(constraint.name)}'
+        )
+
+
+class RemoveFieldIndexConcurrently(AlterField):
+    """AlterField, снимающий db_index с поля (например, индекс внешнего
+    ключа, который покрывает составной индекс). На PostgreSQL индекс
+    удаляется DROP INDEX CONCURRENTLY; откат создаёт его обычным
+    образом."""
+
+    def database_forwards(self, app_label, schema_editor, from_state,
+                          to_state):
+        model = from_state.apps.get_model(app_label, self.model_name)
+        old_field = model._meta.get_field(self.name)
+        if (not is_postgresql(schema_editor) or self.field.db_index
+                or not old_field.db_index):
+            super().database_forwards(app_label, schema_editor, from_state,
+                                      to_state)
+            return
+        if not self.allow_migrate_model(schema_editor.connection.alias,
+                                        model):
+            return
+        connection = schema_editor.connection
+        with connection.cursor() as cursor:
+            constraints = connection.introspection.get_constraints(
+                cursor, model._meta.db_table
+            )
+        for name, details in constraints.items():
+            if (details['index'] and details['columns'] == [old_field.column]
+                    and not details['unique']
+                    and not details['primary_key']):
+                drop_index(schema_editor, name)
@@ -0,0 +1,149 @@
+import threading
+import time
+from collections import deque
+
+from django.db.backends.postgresql import base, creation
+from psycopg2 import extensions
+
+Database = base.Database
+
+
+class ConnectionPool:
+    """Пул соединений psycopg2 внутри процесса.
+
+    Одновременно открыто не больше max_size соединений; свободное
+    соединение, пролежавшее в пуле дольше idle_timeout секунд,
+    закрывается. Если все соединения заняты дольше timeout секунд,
+    запрос получает OperationalError.
+    """
+
+    def __init__(self, max_size, idle_timeout, timeout):
+        self.idle_timeout = idle_timeout
+        self.timeout = timeout
+        self.slots = threading.BoundedSemaphore(max_size)
+        self.lock = threading.Lock()
+        self.idle = deque()
+
+    def acquire(self, connect, health_check):
+        """Свободное соединение из пула или новое."""
+        if not self.slots.acquire(timeout=self.timeout):
+            raise Database.OperationalError(
+                'Все соединения пула заняты'
+            )
+        try:
+            while True:
+                connection = self.pop_idle()
+                if connection is None:
+                    return connect()
+                if not health_check or self.is_usable(connection):
+                    return connection
+                connection.close()
+        except Exception:
+            self.slots.release()
+            raise
+
+    def pop_idle(self):
+        """Самое свежее свободное соединение; устаревшие закрываются."""
+        deadline = time.monotonic() - self.idle_timeout
+        with self.lock:
+            while self.idle and self.idle[0][1] < deadline:
+                self.idle.popleft()[0].close()
+            if not self.idle:
+                return None
+            return self.idle.pop()[0]
+
+    @staticmethod
+    def is_usable(connection):
+        if connection.closed:
+            return False
+        try:
+            with connection.cursor() as cursor:
+                cursor.execute('SELECT 1')
+        except Database.Error:
+            return False
+        return True
+
+    def clear(self):
+        """Закрытие всех свободных соединений."""
+        with self.lock:
+            while self.idle:
+                self.idle.pop()[0].close()
+
+    def release(self, connection, discard=False):
+        """Возврат соединения в пул. Незавершённая транзакция
+        откатывается; сломанное соединение закрывается."""
+        try:
+            if not discard and not connection.closed:
+                status = connection.get_transaction_status()
+                if status == extensions.TRANSACTION_STATUS_INTRANS:
+                    connection.rollback()
+                elif status != extensions.TRANSACTION_STATUS_IDLE:
+                    discard = True
+            if discard or connection.closed:
+                connection.close()
+            else:
+                with self.lock:
+                    self.idle.append((connection, time.monotonic()))
+        except Database.Error:
+            connection.close()
+        finally:
+            self.slots.release()
+
+
+pools = {}
+pools_lock = threading.Lock()
+
+
+def get_pool(alias, settings_dict):
+    """Пул базы alias, общий для всех потоков процесса."""
+    with pools_lock:
+        if alias not in pools:
+            config = settings_dict.get('POOL', {})
+            pools[alias] = ConnectionPool(
+                max_size=config.get('MAX_SIZE', 10),
+                idle_timeout=config.get('IDLE_TIMEOUT', 300),
+                timeout=config.get('TIMEOUT', 10),
+            )
+        return pools[alias]
+
+
+class DatabaseCreation(creation.DatabaseCreation):
+
+    def _destroy_test_db(self, test_database_name, verbosity):
+        # Свободные соединения пула держат тестовую базу открытой.
+        for pool in pools.values():
+            pool.clear()
+        super()._destroy_test_db(test_database_name, verbosity)
+
+
+class DatabaseWrapper(base.DatabaseWrapper):
+    """Бэкенд PostgreSQL, который берёт соединения из ConnectionPool
+    и возвращает их туда вместо закрытия. Включается через
+    DB_ENGINE=api_yamdb.db.postgresql; параметры пула —
+    DATABASES[alias]['POOL']."""
+    creation_class = DatabaseCreation
+
+    @property
+    def pool(self):
+        return get_pool(self.alias, self.settings_dict)
+
+    def get_new_connection(self, conn_params):
+        connection = self.pool.acquire(
+            lambda: super(DatabaseWrapper, self).get_new_connection(
+                conn_params
+            ),
+            self.settings_dict.get('CONN_HEALTH_CHECKS'),
+        )
+        self.isolation_level = self.settings_dict['OPTIONS'].get(
+            'isolation_level', connection.isolation_level
+        )
+        return connection
+
+    def _close(self):
+        if self.connection is None:
+            return
+        # Соединение, закрываемое внутри atomic, остаётся у обёртки
+        # до отката, поэтому в пул его возвращать нельзя.
+        self.pool.release(self.connection,
+                          discard=self.in_atomic_block
+                          or self.errors_occurred)
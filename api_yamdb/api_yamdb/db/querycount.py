@@ -0,0 +1,21 @@
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+
+HEADER = 'X-DB-Queries'
+
+
+class QueryCountMiddleware:
+    """Количество SQL-запросов в заголовке ответа X-DB-Queries.
+    Нужен бенчмаркам (benchmarks/run.py); включается QUERY_COUNT_HEADER,
+    иначе не подключается вовсе. Запросы считает
+    QueryInstrumentationMiddleware (request.query_log)."""
+
+    def __init__(self, get_response):
+        if not settings.QUERY_COUNT_HEADER:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+
+    def __call__(self, request):
+        response = self.get_response(request)
+        response[HEADER] = str(request.query_log.count)
+        return response
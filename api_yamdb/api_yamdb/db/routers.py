@@ -0,0 +1,91 @@
+import json
+import random
+from base64 import urlsafe_b64decode
+from binascii import Error as BinasciiError
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.core.cache import cache
+
+PIN_KEY = 'replica-pin:{}'
+SAFE_METHODS = ('GET', 'HEAD', 'OPTIONS')
+
+# База для чтения в текущем запросе. Реплика выбирается один раз на
+# запрос, чтобы COUNT, страница и prefetch видели одно состояние данных.
+# None — основная база, в том числе вне запроса (команды manage.py,
+# фоновые задачи).
+read_database = ContextVar('read_database', default=None)
+
+
+def read_from_primary():
+    """Чтение с основной базы до конца текущего запроса."""
+    read_database.set(None)
+
+
+def get_identity(request):
+    """Пользователь из JWT или None для анонимного клиента. Подпись
+    токена здесь не проверяется: от идентичности зависит только выбор
+    базы для чтения, а аутентификацию по-прежнему выполняет DRF.
+    Анонимные клиенты не закрепляются: за nginx у всех них один адрес,
+    а их записи (регистрация, токен) они сами не читают."""
+    header = request.META.get('HTTP_AUTHORIZATION', '')
+    parts = header.split()
+    if len(parts) != 2 or parts[0] != 'Bearer':
+        return None
+    try:
+        payload = parts[1].split('.')[1]
+        claims = json.loads(urlsafe_b64decode(
+            payload + '=' * (-len(payload) % 4)
+        ))
+        return f'user:{claims["user_id"]}'
+    except (IndexError, KeyError, TypeError, ValueError, BinasciiError):
+        return None
+
+
+class ReplicaRoutingMiddleware:
+    """Выбор базы для чтения на время запроса.
+
+    Безопасные запросы читают с одной случайной реплики, остальные — с
+    основной базы. После записи пользователь на REPLICA_STICKY_SECONDS
+    закрепляется за основной базой, чтобы сразу видеть свой отзыв, даже
+    если реплика отстаёт. Ответы, зависящие от недавно изменённых
+    данных, api.cache тоже читает с основной базы (read_from_primary).
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        if not settings.REPLICA_DATABASES:
+            return self.get_response(request)
+        identity = get_identity(request)
+        key = identity and PIN_KEY.format(identity)
+        safe = request.method in SAFE_METHODS
+        alias = None
+        if safe and (key is None or cache.get(key) is None):
+            alias = random.choice(settings.REPLICA_DATABASES)
+        token = read_database.set(alias)
+        try:
+            response = self.get_response(request)
+        finally:
+            read_database.reset(token)
+        if key is not None and not safe and response.status_code < 400:
+            cache.set(key, True, settings.REPLICA_STICKY_SECONDS)
+        return response
+
+
+class ReplicaRouter:
+    """Чтение с реплик REPLICA_DATABASES, запись и миграции — только
+    в основную базу default."""
+
+    def db_for_read(self, model, **hints):
+        return read_database.get() or 'default'
+
+    def db_for_write(self, model, **hints):
+        return 'default'
+
+    def allow_relation(self, obj1, obj2, **hints):
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        return db == 'default'
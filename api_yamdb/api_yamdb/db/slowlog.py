@@ -0,0 +1,254 @@
+"""Журнал медленных SQL-запросов.
+
+SlowQueryMiddleware подписывается на журнал запросов request.query_log
+(api_yamdb.db.instrumentation), который замеряет каждый запрос.
+Запросы дольше SLOW_QUERY_LOG['THRESHOLD_MS'] запоминаются вместе с
+представлением и сериализатором, из которых они выполнены (ищутся по
+стеку только для медленных запросов). После ответа записи уходят в
+фоновый поток: он получает план EXPLAIN (без ANALYZE, то есть не
+выполняя запрос повторно) и дописывает строку JSON в
+SLOW_QUERY_LOG['FILE']. Отчёт по отпечаткам нормализованного SQL строит
+команда slow_query_report.
+"""
+import hashlib
+import json
+import os
+import queue
+import re
+import sys
+import threading
+import time
+from collections import Counter
+
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import DatabaseError, connections
+from rest_framework.serializers import BaseSerializer
+from rest_framework.views import APIView
+
+STRING = re.compile(r"'(?:[^']|'')*'")
+NUMBER = re.compile(r'\b\d+(?:\.\d+)?\b')
+PLACEHOLDER = re.compile(r'%s|\?')
+IN_LIST = re.compile(r'\(\s*\?(?:\s*,\s*\?)*\s*\)')
+SPACES = re.compile(r'\s+')
+MAX_FRAMES = 60
+EXPLAINABLE = ('SELECT', 'INSERT', 'UPDATE', 'DELETE', 'WITH')
+
+
+def normalize(sql):
+    """SQL без значений: литералы и параметры заменены на ?, списки
+    IN (?, ?, ...) свёрнуты, чтобы запросы с разным числом значений
+    давали один отпечаток."""
+    sql = STRING.sub('?', sql)
+    sql = NUMBER.sub('?', sql)
+    sql = PLACEHOLDER.sub('?', sql)
+    sql = IN_LIST.sub('(...)', sql)
+    return SPACES.sub(' ', sql).strip()
+
+
+def fingerprint(normalized):
+    return hashlib.sha1(normalized.encode()).hexdigest()[:12]
+
+
+def params_shape(params, many):
+    """Типы параметров без значений; для executemany — число наборов
+    и форма первого."""
+    if many:
+        params = list(params)
+        return {'sets': len(params),
+                'first': params_shape(params[0], False) if params else []}
+    if isinstance(params, dict):
+        return {key: type(value).__name__ for key, value in params.items()}
+    return [type(value).__name__ for value in params or ()]
+
+
+def origin():
+    """Ближайшие по стеку сериализатор и представление DRF."""
+    view = serializer = None
+    frame = sys._getframe(2)
+    for _ in range(MAX_FRAMES):
+        if frame is None or view is not None:
+            break
+        instance = frame.f_locals.get('self')
+        if serializer is None and isinstance(instance, BaseSerializer):
+            serializer = type(instance).__name__
+        elif isinstance(instance, APIView):
+            request = getattr(instance, 'request', None)
+            action = (getattr(instance, 'action', None)
+                      or getattr(request, 'method', '').lower())
+            view = f'{type(instance).__name__}.{action}'
+        frame = frame.f_back
+    return view, serializer
+
+
+class SlowQueryRecorder:
+    """Наблюдатель request.query_log: медленные запросы текущего
+    HTTP-запроса."""
+
+    def __init__(self, threshold_ms):
+        self.threshold = threshold_ms / 1000
+        self.entries = []
+
+    def __call__(self, sql, params, many, context, seconds):
+        if seconds < self.threshold:
+            return
+        view, serializer = origin()
+        self.entries.append({
+            'ms': round(seconds * 1000, 3),
+            'alias': context['connection'].alias,
+            'view': view,
+            'serializer': serializer,
+            'sql': sql,
+            'params': None if many else params,
+            'params_shape': params_shape(params, many),
+        })
+
+
+def explain(alias, sql, params):
+    """План запроса без его выполнения."""
+    connection = connections[alias]
+    if connection.vendor == 'postgresql':
+        prefix = connection.ops.explain_query_prefix(analyze=False)
+    else:
+        prefix = connection.ops.explain_query_prefix()
+    with connection.cursor() as cursor:
+        cursor.execute(f'{prefix} {sql}', params)
+        return '\n'.join(' '.join(str(value) for value in row)
+                         for row in cursor.fetchall())
+
+
+def write_entry(entry):
+    """Строка журнала; при превышении MAX_BYTES журнал переименовывается
+    в <FILE>.1."""
+    path = settings.SLOW_QUERY_LOG['FILE']
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    try:
+        if os.path.getsize(path) > settings.SLOW_QUERY_LOG['MAX_BYTES']:
+            os.replace(path, f'{path}.1')
+    except FileNotFoundError:
+        pass
+    with open(path, 'a', encoding='utf-8') as file:
+        file.write(json.dumps(entry, ensure_ascii=False, default=str) + '\n')
+
+
+def process(entry):
+    params = entry.pop('params')
+    normalized = normalize(entry['sql'])
+    entry['normalized'] = normalized
+    entry['fingerprint'] = fingerprint(normalized)
+    entry['plan'] = None
+    if (settings.SLOW_QUERY_LOG['EXPLAIN'] and params is not None
+            and normalized.upper().startswith(EXPLAINABLE)):
+        try:
+            entry['plan'] = explain(entry['alias'], entry['sql'], params)
+        except DatabaseError as error:
+            entry['plan'] = f'EXPLAIN не выполнен: {error}'
+    try:
+        write_entry(entry)
+    except OSError:
+        pass
+
+
+class Explainer:
+    """Фоновый поток записи журнала. Соединение с базой у потока своё,
+    поэтому EXPLAIN не задерживает ответы."""
+
+    def __init__(self):
+        self.queue = queue.Queue(maxsize=1000)
+        self.thread = None
+        self.lock = threading.Lock()
+
+    def put(self, entry):
+        with self.lock:
+            # Поток перезапускается, если упал или процесс форкнулся.
+            if self.thread is None or not self.thread.is_alive():
+                self.thread = threading.Thread(target=self.run, daemon=True,
+                                               name='slow-query-explainer')
+                self.thread.start()
+        try:
+            self.queue.put_nowait(entry)
+        except queue.Full:
+            pass
+
+    def run(self):
+        while True:
+            entry = self.queue.get()
+            try:
+                process(entry)
+            finally:
+                self.queue.task_done()
+                if self.queue.empty():
+                    connections.close_all()
+
+    def wait(self):
+        """Ожидание записи всех поставленных в очередь строк."""
+        self.queue.join()
+
+
+explainer = Explainer()
+
+
+class SlowQueryMiddleware:
+    """Сбор медленных запросов. Отключается SLOW_QUERY_LOG['ENABLED']."""
+
+    def __init__(self, get_response):
+        if not settings.SLOW_QUERY_LOG['ENABLED']:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+
+    def __call__(self, request):
+        recorder = SlowQueryRecorder(settings.SLOW_QUERY_LOG['THRESHOLD_MS'])
+        request.query_log.observe(recorder)
+        response = self.get_response(request)
+        for entry in recorder.entries:
+            explainer.put({
+                'time': time.strftime('%Y-%m-%dT%H:%M:%S%z'),
+                'method': request.method,
+                'path': request.path,
+                'status': response.status_code,
+                **entry,
+            })
+        return response
+
+
+def read_entries(path):
+    """Строки журнала и его предыдущей части <path>.1."""
+    for name in (f'{path}.1', path):
+        if not os.path.exists(name):
+            continue
+        with open(name, encoding='utf-8') as file:
+            for line in file:
+                try:
+                    yield json.loads(line)
+                except ValueError:
+                    continue
+
+
+def aggregate(entries):
+    """Сводка по отпечаткам: количество, суммарное, среднее и
+    максимальное время, представления и сериализаторы, последний
+    план."""
+    groups = {}
+    for entry in entries:
+        group = groups.setdefault(entry['fingerprint'], {
+            'fingerprint': entry['fingerprint'],
+            'normalized': entry['normalized'],
+            'count': 0,
+            'total_ms': 0.0,
+            'max_ms': 0.0,
+            'views': Counter(),
+            'serializers': Counter(),
+        })
+        group['count'] += 1
+        group['total_ms'] += entry['ms']
+        group['max_ms'] = max(group['max_ms'], entry['ms'])
+        group['views'][entry.get('view') or entry.get('path')] += 1
+        if entry.get('serializer'):
+            group['serializers'][entry['serializer']] += 1
+        group['params_shape'] = entry.get('params_shape')
+        if entry.get('plan'):
+            group['plan'] = entry['plan']
+    for group in groups.values():
+        group['total_ms'] = round(group['total_ms'], 3)
+        group['mean_ms'] = round(group['total_ms'] / group['count'], 3)
+    return list(groups.values())
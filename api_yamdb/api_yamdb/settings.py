@@ -1,4 +1,5 @@
 import os
+import tempfile
 
 from dotenv import load_dotenv
 
@@ -20,16 +21,25 @@ INSTALLED_APPS = [
     'django.contrib.sessions',
     'django.contrib.messages',
     'django.contrib.staticfiles',
+    'django.contrib.postgres',
     'django_filters',
     'rest_framework',
     'rest_framework.authtoken',
-    'reviews',
+    'reviews.apps.ReviewsConfig',
     'users',
-    'api',
+    'api.apps.ApiConfig',
+    'mailqueue.apps.MailqueueConfig',
 
 ]
 
 MIDDLEWARE = [
+    # Одна обёртка SQL-запросов для метрик, X-DB-Queries, профилирования
+    # и журнала медленных запросов; должна стоять перед ними.
+    'api_yamdb.db.instrumentation.QueryInstrumentationMiddleware',
+    'api.metrics.MetricsMiddleware',
+    'api_yamdb.db.querycount.QueryCountMiddleware',
+    'api.profiling.ProfilingMiddleware',
+    'api_yamdb.db.slowlog.SlowQueryMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -37,8 +47,57 @@ MIDDLEWARE = [
     'django.contrib.auth.middleware.AuthenticationMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
+    'api_yamdb.db.routers.ReplicaRoutingMiddleware',
 ]
 
+# Заголовок X-DB-Queries для бенчмарков (benchmarks/run.py).
+QUERY_COUNT_HEADER = os.getenv(
+    'QUERY_COUNT_HEADER', default='false'
+).lower() in ('1', 'true', 'yes')
+
+# Метрики Prometheus на /metrics (api/metrics.py). DIR — общий для
+# воркеров gunicorn каталог; файлы завершившихся воркеров переносятся
+# в счётчики живых автоматически.
+METRICS = {
+    'ENABLED': os.getenv(
+        'METRICS_ENABLED', default='true'
+    ).lower() in ('1', 'true', 'yes'),
+    'DIR': os.getenv('METRICS_DIR', default=os.path.join(
+        tempfile.gettempdir(), 'yamdb-metrics'
+    )),
+    'FLUSH_INTERVAL': float(os.getenv('METRICS_FLUSH_INTERVAL', default=5)),
+    'TOKEN': os.getenv('METRICS_TOKEN', default=''),
+}
+
+# Профилирование запроса администратора (api/profiling.py): заголовок
+# X-Profile: 1 или ?_profile=1, хранятся последние KEEP профилей.
+PROFILING = {
+    'ENABLED': os.getenv(
+        'PROFILING_ENABLED', default='true'
+    ).lower() in ('1', 'true', 'yes'),
+    'DIR': os.getenv('PROFILING_DIR',
+                     default=os.path.join(BASE_DIR, 'profiles')),
+    'KEEP': int(os.getenv('PROFILING_KEEP', default=50)),
+    'TOP': int(os.getenv('PROFILING_TOP', default=40)),
+}
+
+# Журнал медленных SQL-запросов с планами EXPLAIN
+# (api_yamdb/db/slowlog.py), отчёт — manage.py slow_query_report.
+SLOW_QUERY_LOG = {
+    'ENABLED': os.getenv(
+        'SLOW_QUERY_LOG_ENABLED', default='true'
+    ).lower() in ('1', 'true', 'yes'),
+    'THRESHOLD_MS': float(os.getenv('SLOW_QUERY_THRESHOLD_MS', default=100)),
+    'EXPLAIN': os.getenv(
+        'SLOW_QUERY_EXPLAIN', default='true'
+    ).lower() in ('1', 'true', 'yes'),
+    'FILE': os.getenv('SLOW_QUERY_LOG_FILE', default=os.path.join(
+        BASE_DIR, 'logs', 'slow_queries.jsonl'
+    )),
+    'MAX_BYTES': int(os.getenv('SLOW_QUERY_LOG_MAX_BYTES',
+                               default=50 * 1024 * 1024)),
+}
+
 ROOT_URLCONF = 'api_yamdb.urls'
 
 TEMPLATES_DIR = os.path.join(BASE_DIR, "templates")
@@ -70,10 +129,84 @@ DATABASES = {
         'USER': os.getenv('POSTGRES_USER', default='postgres'),
         'PASSWORD': os.getenv('POSTGRES_PASSWORD', default='postgres'),
         'HOST': os.getenv('DB_HOST', default='db'),
-        'PORT': os.getenv('DB_PORT', default='5432')
+        'PORT': os.getenv('DB_PORT', default='5432'),
+        # Постоянные соединения и их проверка при первом обращении
+        # в запросе (api_yamdb.db.health); 0 — соединение на каждый
+        # запрос.
+        'CONN_MAX_AGE': int(os.getenv('DB_CONN_MAX_AGE', default=60)),
+        'CONN_HEALTH_CHECKS': os.getenv(
+            'DB_CONN_HEALTH_CHECKS', default='true'
+        ).lower() in ('1', 'true', 'yes'),
+        # Только для DB_ENGINE=api_yamdb.db.postgresql.
+        'POOL': {
+            'MAX_SIZE': int(os.getenv('DB_POOL_MAX_SIZE', default=4)),
+            'IDLE_TIMEOUT': int(os.getenv('DB_POOL_IDLE_TIMEOUT',
+                                          default=300)),
+            'TIMEOUT': int(os.getenv('DB_POOL_TIMEOUT', default=10)),
+        },
     }
 }
 
+# Реплики для чтения: DB_REPLICA_HOSTS=host1[:port],host2[:port].
+# Остальные параметры соединения совпадают с основной базой.
+REPLICA_DATABASES = []
+for number, address in enumerate(
+        filter(None, os.getenv('DB_REPLICA_HOSTS', default='').split(',')),
+        start=1):
+    host, _, port = address.strip().partition(':')
+    alias = f'replica{number}'
+    DATABASES[alias] = {
+        **DATABASES['default'],
+        'HOST': host,
+        'PORT': port or DATABASES['default']['PORT'],
+        'TEST': {'MIRROR': 'default'},
+    }
+    REPLICA_DATABASES.append(alias)
+DATABASE_ROUTERS = ['api_yamdb.db.routers.ReplicaRouter']
+REPLICA_STICKY_SECONDS = int(os.getenv('DB_REPLICA_STICKY_SECONDS',
+                                       default=5))
+
+# Cache
+
+CACHES = {
+    'default': {
+        'BACKEND': os.getenv(
+            'CACHE_BACKEND',
+            default='django.core.cache.backends.locmem.LocMemCache'),
+        'LOCATION': os.getenv('CACHE_LOCATION', default='yamdb'),
+    }
+}
+
+# Кэши, видимые только своему процессу: версии групп в них не доходят
+# до воркеров gunicorn из команд manage.py и других воркеров.
+PROCESS_LOCAL_CACHES = (
+    'django.core.cache.backends.locmem.LocMemCache',
+    'django.core.cache.backends.dummy.DummyCache',
+)
+
+# ETag и кэш ответов API (api/cache.py). Версии групп должны лежать в
+# общем для всех процессов кэше, поэтому с кэшем в памяти процесса они
+# по умолчанию выключены, а явное включение не проходит проверку
+# api.E001.
+API_RESPONSE_CACHE = {
+    'ALIAS': 'default',
+    'ENABLED': os.getenv(
+        'API_RESPONSE_CACHE_ENABLED',
+        default=str(CACHES['default']['BACKEND'] not in PROCESS_LOCAL_CACHES)
+    ).lower() in ('1', 'true', 'yes'),
+    'TIMEOUT': int(os.getenv('API_RESPONSE_CACHE_TIMEOUT', default=300)),
+}
+
+JWT_USER_CACHE = {
+    'ALIAS': 'default',
+    'TIMEOUT': int(os.getenv('JWT_USER_CACHE_TIMEOUT', default=60)),
+}
+
+LEADERBOARD = {
+    'SIZE': int(os.getenv('LEADERBOARD_SIZE', default=100)),
+    'MIN_REVIEWS': int(os.getenv('LEADERBOARD_MIN_REVIEWS', default=3)),
+}
+
 # Password validation
 
 AUTH_PASSWORD_VALIDATORS = [
@@ -110,11 +243,31 @@ USE_TZ = True
 # Rest_framework
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': [
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
+        'api.authentication.CachedJWTAuthentication',
     ],
     'DEFAULT_PAGINATION_CLASS': 'rest_framework.'
                                 'pagination.PageNumberPagination',
     'PAGE_SIZE': 5,
+    'DEFAULT_THROTTLE_RATES': {
+        'signup': os.getenv('THROTTLE_SIGNUP', default='5/hour'),
+        'token': os.getenv('THROTTLE_TOKEN', default='20/min'),
+        'token_username': os.getenv('THROTTLE_TOKEN_USERNAME',
+                                    default='10/min'),
+        'review_create': os.getenv('THROTTLE_REVIEW_CREATE',
+                                   default='30/hour'),
+        'comment_create': os.getenv('THROTTLE_COMMENT_CREATE',
+                                    default='120/hour'),
+    },
+    # api.throttling.LocMemWindowStore — счётчики в памяти процесса,
+    # api.throttling.CacheWindowStore — в кэше THROTTLE_CACHE_ALIAS.
+    'THROTTLE_STORE': os.getenv('THROTTLE_STORE',
+                                default='api.throttling.CacheWindowStore'),
+    'THROTTLE_CACHE_ALIAS': 'default',
+    # Сколько обратных прокси стоит перед приложением: адрес клиента
+    # берётся из X-Forwarded-For на столько позиций от конца, а адреса
+    # левее, которые мог подставить сам клиент, не учитываются. 0 —
+    # заголовок игнорируется, используется REMOTE_ADDR.
+    'NUM_PROXIES': int(os.getenv('NUM_PROXIES', default=0)),
 }
 
 # Static files (CSS, JavaScript, Images)
@@ -130,3 +283,12 @@ AUTH_USER_MODEL = 'users.User'
 
 EMAIL_BACKEND = 'django.core.mail.backends.filebased.EmailBackend'
 EMAIL_FILE_PATH = os.path.join(BASE_DIR, 'sent_emails')
+
+MAIL_QUEUE = {
+    'BATCH_SIZE': int(os.getenv('MAIL_QUEUE_BATCH_SIZE', default=50)),
+    'MAX_ATTEMPTS': int(os.getenv('MAIL_QUEUE_MAX_ATTEMPTS', default=5)),
+    'BACKOFF': int(os.getenv('MAIL_QUEUE_BACKOFF', default=30)),
+    'MAX_BACKOFF': int(os.getenv('MAIL_QUEUE_MAX_BACKOFF', default=3600)),
+    'LEASE': int(os.getenv('MAIL_QUEUE_LEASE', default=300)),
+    'POLL_INTERVAL': float(os.getenv('MAIL_QUEUE_POLL_INTERVAL', default=5)),
+}
@@ -0,0 +1,18 @@
+from django.contrib import admin
+
+from .models import OutboundEmail
+
+
+class OutboundEmailAdmin(admin.ModelAdmin):
+    list_display = ('to',
+                    'subject',
+                    'status',
+                    'attempts',
+                    'next_attempt_at',
+                    'sent_at',
+                    )
+    search_fields = ('to',)
+    list_filter = ('status',)
+
+
+admin.site.register(OutboundEmail, OutboundEmailAdmin)
@@ -0,0 +1,39 @@
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from mailqueue.queue import send_batch
+
+
+class Command(BaseCommand):
+    """Обработчик очереди исходящих писем."""
+    help = ('Отправляет письма из очереди пачками с повторными '
+            'попытками и нарастающей паузой')
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size', type=int,
+            default=settings.MAIL_QUEUE['BATCH_SIZE'],
+            help='Количество писем в одной пачке'
+        )
+        parser.add_argument(
+            '--loop', action='store_true',
+            help='Работать постоянно, опрашивая очередь'
+        )
+        parser.add_argument(
+            '--interval', type=float,
+            default=settings.MAIL_QUEUE['POLL_INTERVAL'],
+            help='Пауза между опросами пустой очереди, секунд'
+        )
+
+    def handle(self, *args, **options):
+        while True:
+            sent, failed = send_batch(options['batch_size'])
+            if sent or failed:
+                self.stdout.write(
+                    f'Отправлено: {sent}, с ошибкой: {failed}'
+                )
+            if not options['loop']:
+                return
+            if not sent and not failed:
+                time.sleep(options['interval'])
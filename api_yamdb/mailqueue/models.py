@@ -0,0 +1,39 @@
+from django.db import models
+from django.utils import timezone
+
+
+class OutboundEmail(models.Model):
+    """Письмо в очереди на отправку. Запрос только сохраняет письмо,
+    отправляет его команда send_queued_mail."""
+    PENDING = 'pending'
+    SENT = 'sent'
+    FAILED = 'failed'
+    STATUSES = (
+        (PENDING, 'Ожидает отправки'),
+        (SENT, 'Отправлено'),
+        (FAILED, 'Не отправлено'),
+    )
+
+    to = models.EmailField('Получатель', max_length=254)
+    from_email = models.CharField('Отправитель', max_length=254, blank=True)
+    subject = models.CharField('Тема', max_length=255)
+    body = models.TextField('Текст')
+    status = models.CharField('Статус', max_length=16, choices=STATUSES,
+                              default=PENDING)
+    attempts = models.PositiveSmallIntegerField('Попыток', default=0)
+    next_attempt_at = models.DateTimeField('Следующая попытка',
+                                           default=timezone.now)
+    last_error = models.TextField('Последняя ошибка', blank=True)
+    created_at = models.DateTimeField('Создано', auto_now_add=True)
+    sent_at = models.DateTimeField('Отправлено', null=True, blank=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['status', 'next_attempt_at'],
+                         name='outbound_email_due_idx'),
+        ]
+        verbose_name = 'Письмо'
+        verbose_name_plural = 'Очередь писем'
+
+    def __str__(self):
+        return f'{self.to}: {self.subject}'
@@ -0,0 +1,94 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.mail import EmailMessage, get_connection
+from django.db import connection, transaction
+from django.db.models import F
+from django.utils import timezone
+
+from .models import OutboundEmail
+
+
+def enqueue(subject, body, to, from_email=''):
+    """Постановка письма в очередь: одна вставка в рамках запроса."""
+    return OutboundEmail.objects.create(
+        subject=subject, body=body, to=to, from_email=from_email
+    )
+
+
+def backoff_delay(attempts):
+    """Пауза перед следующей попыткой: растёт вдвое с каждой
+    неудачей, но не больше MAX_BACKOFF."""
+    config = settings.MAIL_QUEUE
+    return timedelta(seconds=min(
+        config['BACKOFF'] * 2 ** (attempts - 1), config['MAX_BACKOFF']
+    ))
+
+
+def claim_batch(size):
+    """Выбор писем, срок отправки которых наступил. Выбранные письма
+    откладываются на LEASE секунд, поэтому параллельный обработчик их
+    не возьмёт, а после падения обработчика они вернутся в очередь."""
+    now = timezone.now()
+    due = OutboundEmail.objects.filter(
+        status=OutboundEmail.PENDING, next_attempt_at__lte=now
+    ).order_by('next_attempt_at', 'id')
+    with transaction.atomic():
+        ids = list(due.select_for_update(
+            skip_locked=connection.features.has_select_for_update_skip_locked
+        ).values_list('id', flat=True)[:size])
+        OutboundEmail.objects.filter(id__in=ids).update(
+            next_attempt_at=now + timedelta(
+                seconds=settings.MAIL_QUEUE['LEASE']
+            )
+        )
+    return list(OutboundEmail.objects.filter(id__in=ids).order_by('id'))
+
+
+def mark_failed(email, error):
+    """Учёт неудачной попытки: новая попытка позже или окончательный
+    отказ после MAX_ATTEMPTS."""
+    email.attempts += 1
+    email.last_error = str(error)
+    if email.attempts >= settings.MAIL_QUEUE['MAX_ATTEMPTS']:
+        email.status = OutboundEmail.FAILED
+    else:
+        email.next_attempt_at = timezone.now() + backoff_delay(email.attempts)
+    email.save(update_fields=('attempts', 'last_error', 'status',
+                              'next_attempt_at'))
+
+
+def send_batch(size):
+    """Отправка пачки писем через одно соединение с почтовым сервером.
+    Возвращает количество отправленных и неотправленных писем."""
+    emails = claim_batch(size)
+    if not emails:
+        return 0, 0
+    sent, failed = [], 0
+    try:
+        mail_connection = get_connection()
+        mail_connection.open()
+    except Exception as error:
+        for email in emails:
+            mark_failed(email, error)
+        return 0, len(emails)
+    try:
+        for email in emails:
+            message = EmailMessage(
+                email.subject, email.body, email.from_email or None,
+                [email.to], connection=mail_connection
+            )
+            try:
+                message.send()
+            except Exception as error:
+                mark_failed(email, error)
+                failed += 1
+            else:
+                sent.append(email.id)
+    finally:
+        mail_connection.close()
+    OutboundEmail.objects.filter(id__in=sent).update(
+        status=OutboundEmail.SENT, sent_at=timezone.now(),
+        attempts=F('attempts') + 1
+    )
+    return len(sent), failed
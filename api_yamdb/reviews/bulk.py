@@ -0,0 +1,77 @@
+import csv
+import io
+from contextlib import contextmanager
+from itertools import islice
+
+from django.core.management.color import no_style
+from django.db import connection, models
+from django.utils import timezone
+
+COPY_NULL = r'\N'
+
+
+def batches(rows, size):
+    """Разбиение потока на списки по size элементов."""
+    while True:
+        batch = list(islice(rows, size))
+        if not batch:
+            return
+        yield batch
+
+
+@contextmanager
+def keep_dates(model):
+    """Отключение auto_now_add, чтобы сохранить переданные даты."""
+    fields = [field for field in model._meta.concrete_fields
+              if getattr(field, 'auto_now_add', False)]
+    for field in fields:
+        field.auto_now_add = False
+    try:
+        yield
+    finally:
+        for field in fields:
+            field.auto_now_add = True
+
+
+def field_default(field):
+    """Значение поля по умолчанию. COPY не знает о значениях Django,
+    поэтому даты auto_now_add заполняются текущим временем."""
+    if isinstance(field, models.DateTimeField):
+        return timezone.now()
+    if isinstance(field, models.DateField):
+        return timezone.now().date()
+    return field.get_default()
+
+
+def copy_rows(model, attnames, rows):
+    """Загрузка строк (последовательностей значений в порядке attnames)
+    через COPY FROM STDIN. Конфликты не пропускаются, поэтому строки
+    должны быть новыми."""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    for row in rows:
+        writer.writerow(COPY_NULL if value is None else value
+                        for value in row)
+    buffer.seek(0)
+    fields = {field.attname: field
+              for field in model._meta.concrete_fields}
+    columns = ', '.join(
+        connection.ops.quote_name(fields[attname].column)
+        for attname in attnames
+    )
+    with connection.cursor() as cursor:
+        cursor.copy_expert(
+            f'COPY {connection.ops.quote_name(model._meta.db_table)} '
+            f'({columns}) FROM STDIN '
+            f"WITH (FORMAT csv, NULL '{COPY_NULL}')",
+            buffer,
+        )
+
+
+def reset_sequences(models):
+    """Сдвиг последовательностей id после вставки явных ключей."""
+    statements = connection.ops.sequence_reset_sql(no_style(), models)
+    if statements:
+        with connection.cursor() as cursor:
+            for statement in statements:
+                cursor.execute(statement)
@@ -0,0 +1,318 @@
+"""Синтетический набор данных для проверки под нагрузкой.
+
+Распределения приближены к реальным: количество отзывов на произведение
+подчиняется закону Ципфа (немного очень популярных произведений и
+длинный хвост), у произведения от одного до четырёх жанров, популярные
+жанры и категории встречаются чаще, длина веток комментариев —
+распределение Парето.
+
+Рейтинг и статистика произведения считаются при генерации и пишутся
+вместе с ним, поэтому пересчитывать их по таблице отзывов не нужно.
+Идентификаторы произведений и отзывов выдаются заранее, а у каждого
+произведения свой генератор случайных чисел: произведения можно писать
+параллельно несколькими процессами, набор от этого не меняется.
+"""
+import random
+import re
+from datetime import date, timedelta
+from itertools import accumulate
+from multiprocessing import Pool
+
+from django.db import connections, transaction
+from users.models import User
+
+from .bulk import copy_rows, field_default, keep_dates, reset_sequences
+from .models import (Categories, Comment, Genres, GenreTitle, LeaderboardEntry,
+                     Review, Title, TitleStats)
+
+WORDS = (
+    'сюжет', 'герой', 'финал', 'музыка', 'атмосфера', 'режиссёр', 'автор',
+    'история', 'персонаж', 'диалоги', 'темп', 'развязка', 'идея', 'мир',
+    'отлично', 'скучно', 'неожиданно', 'сильно', 'слабо', 'красиво',
+    'затянуто', 'живо', 'глубоко', 'смешно', 'грустно', 'честно',
+)
+GENRE_COUNTS = (1, 1, 2, 2, 2, 3, 4)
+# Параметр распределения Парето для длины ветки комментариев.
+THREAD_SHAPE = 1.5
+MAX_THREAD = 2000
+START_DATE = date(2000, 1, 1)
+DATE_SPAN = 365 * 22
+COMMENT_DELAY = 60
+DATES = [START_DATE + timedelta(days)
+         for days in range(DATE_SPAN + COMMENT_DELAY)]
+SCORES = range(1, 11)
+# Произведений в одном задании процесса-генератора.
+CHUNK_SIZE = 2000
+
+
+def zipf_weights(size, skew):
+    return [1 / rank ** skew for rank in range(1, size + 1)]
+
+
+def skewed_counts(total, buckets, cap, skew, rng):
+    """Разбиение total по buckets корзинам по закону Ципфа, не больше
+    cap в корзине. Ранги перемешиваются, чтобы популярные произведения
+    не шли подряд; остаток от округления и ограничения раздаётся
+    корзинам, где ещё есть место."""
+    total = min(total, buckets * cap)
+    weights = zipf_weights(buckets, skew)
+    rng.shuffle(weights)
+    scale = total / sum(weights)
+    counts = [min(int(weight * scale), cap) for weight in weights]
+    left = total - sum(counts)
+    while left > 0:
+        free = [index for index, value in enumerate(counts) if value < cap]
+        share = max(left // len(free), 1)
+        for index in free:
+            added = min(share, cap - counts[index], left)
+            counts[index] += added
+            left -= added
+            if not left:
+                break
+    return counts
+
+
+def next_id(model):
+    last = model.objects.order_by('-pk').values_list('pk', flat=True).first()
+    return (last or 0) + 1
+
+
+class Writer:
+    """Буферы строк по моделям. Заполненный буфер сбрасывает все буферы
+    в порядке регистрации моделей, поэтому внешние ключи ссылаются
+    только на уже записанные строки."""
+
+    def __init__(self, batch_size, use_copy):
+        self.batch_size = batch_size
+        self.use_copy = use_copy
+        self.buffers = {}
+        self.written = {}
+
+    def register(self, model, attnames):
+        self.buffers[model] = (attnames, [])
+        self.written[model._meta.model_name] = 0
+
+    def add(self, model, row):
+        rows = self.buffers[model][1]
+        rows.append(row)
+        if len(rows) >= self.batch_size:
+            self.flush()
+
+    def flush(self):
+        with transaction.atomic():
+            for model, (attnames, rows) in self.buffers.items():
+                if rows:
+                    self.write(model, attnames, rows)
+                    self.written[model._meta.model_name] += len(rows)
+                    rows.clear()
+
+    def write(self, model, attnames, rows):
+        if self.use_copy:
+            copy_rows(model, attnames, rows)
+            return
+        # Размер пачки bulk_create выбирает сам бэкенд: SQLite
+        # ограничивает число строк в одной вставке.
+        with keep_dates(model):
+            model.objects.bulk_create(
+                model(**dict(zip(attnames, row))) for row in rows
+            )
+
+
+def write_catalog(plan, categories, genres):
+    """Категории, жанры и пользователи."""
+    writer = Writer(plan['batch_size'], plan['use_copy'])
+    writer.register(Categories, ('id', 'name', 'slug'))
+    writer.register(Genres, ('id', 'name', 'slug'))
+    user_defaults = {field.attname: field_default(field)
+                     for field in User._meta.concrete_fields
+                     if field.attname not in ('id', 'username', 'email')}
+    user_defaults['password'] = '!'
+    writer.register(User, ('id', 'username', 'email', *user_defaults))
+
+    prefix = plan['prefix']
+    for number, pk in enumerate(plan['category_ids']):
+        writer.add(Categories, (pk, f'Категория {number}',
+                                f'{prefix}-c{number}'))
+    for number, pk in enumerate(plan['genre_ids']):
+        writer.add(Genres, (pk, f'Жанр {number}', f'{prefix}-g{number}'))
+    user_values = tuple(user_defaults.values())
+    for number in range(plan['users']):
+        writer.add(User, (plan['first_user'] + number, f'{prefix}{number}',
+                          f'{prefix}{number}@yamdb.fake', *user_values))
+    writer.flush()
+    return writer.written
+
+
+def write_title(plan, writer, number, review_id, review_count):
+    """Произведение с жанрами, статистикой, отзывами и комментариями.
+    Авторы отзывов выбираются без повторений, поэтому ограничение
+    unique_title_author соблюдается."""
+    rng = random.Random(plan['seed'] * 2 ** 40 + number)
+    draw = rng.random
+    users, first_user, texts = (plan['users'], plan['first_user'],
+                                plan['texts'])
+    title_id = plan['first_title'] + number
+
+    quality = rng.uniform(3, 9)
+    authors = rng.sample(range(users), review_count)
+    scores = [min(max(round(rng.gauss(quality, 2)), 1), 10)
+              for _ in authors]
+    threads = [min(round(plan['thread_scale']
+                         * (rng.paretovariate(THREAD_SHAPE) - 1)),
+                   MAX_THREAD)
+               for _ in authors]
+
+    category_id, = rng.choices(plan['category_ids'],
+                               cum_weights=plan['category_weights'])
+    writer.add(Title, (title_id, f'Произведение {plan["prefix"]} {number}',
+                       rng.randint(1900, 2022), rng.choice(texts),
+                       category_id, sum(scores), review_count))
+    writer.add(TitleStats, (title_id, review_count, sum(threads),
+                            sum(scores), 0,
+                            *(scores.count(score) for score in SCORES)))
+    genres_count = min(rng.choice(GENRE_COUNTS), len(plan['genre_ids']))
+    title_genres = set()
+    while len(title_genres) < genres_count:
+        title_genres.update(rng.choices(plan['genre_ids'],
+                                        cum_weights=plan['genre_weights']))
+    for genre_id in title_genres:
+        writer.add(GenreTitle, (title_id, genre_id))
+
+    for author, score, thread in zip(authors, scores, threads):
+        day = int(draw() * DATE_SPAN)
+        writer.add(Review, (review_id, title_id, first_user + author,
+                            texts[int(draw() * len(texts))], score,
+                            DATES[day]))
+        for _ in range(thread):
+            writer.add(Comment, (
+                review_id, first_user + int(draw() * users),
+                texts[int(draw() * len(texts))],
+                DATES[day + int(draw() * COMMENT_DELAY)],
+            ))
+        review_id += 1
+
+
+def write_titles(task):
+    """Задание процесса-генератора: произведения подряд начиная с
+    номера start. Возвращает количество записанных строк по моделям."""
+    plan, start, review_id, review_counts = task
+    writer = Writer(plan['batch_size'], plan['use_copy'])
+    writer.register(Title, ('id', 'name', 'year', 'description',
+                            'category_id', 'rating_sum', 'rating_count'))
+    writer.register(TitleStats, ('title_id', 'review_count',
+                                 'comment_count', 'score_sum',
+                                 *(f'score_{score}' for score in range(11))))
+    writer.register(GenreTitle, ('titles_id', 'genry_id'))
+    writer.register(Review, ('id', 'title_id', 'author_id', 'text',
+                             'score', 'pub_date'))
+    writer.register(Comment, ('review_id', 'author_id', 'text', 'pub_date'))
+    for number, review_count in enumerate(review_counts, start):
+        write_title(plan, writer, number, review_id, review_count)
+        review_id += review_count
+    writer.flush()
+    return writer.written
+
+
+def plan_tasks(plan, review_counts):
+    """Разбиение произведений на задания с заранее выданными id отзывов."""
+    review_id = plan['first_review']
+    for start in range(0, len(review_counts), CHUNK_SIZE):
+        chunk = review_counts[start:start + CHUNK_SIZE]
+        yield plan, start, review_id, chunk
+        review_id += sum(chunk)
+
+
+def add_counts(total, written):
+    for name, count in written.items():
+        total[name] = total.get(name, 0) + count
+
+
+def generate_dataset(reviews, titles, users, categories=10, genres=30,
+                     comments_per_review=1.0, skew=1.0, seed=0,
+                     prefix='gen', batch_size=10000, use_copy=False,
+                     jobs=1, progress=None):
+    """Генерация набора данных. Отзывов у произведения не больше users
+    (у пары автор–произведение один отзыв). При jobs > 1 произведения
+    пишут параллельные процессы, для этого нужна база с конкурентной
+    записью (PostgreSQL). progress получает счётчики записанных строк
+    после каждого задания. Возвращает количество строк по моделям.
+
+    Рассчитано на базу без параллельной записи: идентификаторы
+    продолжают текущие максимальные, последовательности сдвигаются
+    в конце."""
+    rng = random.Random(seed)
+    first_category, first_genre = next_id(Categories), next_id(Genres)
+    plan = {
+        'seed': seed,
+        'prefix': prefix,
+        'users': users,
+        'batch_size': batch_size,
+        'use_copy': use_copy,
+        'thread_scale': comments_per_review * (THREAD_SHAPE - 1),
+        'texts': [' '.join(rng.choices(WORDS, k=rng.randint(3, 30)))
+                  .capitalize() for _ in range(1000)],
+        'category_ids': range(first_category, first_category + categories),
+        'genre_ids': range(first_genre, first_genre + genres),
+        'category_weights': list(accumulate(zipf_weights(categories,
+                                                         skew))),
+        'genre_weights': list(accumulate(zipf_weights(genres, skew))),
+        'first_user': next_id(User),
+        'first_title': next_id(Title),
+        'first_review': next_id(Review),
+    }
+    written = write_catalog(plan, categories, genres)
+    tasks = plan_tasks(plan, skewed_counts(reviews, titles, users, skew,
+                                           rng))
+    if jobs > 1:
+        # Процессы наследуют соединения при fork, каждому нужны свои.
+        connections.close_all()
+        with Pool(jobs) as pool:
+            results = pool.imap_unordered(write_titles, tasks)
+            for result in results:
+                add_counts(written, result)
+                if progress:
+                    progress(written)
+    else:
+        for task in tasks:
+            add_counts(written, write_titles(task))
+            if progress:
+                progress(written)
+    reset_sequences([Categories, Genres, User, Title, GenreTitle, Review,
+                     Comment])
+    return written
+
+
+def remove_dataset(prefix):
+    """Удаление набора generate_dataset с префиксом prefix. Отзывы,
+    комментарии и связи удаляются запросами DELETE без загрузки
+    объектов и без сигналов (в наборе могут быть миллионы строк),
+    поэтому кэш ответов после удаления сбрасывает вызывающий
+    (catalog_imported). Возвращает количество строк по моделям."""
+    pattern = re.escape(prefix)
+    titles = Title.objects.filter(name__startswith=f'Произведение {prefix} ')
+    users = User.objects.filter(username__regex=rf'^{pattern}\d+$',
+                                email__endswith='@yamdb.fake')
+    querysets = (
+        Comment.objects.filter(review__title__in=titles),
+        Review.objects.filter(title__in=titles),
+        GenreTitle.objects.filter(titles__in=titles),
+        TitleStats.objects.filter(title__in=titles),
+        LeaderboardEntry.objects.filter(title__in=titles),
+        titles,
+        User.groups.through.objects.filter(user__in=users),
+        User.user_permissions.through.objects.filter(user__in=users),
+        users,
+    )
+    removed = {}
+    with transaction.atomic():
+        for queryset in querysets:
+            removed[queryset.model.__name__] = queryset._raw_delete(
+                queryset.db
+            )
+        # Категорий и жанров немного; на них могут ссылаться другие
+        # произведения, поэтому удаляются обычным delete().
+        for model, kind in ((Categories, 'c'), (Genres, 'g')):
+            removed[model.__name__] = model.objects.filter(
+                slug__regex=rf'^{pattern}-{kind}\d+$'
+            ).delete()[0]
+    return removed
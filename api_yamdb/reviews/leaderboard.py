@@ -0,0 +1,90 @@
+from django.db import connection, transaction
+
+from .models import Genres, GenreTitle, LeaderboardEntry, Title
+
+RANKING_SQL = '''
+WITH eligible AS (
+    SELECT {title}.{id} AS title_id, {title}.{category} AS category_id,
+           {title}.{rating_sum} * 1.0 / {title}.{rating_count} AS average,
+           {title}.{rating_count} AS review_count
+    FROM {title}
+    WHERE {title}.{rating_count} >= %s
+), candidates AS (
+    SELECT %s AS scope, '' AS slug, eligible.*
+    FROM eligible
+    UNION ALL
+    SELECT %s, {category_table}.{slug}, eligible.*
+    FROM eligible
+    JOIN {category_table}
+      ON {category_table}.{id} = eligible.category_id
+    UNION ALL
+    SELECT %s, {genre_table}.{slug}, eligible.*
+    FROM eligible
+    JOIN {genre_title} ON {genre_title}.{genre_title_title} = eligible.title_id
+    JOIN {genre_table}
+      ON {genre_table}.{id} = {genre_title}.{genre_title_genre}
+), ranked AS (
+    SELECT scope, slug, title_id, average, review_count,
+           ROW_NUMBER() OVER (
+               PARTITION BY scope, slug
+               ORDER BY average DESC, review_count DESC, title_id
+           ) AS position
+    FROM candidates
+)
+SELECT scope, slug, position, title_id, average, review_count
+FROM ranked
+WHERE position <= %s
+'''
+
+
+def ranking_sql():
+    """Запрос всех разделов рейтинга с именами таблиц и столбцов
+    из моделей."""
+    quote = connection.ops.quote_name
+    category = Title._meta.get_field('category')
+    return RANKING_SQL.format(
+        title=quote(Title._meta.db_table),
+        id=quote('id'),
+        category=quote(category.column),
+        rating_sum=quote(Title._meta.get_field('rating_sum').column),
+        rating_count=quote(Title._meta.get_field('rating_count').column),
+        category_table=quote(category.related_model._meta.db_table),
+        slug=quote('slug'),
+        genre_title=quote(GenreTitle._meta.db_table),
+        genre_title_title=quote(GenreTitle._meta.get_field('titles').column),
+        genre_title_genre=quote(GenreTitle._meta.get_field('genry').column),
+        genre_table=quote(Genres._meta.db_table),
+    )
+
+
+def ranked_rows(size, min_reviews):
+    """Первые size мест каждого раздела — общего, по каждой категории
+    и по каждому жанру — одним запросом: ROW_NUMBER() нумерует
+    произведения внутри раздела по убыванию средней оценки, при
+    равенстве выше то, у кого больше отзывов. Учитываются произведения
+    не менее чем с min_reviews отзывами."""
+    with connection.cursor() as cursor:
+        cursor.execute(ranking_sql(), [
+            max(min_reviews, 1), LeaderboardEntry.SCOPE_ALL,
+            LeaderboardEntry.SCOPE_CATEGORY, LeaderboardEntry.SCOPE_GENRE,
+            size,
+        ])
+        return cursor.fetchall()
+
+
+def refresh_leaderboard(size, min_reviews):
+    """Пересчёт всех разделов рейтинга одним оконным запросом; старые
+    строки заменяются в одной транзакции, чтобы читатели не видели
+    частично собранный рейтинг. Возвращает количество записанных
+    строк."""
+    entries = [
+        LeaderboardEntry(scope=scope, slug=slug, position=position,
+                         title_id=title_id, rating=float(average),
+                         review_count=review_count)
+        for scope, slug, position, title_id, average, review_count
+        in ranked_rows(size, min_reviews)
+    ]
+    with transaction.atomic():
+        LeaderboardEntry.objects.all().delete()
+        LeaderboardEntry.objects.bulk_create(entries, batch_size=1000)
+    return len(entries)
@@ -0,0 +1,85 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from reviews.dataset import generate_dataset
+from reviews.signals import catalog_imported
+
+
+class Command(BaseCommand):
+    """Синтетический набор данных заданного размера для проверки
+    производительности. При одинаковых параметрах и --seed набор
+    получается одним и тем же."""
+    help = ('Генерирует произведения, пользователей, отзывы и комментарии '
+            'с реалистичными распределениями пачками через bulk_create '
+            'или COPY')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--reviews', type=int, default=100000,
+                            help='Количество отзывов')
+        parser.add_argument('--titles', type=int,
+                            help='Количество произведений '
+                                 '(по умолчанию reviews / 10)')
+        parser.add_argument('--users', type=int,
+                            help='Количество пользователей '
+                                 '(по умолчанию reviews / 20)')
+        parser.add_argument('--categories', type=int, default=10)
+        parser.add_argument('--genres', type=int, default=30)
+        parser.add_argument('--comments-per-review', type=float, default=1.0,
+                            help='Среднее количество комментариев к отзыву')
+        parser.add_argument('--skew', type=float, default=1.0,
+                            help='Показатель закона Ципфа для популярности')
+        parser.add_argument('--seed', type=int, default=0)
+        parser.add_argument('--prefix', default='gen',
+                            help='Префикс slug и имён пользователей, '
+                                 'разный для повторных запусков')
+        parser.add_argument('--batch-size', type=int, default=10000,
+                            help='Количество строк в одной пачке')
+        parser.add_argument('--copy', action='store_true',
+                            help='Загружать через COPY (только PostgreSQL)')
+        parser.add_argument('--jobs', type=int, default=1,
+                            help='Параллельных процессов (только '
+                                 'PostgreSQL)')
+
+    def handle(self, *args, **options):
+        if options['copy'] and connection.vendor != 'postgresql':
+            raise CommandError('--copy поддерживается только PostgreSQL')
+        if options['jobs'] > 1 and connection.vendor != 'postgresql':
+            raise CommandError('--jobs поддерживается только PostgreSQL')
+        reviews = options['reviews']
+        titles = options['titles'] or max(reviews // 10, 1)
+        users = options['users'] or max(reviews // 20, 10)
+        if min(titles, users, options['categories'],
+               options['genres']) < 1:
+            raise CommandError('Размеры набора должны быть положительными')
+        if reviews > titles * users:
+            raise CommandError(
+                f'{reviews} отзывов не уместить: у пары автор–произведение '
+                f'не больше одного отзыва, а пар {titles * users}'
+            )
+
+        started = time.monotonic()
+        written = generate_dataset(
+            reviews, titles, users,
+            categories=options['categories'],
+            genres=options['genres'],
+            comments_per_review=options['comments_per_review'],
+            skew=options['skew'],
+            seed=options['seed'],
+            prefix=options['prefix'],
+            batch_size=options['batch_size'],
+            use_copy=options['copy'],
+            jobs=options['jobs'],
+            progress=self.report,
+        )
+        catalog_imported.send(sender=self.__class__)
+        summary = ', '.join(f'{name}: {count}'
+                            for name, count in written.items())
+        self.stdout.write(self.style.SUCCESS(
+            f'Набор данных создан за {time.monotonic() - started:.0f} с '
+            f'({summary})'
+        ))
+
+    def report(self, written):
+        self.stdout.write(', '.join(f'{name}: {count}'
+                                    for name, count in written.items()))
@@ -0,0 +1,152 @@
+import csv
+import json
+import os
+from itertools import islice
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from reviews.bulk import (batches, copy_rows, field_default, keep_dates,
+                          reset_sequences)
+from reviews.models import (Categories, Comment, Genres, GenreTitle, Review,
+                            Title)
+from reviews.ratings import recalculate_ratings
+from reviews.signals import catalog_imported
+from reviews.stats import rebuild_stats
+from users.models import User
+
+# Порядок загрузки учитывает внешние ключи: (имя файла, модель,
+# {колонка файла: атрибут модели}).
+CATALOG = (
+    ('category', Categories, {'id': 'id', 'name': 'name', 'slug': 'slug'}),
+    ('genre', Genres, {'id': 'id', 'name': 'name', 'slug': 'slug'}),
+    ('titles', Title, {'id': 'id', 'name': 'name', 'year': 'year',
+                       'description': 'description',
+                       'category': 'category_id'}),
+    ('genre_title', GenreTitle, {'id': 'id', 'title_id': 'titles_id',
+                                 'genre_id': 'genry_id'}),
+    ('users', User, {'id': 'id', 'username': 'username', 'email': 'email',
+                     'role': 'role', 'bio': 'bio',
+                     'first_name': 'first_name', 'last_name': 'last_name'}),
+    ('review', Review, {'id': 'id', 'title_id': 'title_id', 'text': 'text',
+                        'author': 'author_id', 'score': 'score',
+                        'pub_date': 'pub_date'}),
+    ('comments', Comment, {'id': 'id', 'review_id': 'review_id',
+                           'text': 'text', 'author': 'author_id',
+                           'pub_date': 'pub_date'}),
+)
+PROGRESS_FILE = '.import_progress.json'
+
+
+def read_rows(path):
+    """Потоковое чтение строк CSV или JSONL как словарей."""
+    with open(path, encoding='utf-8', newline='') as file:
+        if path.endswith('.jsonl'):
+            for line in file:
+                if line.strip():
+                    yield json.loads(line)
+        else:
+            yield from csv.DictReader(file)
+
+
+class Command(BaseCommand):
+    """Потоковая загрузка каталога из CSV/JSONL пачками."""
+    help = ('Загружает category, genre, titles, genre_title, users, review '
+            'и comments (.csv или .jsonl) из каталога пачками через '
+            'bulk_create или COPY, с продолжением после сбоя')
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help='Каталог с файлами данных')
+        parser.add_argument('--batch-size', type=int, default=5000,
+                            help='Количество строк в одной пачке')
+        parser.add_argument('--copy', action='store_true',
+                            help='Загружать через COPY (только PostgreSQL)')
+        parser.add_argument('--restart', action='store_true',
+                            help='Игнорировать сохранённый прогресс')
+
+    def handle(self, *args, **options):
+        path = options['path']
+        if not os.path.isdir(path):
+            raise CommandError(f'Каталог {path} не найден')
+        if options['copy'] and connection.vendor != 'postgresql':
+            raise CommandError('--copy поддерживается только PostgreSQL')
+        self.batch_size = options['batch_size']
+        self.use_copy = options['copy']
+        self.progress_path = os.path.join(path, PROGRESS_FILE)
+        self.progress = {}
+        if not options['restart'] and os.path.exists(self.progress_path):
+            with open(self.progress_path, encoding='utf-8') as file:
+                self.progress = json.load(file)
+
+        loaded_models = []
+        for name, model, columns in CATALOG:
+            for extension in ('.csv', '.jsonl'):
+                file_path = os.path.join(path, name + extension)
+                if os.path.exists(file_path):
+                    self.load_file(name + extension, file_path,
+                                   model, columns)
+                    loaded_models.append(model)
+                    break
+
+        reset_sequences(loaded_models)
+        updated = recalculate_ratings()
+        rebuild_stats()
+        catalog_imported.send(sender=self.__class__)
+        if os.path.exists(self.progress_path):
+            os.remove(self.progress_path)
+        self.stdout.write(self.style.SUCCESS(
+            f'Загрузка завершена, рейтинг пересчитан для {updated} '
+            'произведений'
+        ))
+
+    def load_file(self, name, file_path, model, columns):
+        """Загрузка одного файла с пропуском уже загруженных строк."""
+        done = self.progress.get(name, 0)
+        rows = islice(read_rows(file_path), done, None)
+        fields = {field.attname: field
+                  for field in model._meta.concrete_fields}
+        attnames = {attname: column for column, attname in columns.items()}
+        with keep_dates(model):
+            for batch in batches(rows, self.batch_size):
+                values = [self.convert(row, attnames, fields)
+                          for row in batch]
+                with transaction.atomic():
+                    if self.use_copy:
+                        copy_rows(model, list(values[0]),
+                                  (row.values() for row in values))
+                    else:
+                        model.objects.bulk_create(
+                            (model(**row) for row in values),
+                            batch_size=self.batch_size,
+                            ignore_conflicts=True,
+                        )
+                done += len(batch)
+                self.save_progress(name, done)
+                self.stdout.write(f'{name}: {done}')
+
+    @staticmethod
+    def convert(row, columns, fields):
+        """Строка файла -> значения всех атрибутов модели. Пустые значения
+        nullable-полей становятся NULL, отсутствующие колонки получают
+        значения по умолчанию (COPY не знает о значениях Django)."""
+        values = {}
+        for attname, field in fields.items():
+            column = columns.get(attname)
+            if column is None or column not in row:
+                if field.primary_key:
+                    continue
+                value = field_default(field)
+            else:
+                value = row[column]
+                if value == '' and field.null:
+                    value = None
+                elif (isinstance(value, str)
+                      and field.get_internal_type() == 'DateField'):
+                    value = value[:10]
+            values[attname] = value
+        return values
+
+    def save_progress(self, name, done):
+        """Сохранение количества загруженных строк файла."""
+        self.progress[name] = done
+        with open(self.progress_path, 'w', encoding='utf-8') as file:
+            json.dump(self.progress, file)
@@ -0,0 +1,13 @@
+from django.core.management.base import BaseCommand
+from reviews.stats import rebuild_stats
+
+
+class Command(BaseCommand):
+    """Пересборка материализованной статистики произведений с нуля."""
+    help = 'Пересобирает таблицу статистики оценок и комментариев'
+
+    def handle(self, *args, **options):
+        created = rebuild_stats()
+        self.stdout.write(self.style.SUCCESS(
+            f'Статистика собрана для {created} произведений'
+        ))
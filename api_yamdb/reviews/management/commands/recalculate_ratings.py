@@ -0,0 +1,15 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from reviews.ratings import recalculate_ratings
+
+
+class Command(BaseCommand):
+    """Пересчёт сохранённого рейтинга всех произведений с нуля."""
+    help = 'Пересчитывает rating_sum и rating_count по таблице отзывов'
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            updated = recalculate_ratings()
+        self.stdout.write(self.style.SUCCESS(
+            f'Рейтинг пересчитан для {updated} произведений'
+        ))
@@ -0,0 +1,30 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from reviews.leaderboard import refresh_leaderboard
+from reviews.signals import leaderboard_refreshed
+
+
+class Command(BaseCommand):
+    """Пересчёт рейтинга лучших произведений. Запускается по
+    расписанию (cron) или после массовой загрузки данных."""
+    help = ('Пересчитывает рейтинг лучших произведений: общий, '
+            'по категориям и по жанрам')
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--size', type=int, default=settings.LEADERBOARD['SIZE'],
+            help='Количество мест в каждом разделе'
+        )
+        parser.add_argument(
+            '--min-reviews', type=int,
+            default=settings.LEADERBOARD['MIN_REVIEWS'],
+            help='Минимальное количество отзывов у произведения'
+        )
+
+    def handle(self, *args, **options):
+        written = refresh_leaderboard(options['size'],
+                                      options['min_reviews'])
+        leaderboard_refreshed.send(sender=self.__class__)
+        self.stdout.write(self.style.SUCCESS(
+            f'Рейтинг пересчитан, записано {written} мест'
+        ))
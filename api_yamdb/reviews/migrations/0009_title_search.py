@@ -0,0 +1,59 @@
+# Generated by Django 2.2.16 on 2026-10-18 13:00
+
+import django.contrib.postgres.search
+from django.db import migrations
+
+SEARCH_CONFIG = 'pg_catalog.russian'
+
+FORWARD_SQL = (
+    'CREATE EXTENSION IF NOT EXISTS pg_trgm',
+    'CREATE INDEX IF NOT EXISTS title_name_trgm_idx ON reviews_title '
+    'USING gin (name gin_trgm_ops)',
+    'CREATE INDEX IF NOT EXISTS title_name_upper_trgm_idx ON reviews_title '
+    'USING gin ((UPPER(name::text)) gin_trgm_ops)',
+    'CREATE INDEX IF NOT EXISTS title_search_vector_idx ON reviews_title '
+    'USING gin (search_vector)',
+    'CREATE TRIGGER reviews_title_search_vector_update '
+    'BEFORE INSERT OR UPDATE OF name, description ON reviews_title '
+    'FOR EACH ROW EXECUTE PROCEDURE tsvector_update_trigger('
+    f"search_vector, '{SEARCH_CONFIG}', name, description)",
+    "UPDATE reviews_title SET search_vector = "
+    f"to_tsvector('{SEARCH_CONFIG}', "
+    "coalesce(name, '') || ' ' || coalesce(description, ''))",
+)
+
+BACKWARD_SQL = (
+    'DROP TRIGGER IF EXISTS reviews_title_search_vector_update '
+    'ON reviews_title',
+    'DROP INDEX IF EXISTS title_search_vector_idx',
+    'DROP INDEX IF EXISTS title_name_upper_trgm_idx',
+    'DROP INDEX IF EXISTS title_name_trgm_idx',
+)
+
+
+def run_on_postgresql(statements):
+    def run(apps, schema_editor):
+        if schema_editor.connection.vendor != 'postgresql':
+            return
+        for statement in statements:
+            schema_editor.execute(statement)
+    return run
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reviews', '0008_title_name_id_idx'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='title',
+            name='search_vector',
+            field=django.contrib.postgres.search.SearchVectorField(editable=False, null=True, verbose_name='Поисковый вектор'),
+        ),
+        migrations.RunPython(
+            run_on_postgresql(FORWARD_SQL),
+            run_on_postgresql(BACKWARD_SQL),
+        ),
+    ]
@@ -0,0 +1,68 @@
+# Generated by Django 2.2.16 on 2026-10-18 14:00
+
+import django.db.models.deletion
+from django.db import migrations, models
+from django.db.models import Count, Q, Sum
+
+
+def fill_stats(apps, schema_editor):
+    Title = apps.get_model('reviews', 'Title')
+    Review = apps.get_model('reviews', 'Review')
+    Comment = apps.get_model('reviews', 'Comment')
+    TitleStats = apps.get_model('reviews', 'TitleStats')
+    comments = dict(
+        Comment.objects.order_by().values('review__title').annotate(
+            total=Count('pk')
+        ).values_list('review__title', 'total')
+    )
+    reviews = {
+        row.pop('title'): row
+        for row in Review.objects.order_by().values('title').annotate(
+            review_count=Count('pk'),
+            score_sum=Sum('score'),
+            **{f'score_{score}': Count('pk', filter=Q(score=score))
+               for score in range(11)}
+        )
+    }
+    TitleStats.objects.bulk_create(
+        (TitleStats(title_id=title_id,
+                    comment_count=comments.get(title_id, 0),
+                    **reviews.get(title_id, {}))
+         for title_id in Title.objects.values_list('pk', flat=True)),
+        batch_size=1000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reviews', '0009_title_search'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TitleStats',
+            fields=[
+                ('title', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='stats', serialize=False, to='reviews.Title', verbose_name='Произведение')),
+                ('review_count', models.PositiveIntegerField(default=0, verbose_name='Отзывов')),
+                ('comment_count', models.PositiveIntegerField(default=0, verbose_name='Комментариев')),
+                ('score_sum', models.PositiveIntegerField(default=0, verbose_name='Сумма оценок')),
+                ('score_0', models.PositiveIntegerField(default=0, verbose_name='Оценок 0')),
+                ('score_1', models.PositiveIntegerField(default=0, verbose_name='Оценок 1')),
+                ('score_2', models.PositiveIntegerField(default=0, verbose_name='Оценок 2')),
+                ('score_3', models.PositiveIntegerField(default=0, verbose_name='Оценок 3')),
+                ('score_4', models.PositiveIntegerField(default=0, verbose_name='Оценок 4')),
+                ('score_5', models.PositiveIntegerField(default=0, verbose_name='Оценок 5')),
+                ('score_6', models.PositiveIntegerField(default=0, verbose_name='Оценок 6')),
+                ('score_7', models.PositiveIntegerField(default=0, verbose_name='Оценок 7')),
+                ('score_8', models.PositiveIntegerField(default=0, verbose_name='Оценок 8')),
+                ('score_9', models.PositiveIntegerField(default=0, verbose_name='Оценок 9')),
+                ('score_10', models.PositiveIntegerField(default=0, verbose_name='Оценок 10')),
+            ],
+            options={
+                'verbose_name': 'Статистика произведения',
+                'verbose_name_plural': 'Статистика произведений',
+            },
+        ),
+        migrations.RunPython(fill_stats, migrations.RunPython.noop),
+    ]
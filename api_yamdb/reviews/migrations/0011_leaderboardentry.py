@@ -0,0 +1,35 @@
+# Generated by Django 2.2.16 on 2026-10-18 17:20
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reviews', '0010_titlestats'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='LeaderboardEntry',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('scope', models.CharField(choices=[('all', 'Все произведения'), ('category', 'Категория'), ('genre', 'Жанр')], max_length=16, verbose_name='Раздел')),
+                ('slug', models.SlugField(blank=True, db_index=False, verbose_name='Категория или жанр')),
+                ('position', models.PositiveIntegerField(verbose_name='Место')),
+                ('rating', models.FloatField(verbose_name='Средняя оценка')),
+                ('review_count', models.PositiveIntegerField(verbose_name='Отзывов')),
+                ('title', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='leaderboard_entries', to='reviews.Title', verbose_name='Произведение')),
+            ],
+            options={
+                'verbose_name': 'Место в рейтинге',
+                'verbose_name_plural': 'Рейтинг произведений',
+                'ordering': ('scope', 'slug', 'position'),
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='leaderboardentry',
+            constraint=models.UniqueConstraint(fields=('scope', 'slug', 'position'), name='unique_leaderboard_position'),
+        ),
+    ]
@@ -0,0 +1,72 @@
+# Generated by Django 2.2.16 on 2026-10-18 18:00
+
+import django.db.models.deletion
+from api_yamdb.db.operations import (AddConstraintConcurrently,
+                                     AddIndexConcurrently,
+                                     RemoveFieldIndexConcurrently)
+from django.db import migrations, models
+from django.db.models import Count, Min
+
+
+def remove_duplicate_genres(apps, schema_editor):
+    """Повторные связи произведения с жанром мешают построить
+    unique_genre_title: оставляем первую из них."""
+    GenreTitle = apps.get_model('reviews', 'GenreTitle')
+    duplicates = (GenreTitle.objects
+                  .values('titles', 'genry')
+                  .annotate(first=Min('id'), total=Count('id'))
+                  .filter(total__gt=1))
+    for row in duplicates:
+        (GenreTitle.objects
+         .filter(titles=row['titles'], genry=row['genry'])
+         .exclude(id=row['first'])
+         .delete())
+
+
+class Migration(migrations.Migration):
+    # CREATE INDEX CONCURRENTLY не выполняется внутри транзакции.
+    atomic = False
+
+    dependencies = [
+        ('reviews', '0011_leaderboardentry'),
+    ]
+
+    operations = [
+        migrations.AlterModelOptions(
+            name='comment',
+            options={'ordering': ('pub_date', 'id'), 'verbose_name': 'Комментарий', 'verbose_name_plural': 'Комментарии'},
+        ),
+        migrations.AlterModelOptions(
+            name='review',
+            options={'ordering': ('pub_date', 'id'), 'verbose_name': 'Отзыв', 'verbose_name_plural': 'Отзывы'},
+        ),
+        migrations.RunPython(remove_duplicate_genres,
+                             migrations.RunPython.noop, atomic=True),
+        AddConstraintConcurrently(
+            model_name='genretitle',
+            constraint=models.UniqueConstraint(fields=('titles', 'genry'), name='unique_genre_title'),
+        ),
+        AddIndexConcurrently(
+            model_name='review',
+            index=models.Index(fields=['title', 'pub_date', 'id'], name='review_title_pub_date_idx'),
+        ),
+        AddIndexConcurrently(
+            model_name='comment',
+            index=models.Index(fields=['review', 'pub_date', 'id'], name='comment_review_pub_date_idx'),
+        ),
+        RemoveFieldIndexConcurrently(
+            model_name='genretitle',
+            name='titles',
+            field=models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, to='reviews.Title', verbose_name='Произведения'),
+        ),
+        RemoveFieldIndexConcurrently(
+            model_name='review',
+            name='title',
+            field=models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, related_name='reviews', to='reviews.Title', verbose_name='Произведение'),
+        ),
+        RemoveFieldIndexConcurrently(
+            model_name='comment',
+            name='review',
+            field=models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, related_name='comments', to='reviews.Review', verbose_name='Отзыв'),
+        ),
+    ]
@@ -1,3 +1,4 @@
+from django.contrib.postgres.search import SearchVectorField
 from django.core.validators import MaxValueValidator, MinValueValidator
 from django.db import models
 from users.models import User
@@ -57,21 +58,48 @@ class Title(models.Model):
         blank=True,
         related_name='titles'
     )
+    rating_sum = models.PositiveIntegerField(
+        verbose_name='Сумма оценок', default=0, editable=False
+    )
+    rating_count = models.PositiveIntegerField(
+        verbose_name='Количество оценок', default=0, editable=False
+    )
+    search_vector = SearchVectorField(
+        verbose_name='Поисковый вектор', null=True, editable=False
+    )
 
     class Meta:
+        indexes = [
+            models.Index(fields=['name', 'id'], name='title_name_id_idx'),
+        ]
         verbose_name = 'Произведение'
         verbose_name_plural = 'Произведения'
 
     def __str__(self) -> str:
         return self.name
 
+    @property
+    def rating(self):
+        """Средняя оценка по сохранённым сумме и количеству отзывов."""
+        if not self.rating_count:
+            return None
+        return self.rating_sum / self.rating_count
+
 
 class GenreTitle(models.Model):
     """БД с жанрами и произведениями."""
     genry = models.ForeignKey(Genres, on_delete=models.CASCADE,
                               verbose_name='Жанр')
+    # Выборки по произведению обслуживает индекс unique_genre_title.
     titles = models.ForeignKey(Title, on_delete=models.CASCADE,
-                               verbose_name='Произведения')
+                               verbose_name='Произведения', db_index=False)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=['titles', 'genry'],
+                name='unique_genre_title')
+        ]
 
     def __str__(self):
         return f'{self.titles} {self.genry}'
@@ -88,17 +116,31 @@ class Review(models.Model):
                     MaxValueValidator(10)])
     pub_date = models.DateField(verbose_name='Дата публикации',
                                 auto_now_add=True)
+    # Выборки по произведению обслуживает индекс review_title_pub_date_idx.
     title = models.ForeignKey(Title, on_delete=models.CASCADE,
                               related_name='reviews',
-                              verbose_name='Произведение')
+                              verbose_name='Произведение', db_index=False)
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        """Запоминаем загруженные оценку и произведение,
+        чтобы при изменении отзыва пересчитать рейтинг."""
+        instance = super().from_db(db, field_names, values)
+        instance._loaded_score = instance.__dict__.get('score')
+        instance._loaded_title_id = instance.__dict__.get('title_id')
+        return instance
 
     class Meta:
-        ordering = ('pub_date',)
+        ordering = ('pub_date', 'id')
         constraints = [
             models.UniqueConstraint(
                 fields=['title', 'author'],
                 name='unique_title_author')
         ]
+        indexes = [
+            models.Index(fields=['title', 'pub_date', 'id'],
+                         name='review_title_pub_date_idx'),
+        ]
         verbose_name = 'Отзыв'
         verbose_name_plural = 'Отзывы'
 
@@ -108,11 +150,97 @@ class Comment(models.Model):
     text = models.TextField(verbose_name='Текст комментария')
     author = models.ForeignKey(User, on_delete=models.CASCADE,
                                verbose_name='Автор')
+    # Выборки по отзыву обслуживает индекс comment_review_pub_date_idx.
     review = models.ForeignKey(Review, on_delete=models.CASCADE,
                                related_name='comments',
-                               verbose_name='Отзыв')
+                               verbose_name='Отзыв', db_index=False)
     pub_date = models.DateField('Дата публикации', auto_now_add=True)
 
     class Meta:
+        ordering = ('pub_date', 'id')
+        indexes = [
+            models.Index(fields=['review', 'pub_date', 'id'],
+                         name='comment_review_pub_date_idx'),
+        ]
         verbose_name = 'Комментарий'
         verbose_name_plural = 'Комментарии'
+
+
+class TitleStats(models.Model):
+    """Материализованная статистика отзывов произведения.
+    Обновляется инкрементально сигналами отзывов и комментариев,
+    полностью пересобирается командой rebuild_title_stats."""
+    title = models.OneToOneField(Title, on_delete=models.CASCADE,
+                                 primary_key=True, related_name='stats',
+                                 verbose_name='Произведение')
+    review_count = models.PositiveIntegerField('Отзывов', default=0)
+    comment_count = models.PositiveIntegerField('Комментариев', default=0)
+    score_sum = models.PositiveIntegerField('Сумма оценок', default=0)
+    score_0 = models.PositiveIntegerField('Оценок 0', default=0)
+    score_1 = models.PositiveIntegerField('Оценок 1', default=0)
+    score_2 = models.PositiveIntegerField('Оценок 2', default=0)
+    score_3 = models.PositiveIntegerField('Оценок 3', default=0)
+    score_4 = models.PositiveIntegerField('Оценок 4', default=0)
+    score_5 = models.PositiveIntegerField('Оценок 5', default=0)
+    score_6 = models.PositiveIntegerField('Оценок 6', default=0)
+    score_7 = models.PositiveIntegerField('Оценок 7', default=0)
+    score_8 = models.PositiveIntegerField('Оценок 8', default=0)
+    score_9 = models.PositiveIntegerField('Оценок 9', default=0)
+    score_10 = models.PositiveIntegerField('Оценок 10', default=0)
+
+    class Meta:
+        verbose_name = 'Статистика произведения'
+        verbose_name_plural = 'Статистика произведений'
+
+    def __str__(self):
+        return f'{self.title_id}: {self.review_count}'
+
+    @property
+    def histogram(self):
+        """Количество отзывов по каждой оценке от 0 до 10."""
+        return {score: getattr(self, f'score_{score}')
+                for score in range(11)}
+
+    @property
+    def average(self):
+        if not self.review_count:
+            return None
+        return self.score_sum / self.review_count
+
+
+class LeaderboardEntry(models.Model):
+    """Позиция произведения в заранее посчитанном рейтинге: общем,
+    по категории или по жанру (slug). Пересчитывается командой
+    refresh_leaderboard."""
+    SCOPE_ALL = 'all'
+    SCOPE_CATEGORY = 'category'
+    SCOPE_GENRE = 'genre'
+    SCOPES = (
+        (SCOPE_ALL, 'Все произведения'),
+        (SCOPE_CATEGORY, 'Категория'),
+        (SCOPE_GENRE, 'Жанр'),
+    )
+
+    scope = models.CharField('Раздел', max_length=16, choices=SCOPES)
+    slug = models.SlugField('Категория или жанр', blank=True,
+                            db_index=False)
+    position = models.PositiveIntegerField('Место')
+    title = models.ForeignKey(Title, on_delete=models.CASCADE,
+                              related_name='leaderboard_entries',
+                              verbose_name='Произведение')
+    rating = models.FloatField('Средняя оценка')
+    review_count = models.PositiveIntegerField('Отзывов')
+
+    class Meta:
+        ordering = ('scope', 'slug', 'position')
+        constraints = [
+            models.UniqueConstraint(
+                fields=['scope', 'slug', 'position'],
+                name='unique_leaderboard_position'
+            )
+        ]
+        verbose_name = 'Место в рейтинге'
+        verbose_name_plural = 'Рейтинг произведений'
+
+    def __str__(self):
+        return f'{self.scope}:{self.slug} #{self.position}'
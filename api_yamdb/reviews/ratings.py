@@ -0,0 +1,34 @@
+from django.db.models import Count, F, IntegerField, OuterRef, Subquery, Sum
+from django.db.models.functions import Coalesce
+
+from .models import Review, Title
+
+
+def change_rating(title_id, score_delta, count_delta):
+    """Инкрементальное изменение суммы и количества оценок произведения."""
+    Title.objects.filter(pk=title_id).update(
+        rating_sum=F('rating_sum') + score_delta,
+        rating_count=F('rating_count') + count_delta,
+    )
+
+
+def recalculate_ratings(titles=None):
+    """Полный пересчёт рейтинга одним UPDATE по таблице отзывов.
+    Возвращает количество обновлённых произведений."""
+    if titles is None:
+        titles = Title.objects.all()
+    reviews = Review.objects.filter(
+        title=OuterRef('pk')
+    ).order_by().values('title')
+    return titles.update(
+        rating_sum=Coalesce(
+            Subquery(reviews.annotate(total=Sum('score')).values('total'),
+                     output_field=IntegerField()),
+            0
+        ),
+        rating_count=Coalesce(
+            Subquery(reviews.annotate(total=Count('pk')).values('total'),
+                     output_field=IntegerField()),
+            0
+        ),
+    )
@@ -0,0 +1,70 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import Signal, receiver
+
+from .models import Comment, Review, Title, TitleStats
+from .ratings import change_rating, recalculate_ratings
+from .stats import change_comment_stats, change_review_stats, rebuild_stats
+
+# Массовая загрузка данных в обход сигналов моделей.
+catalog_imported = Signal()
+# Пересчитан рейтинг лучших произведений (refresh_leaderboard).
+leaderboard_refreshed = Signal()
+
+
+def apply_review(title_id, score, sign):
+    """Учёт отзыва в рейтинге и статистике произведения."""
+    change_rating(title_id, sign * score, sign)
+    change_review_stats(title_id, score, sign)
+
+
+@receiver(post_save, sender=Title)
+def create_stats_on_title_save(sender, instance, created, raw, **kwargs):
+    """Пустая строка статистики для нового произведения."""
+    if created and not raw:
+        TitleStats.objects.create(title=instance)
+
+
+@receiver(post_save, sender=Review)
+def update_rating_on_save(sender, instance, created, raw, **kwargs):
+    """Пересчёт рейтинга и статистики при создании или изменении отзыва.
+    При loaddata (raw) они пересчитываются командами recalculate_ratings
+    и rebuild_title_stats."""
+    if raw:
+        return
+    loaded_score = getattr(instance, '_loaded_score', None)
+    loaded_title_id = getattr(instance, '_loaded_title_id', None)
+    if created:
+        apply_review(instance.title_id, instance.score, 1)
+    elif loaded_score is None or loaded_title_id is None:
+        titles = Title.objects.filter(pk=instance.title_id)
+        recalculate_ratings(titles)
+        rebuild_stats(titles)
+    elif (loaded_title_id, loaded_score) != (instance.title_id,
+                                             instance.score):
+        apply_review(loaded_title_id, loaded_score, -1)
+        apply_review(instance.title_id, instance.score, 1)
+    instance._loaded_score = instance.score
+    instance._loaded_title_id = instance.title_id
+
+
+@receiver(post_delete, sender=Review)
+def update_rating_on_delete(sender, instance, **kwargs):
+    """Пересчёт рейтинга и статистики при удалении отзыва."""
+    loaded_score = getattr(instance, '_loaded_score', None)
+    loaded_title_id = getattr(instance, '_loaded_title_id', None)
+    if loaded_score is None or loaded_title_id is None:
+        loaded_score, loaded_title_id = instance.score, instance.title_id
+    apply_review(loaded_title_id, loaded_score, -1)
+
+
+@receiver(post_save, sender=Comment)
+def update_stats_on_comment_save(sender, instance, created, raw, **kwargs):
+    """Учёт нового комментария в статистике произведения."""
+    if created and not raw:
+        change_comment_stats(instance.review_id, 1)
+
+
+@receiver(post_delete, sender=Comment)
+def update_stats_on_comment_delete(sender, instance, **kwargs):
+    """Учёт удалённого комментария в статистике произведения."""
+    change_comment_stats(instance.review_id, -1)
@@ -0,0 +1,86 @@
+from django.db import IntegrityError, transaction
+from django.db.models import Count, F, Q, Sum
+
+from .models import Comment, Review, Title, TitleStats
+
+SCORES = range(11)
+
+
+def score_field(score):
+    """Имя поля гистограммы для оценки."""
+    return f'score_{score}'
+
+
+def update_stats(stats, **deltas):
+    """Инкрементальное изменение счётчиков в выбранных строках.
+    Возвращает количество обновлённых строк."""
+    return stats.update(**{
+        field: F(field) + delta for field, delta in deltas.items()
+    })
+
+
+def change_review_stats(title_id, score, sign):
+    """Учёт добавленного (sign=1) или удалённого (sign=-1) отзыва.
+    Строка статистики создаётся вместе с произведением; если её всё же
+    нет (loaddata), при добавлении она собирается по таблицам, а при
+    удалении вычитать не из чего (в том числе при каскадном удалении
+    произведения)."""
+    updated = update_stats(
+        TitleStats.objects.filter(pk=title_id),
+        review_count=sign,
+        score_sum=sign * score,
+        **{score_field(score): sign},
+    )
+    if not updated and sign > 0:
+        rebuild_stats(Title.objects.filter(pk=title_id))
+
+
+def change_comment_stats(review_id, sign):
+    """Учёт добавленного или удалённого комментария к отзыву."""
+    updated = update_stats(
+        TitleStats.objects.filter(title__reviews=review_id),
+        comment_count=sign,
+    )
+    if not updated and sign > 0:
+        rebuild_stats(Title.objects.filter(reviews=review_id))
+
+
+def rebuild_stats(titles=None):
+    """Полная пересборка статистики: агрегаты по отзывам
+    и комментариям, затем пакетная вставка строки для каждого
+    произведения. Возвращает количество созданных строк."""
+    if titles is None:
+        titles = Title.objects.all()
+    title_ids = titles.order_by().values('pk')
+    reviews = {
+        row.pop('title'): row
+        for row in Review.objects.filter(
+            title__in=title_ids
+        ).order_by().values('title').annotate(
+            review_count=Count('pk'),
+            score_sum=Sum('score'),
+            **{score_field(score): Count('pk', filter=Q(score=score))
+               for score in SCORES}
+        )
+    }
+    comments = dict(
+        Comment.objects.filter(
+            review__title__in=title_ids
+        ).order_by().values('review__title').annotate(
+            total=Count('pk')
+        ).values_list('review__title', 'total')
+    )
+    try:
+        with transaction.atomic():
+            TitleStats.objects.filter(title__in=title_ids).delete()
+            created = TitleStats.objects.bulk_create(
+                (TitleStats(title_id=title_id,
+                            comment_count=comments.get(title_id, 0),
+                            **reviews.get(title_id, {}))
+                 for title_id in title_ids.values_list('pk', flat=True)),
+                batch_size=1000,
+            )
+    except IntegrityError:
+        # Строку одновременно создал другой запрос.
+        return 0
+    return len(created)
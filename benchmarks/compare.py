@@ -0,0 +1,59 @@
+"""Сравнение двух запусков бенчмарка.
+
+    python benchmarks/compare.py before.json after.json
+"""
+import json
+import sys
+
+
+def load(path):
+    with open(path, encoding='utf-8') as file:
+        return json.load(file)
+
+
+def change(before, after):
+    """Изменение в процентах, None если сравнивать не с чем."""
+    if before in (None, 0) or after is None:
+        return None
+    return round((after - before) / before * 100, 1)
+
+
+def format_change(value):
+    return 'n/a' if value is None else f'{value:+}%'
+
+
+def compare(before, after):
+    """Строки сравнения по общим сценариям: rps, p95 и запросы к базе."""
+    rows = []
+    for name, old in before['scenarios'].items():
+        new = after['scenarios'].get(name)
+        if new is None:
+            continue
+        old_latency = old['latency_ms'] or {}
+        new_latency = new['latency_ms'] or {}
+        old_queries = old['queries_per_request'] or {}
+        new_queries = new['queries_per_request'] or {}
+        rows.append({
+            'scenario': name,
+            'rps': (old['rps'], new['rps'], change(old['rps'], new['rps'])),
+            'p95': (old_latency.get('p95'), new_latency.get('p95'),
+                    change(old_latency.get('p95'), new_latency.get('p95'))),
+            'queries': (old_queries.get('mean'), new_queries.get('mean')),
+        })
+    return rows
+
+
+def main(argv=None):
+    before_path, after_path = (argv or sys.argv[1:])[:2]
+    before, after = load(before_path), load(after_path)
+    print(f'{before["meta"]["commit"]} -> {after["meta"]["commit"]}')
+    for row in compare(before, after):
+        rps, p95, queries = row['rps'], row['p95'], row['queries']
+        print(f'{row["scenario"]:28} '
+              f'rps {rps[0]} -> {rps[1]} ({format_change(rps[2])})  '
+              f'p95 {p95[0]} -> {p95[1]} ms ({format_change(p95[2])})  '
+              f'queries {queries[0]} -> {queries[1]}')
+
+
+if __name__ == '__main__':
+    main()
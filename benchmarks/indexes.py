@@ -0,0 +1,223 @@
+"""Планы и задержки запросов отзывов, комментариев и жанров до и после
+составных индексов (миграция reviews 0012).
+
+Откатывает приложение reviews к миграции 0011, замеряет запросы,
+применяет миграции заново и замеряет ещё раз, поэтому запускается
+только на отдельной базе: база с данными — лишь с --allow-existing-db.
+Набор данных при необходимости создаётся командой generate_dataset
+(--reviews) и удаляется после замеров, иначе используются данные базы.
+
+    python benchmarks/indexes.py --reviews 1000000 --repeat 200
+"""
+import argparse
+import json
+import os
+import sys
+import time
+from datetime import datetime, timezone
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+BEFORE = '0011_leaderboardentry'
+PAGE_SIZE = 10
+
+
+def last_page(queryset):
+    """Последняя страница в режиме курсора (?pagination=cursor):
+    условие «после позиции» по ключам сортировки вместо OFFSET."""
+    from api.pagination import KeysetPagination
+
+    ordering = ('pub_date', 'id')
+    skip = max(queryset.count() - PAGE_SIZE - 1, 0)
+    position = queryset.values_list(*ordering)[skip]
+    return queryset.filter(
+        KeysetPagination.after(ordering, position)
+    )[:PAGE_SIZE]
+
+
+def build_queries(title_id, review_id, title_ids):
+    """Запросы основных путей доступа, как их строят представления:
+    первая и последняя страницы отзывов и комментариев и жанры
+    страницы произведений."""
+    from reviews.models import Comment, Genres, GenreTitle, Review
+
+    reviews = (Review.objects.filter(title_id=title_id)
+               .select_related('author').order_by('pub_date', 'id'))
+    comments = (Comment.objects.filter(review_id=review_id)
+                .select_related('author').order_by('pub_date', 'id'))
+    return {
+        'reviews_first_page': reviews[:PAGE_SIZE],
+        'reviews_cursor_page': last_page(reviews),
+        'comments_first_page': comments[:PAGE_SIZE],
+        'comments_cursor_page': last_page(comments),
+        'title_genres': Genres.objects.filter(title__in=title_ids),
+        'title_genre_links': GenreTitle.objects.filter(
+            titles_id=title_id
+        ).order_by('genry_id'),
+    }
+
+
+def pick_targets():
+    """Самые нагруженные произведение и отзыв: на них сортировка без
+    индекса обходится дороже всего."""
+    from django.db.models import Count
+    from reviews.models import Comment, Review, Title
+
+    title = (Review.objects.values('title').annotate(total=Count('id'))
+             .order_by('-total').first())
+    review = (Comment.objects.values('review').annotate(total=Count('id'))
+              .order_by('-total').first())
+    if title is None or review is None:
+        raise SystemExit('В базе нет отзывов или комментариев: '
+                         'укажите --reviews')
+    title_ids = list(Title.objects.order_by('name', 'id')
+                     .values_list('id', flat=True)[:PAGE_SIZE])
+    return title['title'], review['review'], title_ids
+
+
+def analyze():
+    """Свежая статистика планировщика после изменения индексов."""
+    from django.db import connection
+
+    with connection.cursor() as cursor:
+        if connection.vendor == 'postgresql':
+            cursor.execute('ANALYZE reviews_review, reviews_comment, '
+                           'reviews_genretitle')
+        else:
+            cursor.execute('ANALYZE')
+
+
+def explain(queryset):
+    from django.db import connection
+
+    if connection.vendor == 'postgresql':
+        return queryset.explain(analyze=True)
+    return queryset.explain()
+
+
+def measure(queries, repeat):
+    """План и задержки каждого запроса (repeat выполнений после
+    прогрева)."""
+    from benchmarks.run import percentile
+
+    results = {}
+    for name, queryset in queries.items():
+        list(queryset.all())
+        timings = []
+        for _ in range(repeat):
+            started = time.perf_counter()
+            list(queryset.all())
+            timings.append((time.perf_counter() - started) * 1000)
+        results[name] = {
+            'latency_ms': {
+                'p50': round(percentile(timings, 50), 3),
+                'p95': round(percentile(timings, 95), 3),
+            },
+            'plan': explain(queryset),
+        }
+    return results
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--reviews', type=int, default=0,
+                        help='Сгенерировать набор с таким количеством '
+                             'отзывов (0 — использовать данные базы)')
+    parser.add_argument('--titles', type=int)
+    parser.add_argument('--users', type=int)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--repeat', type=int, default=200,
+                        help='Выполнений каждого запроса')
+    parser.add_argument('--allow-existing-db', action='store_true',
+                        help='Запускать на базе, в которой уже есть данные')
+    parser.add_argument('--plans', action='store_true',
+                        help='Вывести планы запросов')
+    parser.add_argument('--output', default=None,
+                        help='Файл JSON (по умолчанию '
+                             'benchmarks/results/indexes-<время>.json)')
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    from benchmarks.compare import change, format_change
+    from benchmarks.run import git_commit, setup_django
+
+    setup_django()
+    from django.core.management import call_command
+    from django.db import connection
+    from reviews.dataset import remove_dataset
+    from reviews.signals import catalog_imported
+
+    from benchmarks.seed import database_is_empty
+
+    if not args.allow_existing_db and not database_is_empty():
+        raise SystemExit(
+            'В базе уже есть данные, а замер откатывает и заново строит '
+            'её индексы: запустите его на отдельной базе или укажите '
+            '--allow-existing-db'
+        )
+    prefix = f'i{int(time.time())}' if args.reviews else None
+    results = {}
+    try:
+        if prefix:
+            call_command('generate_dataset', reviews=args.reviews,
+                         titles=args.titles, users=args.users,
+                         seed=args.seed, prefix=prefix)
+        title_id, review_id, title_ids = pick_targets()
+        queries = build_queries(title_id, review_id, title_ids)
+        for state, target in (('before', BEFORE), ('after', None)):
+            print(f'Миграции reviews: {target or "последняя"}...',
+                  flush=True)
+            call_command('migrate', 'reviews', *filter(None, [target]),
+                         verbosity=0)
+            analyze()
+            results[state] = measure(queries, args.repeat)
+    finally:
+        # После ошибки база не должна остаться без индексов.
+        call_command('migrate', 'reviews', verbosity=0)
+        if prefix:
+            print('Удаление набора данных...', flush=True)
+            remove_dataset(prefix)
+            catalog_imported.send(sender=main)
+
+    print(f'{"запрос":24} {"p50 до":>10} {"p50 после":>10} '
+          f'{"p95 до":>10} {"p95 после":>10}  изменение p50')
+    for name in queries:
+        before = results['before'][name]['latency_ms']
+        after = results['after'][name]['latency_ms']
+        print(f'{name:24} {before["p50"]:>10} {after["p50"]:>10} '
+              f'{before["p95"]:>10} {after["p95"]:>10}  '
+              f'{format_change(change(before["p50"], after["p50"]))}')
+        if args.plans:
+            for state in ('before', 'after'):
+                print(f'  {state}:')
+                for line in results[state][name]['plan'].splitlines():
+                    print(f'    {line}')
+
+    report = {
+        'meta': {
+            'commit': git_commit(),
+            'date': datetime.now(timezone.utc).isoformat(),
+            'database': connection.vendor,
+            'repeat': args.repeat,
+            'title_id': title_id,
+            'review_id': review_id,
+        },
+        'queries': {name: {state: results[state][name]
+                           for state in results}
+                    for name in queries},
+    }
+    output = args.output
+    if output is None:
+        directory = os.path.join(ROOT, 'benchmarks', 'results')
+        os.makedirs(directory, exist_ok=True)
+        stamp = datetime.now().strftime('%Y%m%d-%H%M%S')
+        output = os.path.join(directory, f'indexes-{stamp}.json')
+    with open(output, 'w', encoding='utf-8') as file:
+        json.dump(report, file, ensure_ascii=False, indent=2)
+    print(f'Результаты сохранены в {output}')
+
+
+if __name__ == '__main__':
+    sys.path.insert(0, ROOT)
+    main()
@@ -0,0 +1,279 @@
+"""Нагрузочный бенчмарк API.
+
+Наполняет базу (настройки берутся из того же окружения, что и у
+сервера: DB_ENGINE, DB_NAME, ...), запускает gunicorn с заголовком
+X-DB-Queries и прогоняет каждый сценарий benchmarks/scenarios.py
+несколькими параллельными клиентами. Результат — таблица в консоли
+и JSON для сравнения запусков (benchmarks/compare.py). Запускается на
+пустой базе; база с данными — только с --allow-existing-db. После
+прогона строки запуска удаляются, а рейтинг возвращается к прежнему.
+
+    python benchmarks/run.py --size 2000 --requests 200 --concurrency 8
+"""
+import argparse
+import json
+import math
+import os
+import statistics
+import subprocess
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from itertools import count
+
+import requests
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+PROJECT = os.path.join(ROOT, 'api_yamdb')
+QUERY_HEADER = 'X-DB-Queries'
+# Лимиты частоты не должны отсекать нагрузку бенчмарка.
+SERVER_ENV = {
+    'QUERY_COUNT_HEADER': 'true',
+    'THROTTLE_SIGNUP': '1000000/min',
+    'THROTTLE_TOKEN': '1000000/min',
+    'THROTTLE_TOKEN_USERNAME': '1000000/min',
+    'THROTTLE_REVIEW_CREATE': '1000000/min',
+    'THROTTLE_COMMENT_CREATE': '1000000/min',
+}
+
+
+def setup_django():
+    sys.path.insert(0, PROJECT)
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'api_yamdb.settings')
+    import django
+
+    django.setup()
+
+
+def percentile(values, percent):
+    """Перцентиль по методу ближайшего ранга."""
+    if not values:
+        return None
+    ordered = sorted(values)
+    rank = max(math.ceil(percent / 100 * len(ordered)), 1)
+    return ordered[min(rank, len(ordered)) - 1]
+
+
+def summarize(samples, elapsed):
+    """Сводка по сценарию: samples — список (статус, секунды, запросы)."""
+    latencies = [seconds * 1000 for _, seconds, _ in samples]
+    queries = [number for _, _, number in samples if number is not None]
+    statuses = {}
+    for status, _, _ in samples:
+        statuses[str(status)] = statuses.get(str(status), 0) + 1
+    return {
+        'requests': len(samples),
+        'errors': sum(1 for status, _, _ in samples if status >= 400),
+        'status_codes': statuses,
+        'rps': round(len(samples) / elapsed, 1) if elapsed else None,
+        'latency_ms': {
+            'mean': round(statistics.mean(latencies), 2),
+            'p50': round(percentile(latencies, 50), 2),
+            'p95': round(percentile(latencies, 95), 2),
+            'p99': round(percentile(latencies, 99), 2),
+            'max': round(max(latencies), 2),
+        } if latencies else None,
+        'queries_per_request': {
+            'mean': round(statistics.mean(queries), 2),
+            'max': max(queries),
+        } if queries else None,
+    }
+
+
+def run_scenario(base_url, scenario, total, concurrency):
+    """total запросов сценария в concurrency потоков."""
+    numbers = count()
+    samples = []
+    lock = threading.Lock()
+
+    def client():
+        session = requests.Session()
+        local = []
+        while True:
+            index = next(numbers)
+            if index >= total:
+                break
+            call = scenario.build(index)
+            headers = {}
+            if call.token:
+                headers['Authorization'] = f'Bearer {call.token}'
+            started = time.perf_counter()
+            response = session.request(
+                scenario.method, base_url + call.path, json=call.data,
+                headers=headers,
+            )
+            elapsed = time.perf_counter() - started
+            queries = response.headers.get(QUERY_HEADER)
+            local.append((response.status_code, elapsed,
+                          int(queries) if queries is not None else None))
+        with lock:
+            samples.extend(local)
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(concurrency) as executor:
+        for _ in range(concurrency):
+            executor.submit(client)
+    return summarize(samples, time.perf_counter() - started)
+
+
+def start_server(port, workers, threads):
+    """gunicorn с тем же окружением и заголовком X-DB-Queries."""
+    base_url = f'http://127.0.0.1:{port}'
+    try:
+        requests.get(base_url, timeout=1)
+    except requests.ConnectionError:
+        pass
+    else:
+        raise RuntimeError(f'Порт {port} уже занят другим сервером')
+    process = subprocess.Popen(
+        [sys.executable, '-m', 'gunicorn', 'api_yamdb.wsgi:application',
+         '--bind', f'127.0.0.1:{port}', '--workers', str(workers),
+         '--threads', str(threads), '--log-level', 'warning'],
+        cwd=PROJECT, env={**os.environ, **SERVER_ENV},
+    )
+    for _ in range(300):
+        if process.poll() is not None:
+            raise RuntimeError('Сервер завершился при запуске')
+        try:
+            requests.get(base_url + '/api/v1/', timeout=5)
+            return process, base_url
+        except requests.RequestException:
+            time.sleep(0.1)
+    process.terminate()
+    process.wait()
+    raise RuntimeError('Сервер не запустился')
+
+
+def git_commit():
+    try:
+        return subprocess.check_output(
+            ['git', 'rev-parse', '--short', 'HEAD'], cwd=ROOT,
+            stderr=subprocess.DEVNULL,
+        ).decode().strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--size', type=int, default=1000,
+                        help='Количество произведений в наборе данных')
+    parser.add_argument('--requests', type=int, default=200,
+                        help='Запросов на сценарий')
+    parser.add_argument('--concurrency', type=int, default=8,
+                        help='Параллельных клиентов')
+    parser.add_argument('--workers', type=int, default=4,
+                        help='Воркеров gunicorn')
+    parser.add_argument('--threads', type=int, default=1,
+                        help='Потоков в воркере gunicorn')
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--url',
+                        help='Уже запущенный сервер вместо gunicorn')
+    parser.add_argument('--only', nargs='*', default=None,
+                        help='Запускать только перечисленные сценарии')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--allow-existing-db', action='store_true',
+                        help='Наполнять базу, в которой уже есть данные')
+    parser.add_argument('--output', default=None,
+                        help='Файл JSON (по умолчанию '
+                             'benchmarks/results/<время>-<коммит>.json)')
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    setup_django()
+    from django.contrib.auth.tokens import default_token_generator
+    from django.db import connection
+    from rest_framework_simplejwt.tokens import AccessToken
+    from users.models import User
+
+    from benchmarks.scenarios import build_scenarios
+    from benchmarks.seed import (cleanup, database_is_empty, save_leaderboard,
+                                 seed)
+
+    if not args.allow_existing_db and not database_is_empty():
+        raise SystemExit(
+            'В базе уже есть данные: запустите бенчмарк на пустой базе '
+            'или укажите --allow-existing-db'
+        )
+    prefix = f'b{int(time.time())}'
+    leaderboard = save_leaderboard()
+    process = None
+    results = {}
+    try:
+        print(f'Наполнение базы: {args.size} произведений...', flush=True)
+        started = time.perf_counter()
+        data = seed(args.size, prefix, args.requests, args.seed)
+        seed_seconds = round(time.perf_counter() - started, 1)
+        data['prefix'] = prefix
+        data['confirmation'] = lambda user: {
+            'username': user.username,
+            'confirmation_code': default_token_generator.make_token(user),
+        }
+        tokens = {}
+
+        def token(user_id):
+            if user_id not in tokens:
+                tokens[user_id] = str(AccessToken.for_user(User(pk=user_id)))
+            return tokens[user_id]
+
+        scenarios = build_scenarios(data, token)
+        if args.only:
+            scenarios = [scenario for scenario in scenarios
+                         if scenario.name in args.only]
+
+        base_url = args.url
+        if base_url is None:
+            process, base_url = start_server(args.port, args.workers,
+                                             args.threads)
+        for scenario in scenarios:
+            result = run_scenario(base_url, scenario, args.requests,
+                                  args.concurrency)
+            results[scenario.name] = result
+            latency = result['latency_ms'] or {}
+            queries = result['queries_per_request'] or {}
+            print(f'{scenario.name:28} {result["rps"]:>8} rps  '
+                  f'p50 {latency.get("p50"):>7} ms  '
+                  f'p95 {latency.get("p95"):>7} ms  '
+                  f'p99 {latency.get("p99"):>7} ms  '
+                  f'queries {queries.get("mean")}  '
+                  f'errors {result["errors"]}', flush=True)
+    finally:
+        if process is not None:
+            process.terminate()
+            process.wait()
+        print('Удаление данных запуска...', flush=True)
+        cleanup(prefix, leaderboard)
+
+    commit = git_commit()
+    report = {
+        'meta': {
+            'commit': commit,
+            'date': datetime.now(timezone.utc).isoformat(),
+            'database': connection.vendor,
+            'size': args.size,
+            'requests': args.requests,
+            'concurrency': args.concurrency,
+            'workers': args.workers,
+            'threads': args.threads,
+            'seed_seconds': seed_seconds,
+        },
+        'scenarios': results,
+    }
+    output = args.output
+    if output is None:
+        directory = os.path.join(ROOT, 'benchmarks', 'results')
+        os.makedirs(directory, exist_ok=True)
+        stamp = datetime.now().strftime('%Y%m%d-%H%M%S')
+        output = os.path.join(directory, f'{stamp}-{commit or "local"}.json')
+    with open(output, 'w', encoding='utf-8') as file:
+        json.dump(report, file, ensure_ascii=False, indent=2)
+    print(f'Результаты сохранены в {output}')
+
+
+if __name__ == '__main__':
+    sys.path.insert(0, ROOT)
+    main()
@@ -0,0 +1,157 @@
+"""Сценарии бенчмарка: по одному или несколько на каждый маршрут
+api/urls.py. Сценарий по номеру запроса i строит метод, путь, тело
+и токен; пишущие сценарии берут i-й объект из заготовок seed()."""
+from collections import namedtuple
+
+Scenario = namedtuple('Scenario', 'name method build')
+Call = namedtuple('Call', 'path data token')
+
+API = '/api/v1'
+
+
+def build_scenarios(data, tokens):
+    """Список сценариев для данных seed(); tokens(user_id) — JWT."""
+    titles = data['titles']
+    categories, genres = data['categories'], data['genres']
+    reviews, comments = data['reviews'], data['comments']
+    review_titles = {pk: title_id for pk, title_id, _ in reviews}
+    review_titles.update(
+        (pk, title_id) for pk, title_id, _ in data['doomed_reviews']
+    )
+    users, writers = data['users'], data['writers']
+    admin = tokens(data['admin'].pk)
+    prefix = data['prefix']
+
+    def pick(items, i):
+        return items[i % len(items)]
+
+    def title_path(i):
+        return f'{API}/titles/{pick(titles, i)}/'
+
+    def review_path(review):
+        pk, title_id, _ = review
+        return f'{API}/titles/{title_id}/reviews/{pk}/'
+
+    def comment_path(comment):
+        pk, review_id, _ = comment
+        return (f'{API}/titles/{review_titles[review_id]}/reviews/'
+                f'{review_id}/comments/{pk}/')
+
+    def new_review(i):
+        # Пары автор–произведение перебираются так, чтобы
+        # unique_title_author не нарушался.
+        writer = pick(writers, i)
+        title_id = titles[(i // len(writers)) % len(titles)]
+        return Call(f'{API}/titles/{title_id}/reviews/',
+                    {'text': 'Новый отзыв', 'score': i % 10 + 1},
+                    tokens(writer.pk))
+
+    def title_body(i, name):
+        return {'name': name, 'year': 2000,
+                'category': pick(categories, i),
+                'genre': [pick(genres, i), pick(genres, i + 1)]}
+
+    return [
+        Scenario('categories_list', 'GET', lambda i: Call(
+            f'{API}/categories/', None, None)),
+        Scenario('categories_search', 'GET', lambda i: Call(
+            f'{API}/categories/?search=Категория {i % 10}', None, None)),
+        Scenario('categories_create', 'POST', lambda i: Call(
+            f'{API}/categories/',
+            {'name': 'Новая', 'slug': f'{prefix}-nc{i}'}, admin)),
+        Scenario('categories_delete', 'DELETE', lambda i: Call(
+            f'{API}/categories/{data["doomed_categories"][i]}/', None,
+            admin)),
+        Scenario('genres_list', 'GET', lambda i: Call(
+            f'{API}/genres/', None, None)),
+        Scenario('genres_create', 'POST', lambda i: Call(
+            f'{API}/genres/', {'name': 'Новый', 'slug': f'{prefix}-ng{i}'},
+            admin)),
+        Scenario('genres_delete', 'DELETE', lambda i: Call(
+            f'{API}/genres/{data["doomed_genres"][i]}/', None, admin)),
+        Scenario('titles_list', 'GET', lambda i: Call(
+            f'{API}/titles/?page={i % 20 + 1}', None, None)),
+        Scenario('titles_list_cursor', 'GET', lambda i: Call(
+            f'{API}/titles/?pagination=cursor', None, None)),
+        Scenario('titles_filter_genre', 'GET', lambda i: Call(
+            f'{API}/titles/?genre={pick(genres, i)}', None, None)),
+        Scenario('titles_search', 'GET', lambda i: Call(
+            f'{API}/titles/?search=Произведение {i}', None, None)),
+        Scenario('titles_list_authenticated', 'GET', lambda i: Call(
+            f'{API}/titles/?page={i % 20 + 1}', None,
+            tokens(pick(users, i).pk))),
+        Scenario('titles_list_sparse', 'GET', lambda i: Call(
+            f'{API}/titles/?page={i % 20 + 1}&fields=id,name,rating', None,
+            tokens(pick(users, i).pk))),
+        Scenario('titles_retrieve', 'GET', lambda i: Call(
+            title_path(i), None, None)),
+        Scenario('titles_stats', 'GET', lambda i: Call(
+            f'{title_path(i)}stats/', None, None)),
+        Scenario('titles_create', 'POST', lambda i: Call(
+            f'{API}/titles/', title_body(i, f'{prefix} Новое {i}'), admin)),
+        Scenario('titles_bulk', 'POST', lambda i: Call(
+            f'{API}/titles/bulk/',
+            [title_body(i + index, f'{prefix} Пакет {i}-{index}')
+             for index in range(10)], admin)),
+        Scenario('titles_update', 'PATCH', lambda i: Call(
+            title_path(i), {'description': f'Правка {i}'}, admin)),
+        Scenario('titles_delete', 'DELETE', lambda i: Call(
+            f'{API}/titles/{data["doomed_titles"][i]}/', None, admin)),
+        Scenario('leaderboard', 'GET', lambda i: Call(
+            f'{API}/leaderboard/?limit=10', None, None)),
+        Scenario('leaderboard_category', 'GET', lambda i: Call(
+            f'{API}/leaderboard/categories/{pick(categories, i)}/', None,
+            None)),
+        Scenario('leaderboard_genre', 'GET', lambda i: Call(
+            f'{API}/leaderboard/genres/{pick(genres, i)}/', None, None)),
+        Scenario('reviews_list', 'GET', lambda i: Call(
+            f'{title_path(i)}reviews/', None, None)),
+        Scenario('reviews_retrieve', 'GET', lambda i: Call(
+            review_path(pick(reviews, i)), None, None)),
+        Scenario('reviews_create', 'POST', new_review),
+        Scenario('reviews_update', 'PATCH', lambda i: Call(
+            review_path(pick(reviews, i)), {'text': f'Правка {i}'},
+            tokens(pick(reviews, i)[2]))),
+        Scenario('reviews_delete', 'DELETE', lambda i: Call(
+            review_path(data['doomed_reviews'][i]), None,
+            tokens(data['doomed_reviews'][i][2]))),
+        Scenario('comments_list', 'GET', lambda i: Call(
+            f'{review_path(pick(reviews, i))}comments/', None, None)),
+        Scenario('comments_retrieve', 'GET', lambda i: Call(
+            comment_path(pick(comments, i)), None, None)),
+        Scenario('comments_create', 'POST', lambda i: Call(
+            f'{review_path(pick(reviews, i))}comments/',
+            {'text': 'Новый комментарий'}, tokens(pick(users, i).pk))),
+        Scenario('comments_update', 'PATCH', lambda i: Call(
+            comment_path(pick(comments, i)), {'text': f'Правка {i}'},
+            tokens(pick(comments, i)[2]))),
+        Scenario('comments_delete', 'DELETE', lambda i: Call(
+            comment_path(data['doomed_comments'][i]), None,
+            tokens(data['doomed_comments'][i][2]))),
+        Scenario('users_list', 'GET', lambda i: Call(
+            f'{API}/users/', None, admin)),
+        Scenario('users_create', 'POST', lambda i: Call(
+            f'{API}/users/', {'username': f'{prefix}new{i}',
+                              'email': f'{prefix}new{i}@yamdb.fake'},
+            admin)),
+        Scenario('users_retrieve', 'GET', lambda i: Call(
+            f'{API}/users/{pick(users, i).username}/', None, admin)),
+        Scenario('users_update', 'PATCH', lambda i: Call(
+            f'{API}/users/{pick(users, i).username}/', {'bio': f'Био {i}'},
+            admin)),
+        Scenario('users_delete', 'DELETE', lambda i: Call(
+            f'{API}/users/{data["doomed_users"][i].username}/', None,
+            admin)),
+        Scenario('users_me', 'GET', lambda i: Call(
+            f'{API}/users/me/', None, tokens(pick(users, i).pk))),
+        Scenario('users_me_update', 'PATCH', lambda i: Call(
+            f'{API}/users/me/', {'bio': f'Обо мне {i}'},
+            tokens(pick(users, i).pk))),
+        Scenario('auth_signup', 'POST', lambda i: Call(
+            f'{API}/auth/signup/', {'username': f'{prefix}s{i}',
+                                    'email': f'{prefix}s{i}@yamdb.fake'},
+            None)),
+        Scenario('auth_token', 'POST', lambda i: Call(
+            f'{API}/auth/token/', data['confirmation'](pick(users, i)),
+            None)),
+    ]
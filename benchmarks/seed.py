@@ -0,0 +1,167 @@
+"""Наполнение базы данными для бенчмарка.
+
+Все slug, названия произведений и имена пользователей получают
+префикс запуска: повторные запуски не конфликтуют с уже загруженными
+данными, а cleanup() удаляет всё, что создал запуск, и возвращает
+рейтинг, который seed() пересчитывает вместе с данными запуска.
+"""
+import random
+
+BATCH_SIZE = 2000
+
+
+def refetch(model, field, prefix):
+    """Объекты запуска после bulk_create: SQLite не возвращает id."""
+    return list(model.objects.filter(**{f'{field}__startswith': prefix})
+                .order_by('pk'))
+
+
+def database_is_empty():
+    """В базе нет ни пользователей, ни произведений: её можно
+    наполнять без риска для настоящих данных."""
+    from reviews.models import Title
+    from users.models import User
+
+    return not (User.objects.exists() or Title.objects.exists())
+
+
+def save_leaderboard():
+    """Строки рейтинга до запуска, для cleanup()."""
+    from reviews.models import LeaderboardEntry
+
+    return list(LeaderboardEntry.objects.all())
+
+
+def cleanup(prefix, leaderboard):
+    """Удаление всех строк запуска (отзывы, комментарии и связи с
+    жанрами удаляются каскадом) и возврат сохранённого рейтинга."""
+    from django.db import transaction
+    from reviews.models import Categories, Genres, LeaderboardEntry, Title
+    from reviews.signals import catalog_imported, leaderboard_refreshed
+    from users.models import User
+
+    with transaction.atomic():
+        Title.objects.filter(name__startswith=prefix).delete()
+        User.objects.filter(username__startswith=prefix).delete()
+        Categories.objects.filter(slug__startswith=f'{prefix}-').delete()
+        Genres.objects.filter(slug__startswith=f'{prefix}-').delete()
+        LeaderboardEntry.objects.all().delete()
+        LeaderboardEntry.objects.bulk_create(leaderboard)
+    catalog_imported.send(sender=cleanup)
+    leaderboard_refreshed.send(sender=cleanup)
+
+
+def seed(size, prefix, pool_size, seed=0):
+    """Каталог из size произведений с отзывами и комментариями, плюс
+    заготовки для пишущих сценариев (по pool_size объектов на удаление
+    и пар автор–произведение без отзыва). Возвращает словарь
+    идентификаторов для сценариев."""
+    from django.conf import settings
+    from reviews.leaderboard import refresh_leaderboard
+    from reviews.models import (Categories, Comment, Genres, GenreTitle,
+                                Review, Title)
+    from reviews.ratings import recalculate_ratings
+    from reviews.signals import catalog_imported, leaderboard_refreshed
+    from reviews.stats import rebuild_stats
+    from users.models import ADMIN, User
+
+    rng = random.Random(seed)
+    Categories.objects.bulk_create(
+        Categories(name=f'Категория {index}', slug=f'{prefix}-c{index}')
+        for index in range(10 + pool_size)
+    )
+    Genres.objects.bulk_create(
+        Genres(name=f'Жанр {index}', slug=f'{prefix}-g{index}')
+        for index in range(20 + pool_size)
+    )
+    categories = refetch(Categories, 'slug', prefix)
+    genres = refetch(Genres, 'slug', prefix)
+    categories, doomed_categories = categories[:10], categories[10:]
+    genres, doomed_genres = genres[:20], genres[20:]
+
+    users_count = max(20, size // 5)
+    User.objects.bulk_create(
+        [User(username=f'{prefix}admin', email=f'{prefix}admin@yamdb.fake',
+              role=ADMIN)]
+        + [User(username=f'{prefix}u{index}',
+                email=f'{prefix}u{index}@yamdb.fake')
+           for index in range(users_count + 2 * pool_size)],
+        batch_size=BATCH_SIZE,
+    )
+    users = refetch(User, 'username', prefix)
+    admin, users = users[0], users[1:]
+    users, writers, doomed_users = (
+        users[:users_count], users[users_count:users_count + pool_size],
+        users[users_count + pool_size:],
+    )
+
+    Title.objects.bulk_create(
+        (Title(name=f'{prefix} Произведение {index}',
+               year=rng.randint(1900, 2020),
+               description='Описание произведения',
+               category=rng.choice(categories))
+         for index in range(size + pool_size)),
+        batch_size=BATCH_SIZE,
+    )
+    titles = list(Title.objects.filter(name__startswith=prefix)
+                  .order_by('pk'))
+    titles, doomed_titles = titles[:size], titles[size:]
+    GenreTitle.objects.bulk_create(
+        (GenreTitle(titles=title, genry=genre)
+         for title in titles
+         for genre in rng.sample(genres, rng.randint(1, 3))),
+        batch_size=BATCH_SIZE,
+    )
+
+    Review.objects.bulk_create(
+        (Review(title=title, author=author, text='Текст отзыва',
+                score=rng.randint(1, 10))
+         for title in titles
+         for author in rng.sample(users, rng.randint(0, min(10, len(users))))),
+        batch_size=BATCH_SIZE,
+    )
+    reviews = list(Review.objects.filter(title__in=titles)
+                   .order_by('pk').values_list('pk', 'title_id',
+                                               'author_id'))
+    Comment.objects.bulk_create(
+        (Comment(review_id=review_id, author=rng.choice(users),
+                 text='Текст комментария')
+         for review_id, _, _ in reviews
+         for _ in range(rng.randint(0, 3))),
+        batch_size=BATCH_SIZE,
+    )
+    comments = list(Comment.objects.filter(review__title__in=titles)
+                    .order_by('pk').values_list('pk', 'review_id',
+                                                'author_id'))
+
+    title_ids = Title.objects.filter(name__startswith=prefix)
+    recalculate_ratings(title_ids)
+    rebuild_stats(title_ids)
+    refresh_leaderboard(settings.LEADERBOARD['SIZE'],
+                        settings.LEADERBOARD['MIN_REVIEWS'])
+    catalog_imported.send(sender=seed)
+    leaderboard_refreshed.send(sender=seed)
+
+    rng.shuffle(reviews)
+    rng.shuffle(comments)
+    # Комментарии удаляемых отзывов исчезают каскадом.
+    doomed_reviews = {pk for pk, _, _ in reviews[:pool_size]}
+    comments = [comment for comment in comments
+                if comment[1] not in doomed_reviews]
+    return {
+        'admin': admin,
+        'users': users,
+        'writers': writers,
+        'doomed_users': doomed_users,
+        'categories': [category.slug for category in categories],
+        'doomed_categories': [category.slug
+                              for category in doomed_categories],
+        'genres': [genre.slug for genre in genres],
+        'doomed_genres': [genre.slug for genre in doomed_genres],
+        'titles': [title.pk for title in titles],
+        'doomed_titles': [title.pk for title in doomed_titles],
+        'reviews': reviews[pool_size:],
+        'doomed_reviews': reviews[:pool_size],
+        'comments': comments[pool_size:],
+        'doomed_comments': comments[:pool_size],
+    }
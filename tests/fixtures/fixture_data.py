@@ -0,0 +1,80 @@
+import pytest
+
+
+@pytest.fixture
+def user(django_user_model):
+    return django_user_model.objects.create_user(
+        username='TestUser', email='testuser@yamdb.fake', password='1234567'
+    )
+
+
+@pytest.fixture
+def admin(django_user_model):
+    return django_user_model.objects.create_user(
+        username='TestAdmin', email='testadmin@yamdb.fake',
+        password='1234567', role='admin'
+    )
+
+
+@pytest.fixture
+def user_client(user):
+    from rest_framework.test import APIClient
+
+    client = APIClient()
+    client.force_authenticate(user=user)
+    return client
+
+
+@pytest.fixture
+def admin_client(admin):
+    from rest_framework.test import APIClient
+
+    client = APIClient()
+    client.force_authenticate(user=admin)
+    return client
+
+
+@pytest.fixture
+def category():
+    from reviews.models import Categories
+    return Categories.objects.create(name='Фильм', slug='movie')
+
+
+@pytest.fixture
+def genres():
+    from reviews.models import Genres
+    return [
+        Genres.objects.create(name=f'Жанр {index}', slug=f'genre-{index}')
+        for index in range(3)
+    ]
+
+
+@pytest.fixture
+def title(category, genres):
+    from reviews.models import Title
+    title = Title.objects.create(
+        name='Побег из Шоушенка', year=1994, category=category
+    )
+    title.genre.set(genres)
+    return title
+
+
+@pytest.fixture
+def authors(django_user_model):
+    return [
+        django_user_model.objects.create_user(
+            username=f'author{index}', email=f'author{index}@yamdb.fake'
+        )
+        for index in range(3)
+    ]
+
+
+@pytest.fixture(autouse=True)
+def clear_cache(settings):
+    from django.core.cache import cache
+
+    # Тесты выполняются в одном процессе, общий кэш версий не нужен.
+    settings.API_RESPONSE_CACHE = {**settings.API_RESPONSE_CACHE,
+                                   'ENABLED': True}
+    settings.PROCESS_LOCAL_CACHES = ()
+    cache.clear()
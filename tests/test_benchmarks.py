@@ -0,0 +1,129 @@
+import pytest
+
+
+class TestBenchmarkSummary:
+
+    def test_percentile_nearest_rank(self):
+        from benchmarks.run import percentile
+
+        values = list(range(1, 101))
+        assert percentile(values, 50) == 50
+        assert percentile(values, 95) == 95
+        assert percentile(values, 99) == 99
+        assert percentile([], 95) is None
+
+    def test_summarize(self):
+        from benchmarks.run import summarize
+
+        samples = [(200, 0.01, 3), (200, 0.03, 3), (404, 0.02, 1)]
+        result = summarize(samples, elapsed=0.5)
+        assert result['requests'] == 3
+        assert result['errors'] == 1
+        assert result['status_codes'] == {'200': 2, '404': 1}
+        assert result['rps'] == 6.0
+        assert result['latency_ms']['max'] == 30.0
+        assert result['queries_per_request']['max'] == 3
+
+
+@pytest.mark.django_db
+class TestQueryCountHeader:
+
+    def test_header_counts_queries(self, rf, settings):
+        from api_yamdb.db import instrumentation
+        from api_yamdb.db.querycount import HEADER, QueryCountMiddleware
+        from django.http import HttpResponse
+        from users.models import User
+
+        settings.QUERY_COUNT_HEADER = True
+
+        def view(request):
+            User.objects.count()
+            User.objects.exists()
+            return HttpResponse()
+
+        response = instrumentation.QueryInstrumentationMiddleware(
+            QueryCountMiddleware(view)
+        )(rf.get('/'))
+        assert response[HEADER] == '2', (
+            'Проверьте, что в заголовке X-DB-Queries число SQL-запросов'
+        )
+
+    def test_disabled_by_default(self, settings):
+        from django.core.exceptions import MiddlewareNotUsed
+
+        from api_yamdb.db.querycount import QueryCountMiddleware
+
+        settings.QUERY_COUNT_HEADER = False
+        with pytest.raises(MiddlewareNotUsed):
+            QueryCountMiddleware(lambda request: None)
+
+
+@pytest.mark.django_db
+class TestBenchmarkSeed:
+
+    def test_existing_database_requires_flag(self, title):
+        from benchmarks.run import main
+
+        with pytest.raises(SystemExit) as error:
+            main(['--size', '5'])
+        assert '--allow-existing-db' in str(error.value), (
+            'Проверьте, что бенчмарк не наполняет базу с данными '
+            'без --allow-existing-db'
+        )
+
+    def test_cleanup_restores_database(self, title, user, category,
+                                       genres):
+        from reviews.models import (Categories, Genres, LeaderboardEntry,
+                                    Review, Title)
+        from users.models import User
+
+        from benchmarks.seed import cleanup, save_leaderboard, seed
+
+        LeaderboardEntry.objects.create(
+            scope=LeaderboardEntry.SCOPE_ALL, position=1, title=title,
+            rating=8, review_count=3
+        )
+        before = {
+            model: set(model.objects.values_list('pk', flat=True))
+            for model in (Title, User, Categories, Genres)
+        }
+        leaderboard = save_leaderboard()
+        seed(5, 'bt', 2)
+        assert Review.objects.exists()
+        cleanup('bt', leaderboard)
+        for model, pks in before.items():
+            assert set(model.objects.values_list('pk', flat=True)) == pks, (
+                'Проверьте, что cleanup удаляет все строки запуска'
+            )
+        assert not Review.objects.exists()
+        assert list(LeaderboardEntry.objects.values_list(
+            'scope', 'position', 'title_id'
+        )) == [(LeaderboardEntry.SCOPE_ALL, 1, title.id)], (
+            'Проверьте, что cleanup возвращает прежний рейтинг'
+        )
+
+    def test_single_query_wrapper(self, client, settings, monkeypatch,
+                                  tmp_path):
+        from api.views import TitlesViewSet
+        from django.db import connection
+
+        settings.QUERY_COUNT_HEADER = True
+        settings.PROFILING = {**settings.PROFILING, 'ENABLED': True}
+        settings.SLOW_QUERY_LOG = {**settings.SLOW_QUERY_LOG,
+                                   'ENABLED': True}
+        settings.METRICS = {**settings.METRICS, 'ENABLED': True,
+                            'DIR': str(tmp_path)}
+        wrappers = []
+        list_titles = TitlesViewSet.list
+
+        def counting_list(self, request, *args, **kwargs):
+            wrappers.append(len(connection.execute_wrappers))
+            return list_titles(self, request, *args, **kwargs)
+
+        monkeypatch.setattr(TitlesViewSet, 'list', counting_list)
+        response = client.get('/api/v1/titles/')
+        assert wrappers == [1], (
+            'Проверьте, что метрики, X-DB-Queries, профилирование и журнал '
+            'медленных запросов используют одну обёртку SQL-запросов'
+        )
+        assert int(response['X-DB-Queries']) > 0
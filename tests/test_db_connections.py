@@ -0,0 +1,81 @@
+import pytest
+
+
+class FakeConnection:
+    closed = False
+
+    def get_transaction_status(self):
+        from psycopg2 import extensions
+
+        return extensions.TRANSACTION_STATUS_IDLE
+
+    def close(self):
+        self.closed = True
+
+
+class TestConnectionPool:
+
+    def test_released_connection_is_reused(self):
+        from api_yamdb.db.postgresql.base import ConnectionPool
+
+        pool = ConnectionPool(max_size=2, idle_timeout=60, timeout=0)
+        first = pool.acquire(FakeConnection, health_check=False)
+        pool.release(first)
+        assert pool.acquire(FakeConnection, health_check=False) is first, (
+            'Проверьте, что пул отдаёт свободное соединение повторно'
+        )
+
+    def test_max_size_and_idle_timeout(self):
+        from api_yamdb.db.postgresql.base import ConnectionPool, Database
+
+        pool = ConnectionPool(max_size=1, idle_timeout=0, timeout=0)
+        first = pool.acquire(FakeConnection, health_check=False)
+        with pytest.raises(Database.OperationalError):
+            pool.acquire(FakeConnection, health_check=False)
+        pool.release(first)
+        second = pool.acquire(FakeConnection, health_check=False)
+        assert second is not first and first.closed, (
+            'Проверьте, что простаивающие соединения закрываются'
+        )
+
+
+@pytest.mark.django_db
+class TestHealthChecks:
+
+    @pytest.fixture
+    def unusable(self, monkeypatch):
+        from django.db import connection
+
+        monkeypatch.setitem(connection.settings_dict,
+                            'CONN_HEALTH_CHECKS', True)
+        monkeypatch.setattr(connection, 'in_atomic_block', False)
+        monkeypatch.setattr(connection, 'autocommit', True)
+        checks = []
+        closed = []
+        monkeypatch.setattr(connection, 'is_usable',
+                            lambda: checks.append(1) or False)
+        monkeypatch.setattr(connection, 'close', lambda: closed.append(1))
+        connection.ensure_connection()
+        return checks, closed
+
+    def test_unusable_connection_is_closed(self, unusable):
+        from django.core.signals import request_started
+        from django.db import close_old_connections, connection
+
+        checks, closed = unusable
+        # Тестовый клиент Django переподключает close_old_connections
+        # после нашего обработчика; она сама обращается к соединению.
+        request_started.disconnect(close_old_connections)
+        try:
+            request_started.send(sender=None)
+        finally:
+            request_started.connect(close_old_connections)
+        assert not checks, (
+            'Проверьте, что начало запроса не обращается к базе'
+        )
+        connection.cursor().close()
+        connection.cursor().close()
+        assert checks == [1] and closed == [1], (
+            'Проверьте, что неработающее соединение проверяется один раз '
+            'за запрос, при первом обращении, и закрывается'
+        )
@@ -0,0 +1,89 @@
+import pytest
+
+
+def review_counts(prefix='gen'):
+    from reviews.models import Title
+
+    return sorted(Title.objects.filter(
+        name__startswith=f'Произведение {prefix} '
+    ).values_list('rating_count', flat=True))
+
+
+@pytest.mark.django_db
+class TestGenerateDataset:
+
+    def test_generate_dataset(self):
+        from django.core.management import call_command
+        from django.db.models import Count, Sum
+        from reviews.models import (Comment, GenreTitle, Review, Title,
+                                    TitleStats)
+
+        call_command('generate_dataset', reviews=300, titles=20, users=40,
+                     comments_per_review=2, seed=1, batch_size=7)
+        assert Review.objects.count() == 300
+        assert not Review.objects.values('title', 'author').annotate(
+            total=Count('pk')
+        ).filter(total__gt=1).exists(), (
+            'Проверьте, что у пары автор–произведение не больше одного '
+            'отзыва'
+        )
+        counts = review_counts()
+        assert counts[-1] > 3 * counts[len(counts) // 2], (
+            'Проверьте, что отзывы распределены по произведениям '
+            'неравномерно'
+        )
+        assert not Title.objects.filter(genre=None).exists()
+        assert GenreTitle.objects.count() > Title.objects.count(), (
+            'Проверьте, что у произведений бывает несколько жанров'
+        )
+        assert Comment.objects.exists()
+
+        stats = TitleStats.objects.aggregate(
+            reviews=Sum('review_count'), comments=Sum('comment_count'),
+            scores=Sum('score_sum'),
+        )
+        assert stats == {
+            'reviews': 300,
+            'comments': Comment.objects.count(),
+            'scores': Review.objects.aggregate(total=Sum('score'))['total'],
+        }, 'Проверьте, что статистика произведений посчитана при генерации'
+
+    def test_same_seed_gives_same_dataset(self):
+        from django.core.management import call_command
+        from reviews.models import Review
+
+        call_command('generate_dataset', reviews=200, titles=15, users=30,
+                     seed=3, prefix='first')
+        first = review_counts('first')
+        first_scores = list(Review.objects.order_by('pk')
+                            .values_list('score', flat=True))
+        Review.objects.all().delete()
+        call_command('generate_dataset', reviews=200, titles=15, users=30,
+                     seed=3, prefix='second')
+        second_scores = list(Review.objects.order_by('pk')
+                             .values_list('score', flat=True))
+        assert first_scores == second_scores, (
+            'Проверьте, что при одинаковом --seed набор повторяется'
+        )
+        assert review_counts('second') == first
+
+    def test_remove_dataset(self, title, user):
+        from django.core.management import call_command
+        from reviews.dataset import remove_dataset
+        from reviews.models import (Categories, Comment, Genres, Review,
+                                    Title)
+        from users.models import User
+
+        before = {
+            model: set(model.objects.values_list('pk', flat=True))
+            for model in (Title, User, Categories, Genres)
+        }
+        call_command('generate_dataset', reviews=100, titles=10, users=20,
+                     comments_per_review=2, prefix='gone')
+        remove_dataset('gone')
+        for model, pks in before.items():
+            assert set(model.objects.values_list('pk', flat=True)) == pks, (
+                'Проверьте, что remove_dataset удаляет только строки набора'
+            )
+        assert not Review.objects.exists()
+        assert not Comment.objects.exists()
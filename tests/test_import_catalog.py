@@ -0,0 +1,49 @@
+import pytest
+
+CATALOG_FILES = {
+    'category.csv': 'id,name,slug\n1,Фильм,movie\n',
+    'genre.csv': 'id,name,slug\n1,Драма,drama\n2,Комедия,comedy\n',
+    'titles.csv': 'id,name,year,category\n1,Побег,1994,1\n2,Без категории,1990,\n',
+    'genre_title.csv': 'id,title_id,genre_id\n1,1,1\n2,1,2\n',
+    'users.jsonl': (
+        '{"id": 10, "username": "reader", "email": "reader@yamdb.fake", '
+        '"role": "user"}\n'
+    ),
+    'review.csv': (
+        'id,title_id,text,author,score,pub_date\n'
+        '1,1,Отлично,10,9,2019-09-24T21:08:21.567Z\n'
+    ),
+    'comments.csv': (
+        'id,review_id,text,author,pub_date\n'
+        '1,1,Согласен,10,2019-09-25T21:08:21.567Z\n'
+    ),
+}
+
+
+@pytest.mark.django_db
+class TestImportCatalog:
+
+    def test_import_catalog(self, tmp_path):
+        from django.core.management import call_command
+        from reviews.models import Comment, Review, Title
+
+        for name, content in CATALOG_FILES.items():
+            (tmp_path / name).write_text(content, encoding='utf-8')
+        call_command('import_catalog', str(tmp_path), batch_size=1)
+        call_command('import_catalog', str(tmp_path))
+
+        title = Title.objects.get(pk=1)
+        assert sorted(title.genre.values_list('slug', flat=True)) == [
+            'comedy', 'drama'
+        ]
+        assert Title.objects.get(pk=2).category is None
+        assert (title.rating_sum, title.rating_count) == (9, 1), (
+            'Проверьте, что после загрузки пересчитывается рейтинг'
+        )
+        assert str(Review.objects.get().pub_date) == '2019-09-24', (
+            'Проверьте, что сохраняется дата публикации из файла'
+        )
+        assert Comment.objects.count() == 1, (
+            'Проверьте, что повторная загрузка не создаёт дубликаты'
+        )
+        assert not (tmp_path / '.import_progress.json').exists()
@@ -0,0 +1,44 @@
+import pytest
+
+
+@pytest.mark.django_db
+class TestIndexes:
+
+    def test_genre_title_is_unique(self, title):
+        from django.db import IntegrityError, transaction
+        from reviews.models import GenreTitle
+
+        genre = title.genre.first()
+        with pytest.raises(IntegrityError), transaction.atomic():
+            GenreTitle.objects.create(titles=title, genry=genre)
+
+    def test_composite_indexes(self):
+        from django.db import connection
+
+        with connection.cursor() as cursor:
+            reviews = connection.introspection.get_constraints(
+                cursor, 'reviews_review'
+            )
+            comments = connection.introspection.get_constraints(
+                cursor, 'reviews_comment'
+            )
+        assert reviews['review_title_pub_date_idx']['columns'] == [
+            'title_id', 'pub_date', 'id'
+        ]
+        assert comments['comment_review_pub_date_idx']['columns'] == [
+            'review_id', 'pub_date', 'id'
+        ]
+        assert not any(
+            details['index'] and details['columns'] == ['title_id']
+            for details in reviews.values()
+        ), 'Проверьте, что одиночный индекс title_id заменён составным'
+
+    def test_benchmark_requires_empty_database(self, title):
+        from benchmarks.indexes import main
+
+        with pytest.raises(SystemExit) as error:
+            main(['--repeat', '1'])
+        assert '--allow-existing-db' in str(error.value), (
+            'Проверьте, что замер индексов не откатывает миграции '
+            'на базе с данными без --allow-existing-db'
+        )
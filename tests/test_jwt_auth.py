@@ -0,0 +1,53 @@
+import pytest
+
+
+@pytest.mark.django_db
+class TestCachedJWTAuthentication:
+
+    @pytest.fixture
+    def token_client(self, user):
+        from rest_framework.test import APIClient
+        from rest_framework_simplejwt.tokens import AccessToken
+
+        client = APIClient()
+        client.credentials(
+            HTTP_AUTHORIZATION=f'Bearer {AccessToken.for_user(user)}'
+        )
+        return client
+
+    def test_repeated_request_skips_users_table(self, token_client, title):
+        from django.db import connection
+        from django.test.utils import CaptureQueriesContext
+
+        url = f'/api/v1/titles/{title.id}/reviews/'
+        token_client.get(url)
+        with CaptureQueriesContext(connection) as context:
+            response = token_client.get(url)
+        assert response.status_code == 200
+        assert not any(
+            'users_user' in query['sql']
+            for query in context.captured_queries
+        ), 'Проверьте, что пользователь из токена берётся из кэша'
+
+    def test_cached_user_keeps_fields(self, token_client, user):
+        token_client.get('/api/v1/users/')
+        assert token_client.get('/api/v1/users/').status_code == 403, (
+            'Проверьте, что пользователь из кэша сохраняет роль и права'
+        )
+
+    def test_role_change_applies_immediately(self, token_client, user):
+        assert token_client.get('/api/v1/users/').status_code == 403
+        user.role = 'admin'
+        user.save()
+        assert token_client.get('/api/v1/users/').status_code == 200, (
+            'Проверьте, что смена роли сбрасывает кэш пользователя'
+        )
+        user.is_active = False
+        user.save()
+        assert token_client.get('/api/v1/users/').status_code == 401
+
+    def test_me_returns_full_profile(self, token_client, user):
+        token_client.get('/api/v1/users/me/')
+        response = token_client.get('/api/v1/users/me/')
+        assert response.status_code == 200
+        assert response.json()['email'] == user.email
@@ -0,0 +1,97 @@
+import pytest
+
+
+@pytest.mark.django_db
+class TestLeaderboard:
+
+    @pytest.fixture
+    def ranked(self, title, category, genres, authors):
+        from reviews.models import Review, Title
+
+        other = Title.objects.create(name='Другое', year=2000,
+                                     category=category)
+        other.genre.set(genres[:1])
+        single = Title.objects.create(name='Один отзыв', year=2001)
+        for author, score in zip(authors, (6, 8, 7)):
+            Review.objects.create(title=title, author=author,
+                                  text='Отзыв', score=score)
+        for author, score in zip(authors, (9, 9, 9)):
+            Review.objects.create(title=other, author=author,
+                                  text='Отзыв', score=score)
+        Review.objects.create(title=single, author=authors[0],
+                              text='Отзыв', score=10)
+        return other, title, single
+
+    def refresh(self, **options):
+        from django.core.management import call_command
+
+        call_command('refresh_leaderboard', **options)
+
+    def test_overall_respects_min_reviews(self, client, ranked):
+        other, title, single = ranked
+        self.refresh(min_reviews=3)
+        data = client.get('/api/v1/leaderboard/').json()
+        assert [entry['title']['id'] for entry in data] == [
+            other.id, title.id
+        ], (
+            'Проверьте, что рейтинг отсортирован по средней оценке '
+            'и не содержит произведений с малым числом отзывов'
+        )
+        assert data[0]['position'] == 1
+        assert data[0]['rating'] == 9
+
+        self.refresh(min_reviews=1)
+        data = client.get('/api/v1/leaderboard/?limit=1').json()
+        assert [entry['title']['id'] for entry in data] == [single.id]
+
+    def test_category_and_genre_boards(self, client, ranked, genres):
+        other, title, single = ranked
+        self.refresh(min_reviews=1)
+        category_board = client.get(
+            '/api/v1/leaderboard/categories/movie/'
+        ).json()
+        assert [entry['title']['id'] for entry in category_board] == [
+            other.id, title.id
+        ]
+        genre_board = client.get(
+            f'/api/v1/leaderboard/genres/{genres[1].slug}/'
+        ).json()
+        assert [entry['title']['id'] for entry in genre_board] == [
+            title.id
+        ], 'Проверьте рейтинг по жанру'
+        assert client.get(
+            '/api/v1/leaderboard/genres/unknown/'
+        ).json() == []
+
+    def test_read_does_not_depend_on_catalog(
+            self, client, ranked, django_assert_num_queries):
+        from django.db import connection
+        from django.test.utils import CaptureQueriesContext
+
+        self.refresh(min_reviews=1)
+        with django_assert_num_queries(2):
+            client.get('/api/v1/leaderboard/?limit=50')
+        with CaptureQueriesContext(connection) as context:
+            client.get('/api/v1/leaderboard/genres/genre-0/?limit=50')
+        assert not any(
+            'reviews_review' in query['sql']
+            for query in context.captured_queries
+        ), 'Проверьте, что рейтинг читается из заранее посчитанной таблицы'
+
+    def test_refresh_query_count_does_not_grow(self, ranked):
+        from django.db import connection
+        from django.test.utils import CaptureQueriesContext
+        from reviews.models import Genres
+
+        with CaptureQueriesContext(connection) as before:
+            self.refresh(min_reviews=1)
+        Genres.objects.bulk_create(
+            Genres(name=f'Жанр {index}', slug=f'extra-{index}')
+            for index in range(5)
+        )
+        with CaptureQueriesContext(connection) as after:
+            self.refresh(min_reviews=1)
+        assert len(after.captured_queries) == len(before.captured_queries), (
+            'Проверьте, что все разделы рейтинга считаются одним запросом, '
+            'а не запросом на каждую категорию и жанр'
+        )
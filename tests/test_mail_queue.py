@@ -0,0 +1,69 @@
+import pytest
+from django.core.mail.backends.base import BaseEmailBackend
+
+
+class FailingBackend(BaseEmailBackend):
+    """Почтовый сервер, отклоняющий все письма."""
+
+    def send_messages(self, email_messages):
+        raise ConnectionError('SMTP недоступен')
+
+
+@pytest.mark.django_db
+class TestMailQueue:
+
+    def test_signup_only_enqueues(self, client, mailoutbox):
+        from mailqueue.models import OutboundEmail
+
+        response = client.post('/api/v1/auth/signup/', data={
+            'username': 'newcomer', 'email': 'newcomer@yamdb.fake'
+        })
+        assert response.status_code == 200
+        assert mailoutbox == [], (
+            'Проверьте, что регистрация не отправляет письмо во время запроса'
+        )
+        email = OutboundEmail.objects.get()
+        assert email.to == 'newcomer@yamdb.fake'
+        assert email.status == OutboundEmail.PENDING
+
+    def test_worker_sends_batch(self, mailoutbox):
+        from django.core.management import call_command
+        from mailqueue.models import OutboundEmail
+        from mailqueue.queue import enqueue
+
+        for index in range(3):
+            enqueue('Your code', f'code-{index}', f'user{index}@yamdb.fake')
+        call_command('send_queued_mail', batch_size=2)
+        assert len(mailoutbox) == 2
+        call_command('send_queued_mail', batch_size=2)
+        assert [message.to for message in mailoutbox] == [
+            [f'user{index}@yamdb.fake'] for index in range(3)
+        ]
+        assert not OutboundEmail.objects.exclude(
+            status=OutboundEmail.SENT
+        ).exists(), 'Проверьте, что отправленные письма помечаются'
+
+    def test_failed_send_is_retried_with_backoff(self, settings):
+        from django.utils import timezone
+        from mailqueue.models import OutboundEmail
+        from mailqueue.queue import enqueue, send_batch
+
+        settings.EMAIL_BACKEND = 'tests.test_mail_queue.FailingBackend'
+        settings.MAIL_QUEUE = {**settings.MAIL_QUEUE, 'MAX_ATTEMPTS': 2}
+        email = enqueue('Your code', 'code', 'user@yamdb.fake')
+        assert send_batch(10) == (0, 1)
+        email.refresh_from_db()
+        assert email.status == OutboundEmail.PENDING
+        assert email.attempts == 1
+        assert email.next_attempt_at > timezone.now(), (
+            'Проверьте, что повторная попытка откладывается'
+        )
+        assert send_batch(10) == (0, 0)
+
+        OutboundEmail.objects.update(next_attempt_at=timezone.now())
+        send_batch(10)
+        email.refresh_from_db()
+        assert email.status == OutboundEmail.FAILED, (
+            'Проверьте, что после MAX_ATTEMPTS письмо больше не отправляется'
+        )
+        assert 'SMTP' in email.last_error
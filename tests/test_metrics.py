@@ -0,0 +1,112 @@
+import json
+import os
+import subprocess
+import sys
+import threading
+import time
+
+import pytest
+
+LIST_LABELS = 'view="TitlesViewSet.list",method="GET",status="200"'
+
+
+@pytest.fixture
+def metrics(settings, tmp_path):
+    from api.metrics import registry
+
+    settings.METRICS = {**settings.METRICS, 'DIR': str(tmp_path),
+                        'TOKEN': ''}
+    registry.clear()
+    yield tmp_path
+    registry.clear()
+
+
+def finished_pid():
+    process = subprocess.Popen([sys.executable, '-c', ''])
+    process.wait()
+    return process.pid
+
+
+@pytest.mark.django_db
+class TestMetrics:
+
+    def test_metrics_by_view_and_action(self, client, metrics):
+        client.get('/api/v1/titles/')
+        client.get('/api/v1/titles/')
+        client.get('/api/v1/no-such-page/')
+        response = client.get('/metrics')
+        assert response.status_code == 200
+        body = response.content.decode()
+        assert f'yamdb_http_requests_total{{{LIST_LABELS}}} 2' in body, (
+            'Проверьте, что запросы считаются по представлению и действию'
+        )
+        assert (f'yamdb_http_request_duration_seconds_count{{{LIST_LABELS}}}'
+                ' 2') in body
+        assert f'yamdb_db_queries_total{{{LIST_LABELS}}}' in body
+        assert f'yamdb_http_response_size_bytes_sum{{{LIST_LABELS}}}' in body
+        assert 'view="unresolved",method="GET",status="404"' in body
+
+    def test_workers_are_summed(self, client, metrics):
+        from api.metrics import Registry
+
+        other = Registry()
+        other.observe(('TitlesViewSet.list', 'GET', '200'), 0.02, 3, 0.01,
+                      100)
+        (metrics / f'{os.getppid()}-1.json').write_text(
+            json.dumps(other.snapshot())
+        )
+        client.get('/api/v1/titles/')
+        body = client.get('/metrics').content.decode()
+        assert f'yamdb_http_requests_total{{{LIST_LABELS}}} 2' in body, (
+            'Проверьте, что /metrics суммирует счётчики всех воркеров'
+        )
+
+    def test_token(self, client, metrics, settings):
+        settings.METRICS = {**settings.METRICS, 'TOKEN': 'secret'}
+        assert client.get('/metrics').status_code == 403
+        response = client.get('/metrics', HTTP_AUTHORIZATION='Bearer secret')
+        assert response.status_code == 200
+
+    def test_dead_workers_are_adopted(self, client, metrics):
+        from api.metrics import Registry, registry
+
+        other = Registry()
+        other.observe(('TitlesViewSet.list', 'GET', '200'), 0.02, 3, 0.01,
+                      100)
+        rows = json.dumps(other.snapshot())
+        (metrics / f'{finished_pid()}-1.json').write_text(rows)
+        (metrics / f'{os.getpid()}-1.json').write_text(rows)
+        registry.pid = None
+        client.get('/api/v1/titles/')
+        assert sorted(path.name for path in metrics.glob('*.json')) == [
+            registry.file_name
+        ], (
+            'Проверьте, что файлы завершившихся воркеров и прежнего '
+            'процесса с тем же pid удаляются при запуске'
+        )
+        body = client.get('/metrics').content.decode()
+        assert f'yamdb_http_requests_total{{{LIST_LABELS}}} 3' in body, (
+            'Проверьте, что счётчики завершившихся воркеров не теряются'
+        )
+
+    def test_flush_runs_in_background(self, client, metrics, settings,
+                                      monkeypatch):
+        from api.metrics import registry
+
+        settings.METRICS = {**settings.METRICS, 'FLUSH_INTERVAL': 0.01}
+        threads = []
+        flush = registry.flush
+        monkeypatch.setattr(registry, 'flush', lambda: (
+            threads.append(threading.current_thread().name), flush()
+        ))
+        registry.pid = None
+        client.get('/api/v1/titles/')
+        client.get('/api/v1/titles/')
+        time.sleep(0.1)
+        assert threads and set(threads) == {'metrics-flush'}, (
+            'Проверьте, что счётчики записываются в файл фоновым потоком, '
+            'а не при обработке запроса'
+        )
+        assert list(metrics.glob('*.json')) == [
+            metrics / registry.file_name
+        ]
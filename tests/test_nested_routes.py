@@ -0,0 +1,40 @@
+import pytest
+
+
+@pytest.mark.django_db
+class TestNestedRoutes:
+
+    def test_comments_require_matching_title(self, client, title, authors):
+        from reviews.models import Review, Title
+
+        other = Title.objects.create(name='Другое', year=2000)
+        review = Review.objects.create(
+            title=title, author=authors[0], text='Отзыв', score=5
+        )
+        assert client.get(
+            f'/api/v1/titles/{title.id}/reviews/{review.id}/comments/'
+        ).status_code == 200
+        response = client.get(
+            f'/api/v1/titles/{other.id}/reviews/{review.id}/comments/'
+        )
+        assert response.status_code == 404, (
+            'Проверьте, что отзыв ищется только среди отзывов title_id'
+        )
+
+    def test_comment_create_loads_parents_once(
+            self, user_client, title, authors, django_assert_max_num_queries):
+        from reviews.models import Review
+
+        review = Review.objects.create(
+            title=title, author=authors[0], text='Отзыв', score=5
+        )
+        url = f'/api/v1/titles/{title.id}/reviews/{review.id}/comments/'
+        with django_assert_max_num_queries(3) as context:
+            response = user_client.post(url, data={'text': 'Комментарий'})
+        assert response.status_code == 201
+        assert response.json()['review'] == review.text
+        assert sum(
+            query['sql'].startswith('SELECT')
+            and 'reviews_review' in query['sql']
+            for query in context.captured_queries
+        ) == 1
@@ -0,0 +1,98 @@
+import json
+from base64 import urlsafe_b64encode
+
+import pytest
+
+
+@pytest.fixture
+def reviews(title, django_user_model):
+    from reviews.models import Review
+
+    return [
+        Review.objects.create(
+            title=title,
+            author=django_user_model.objects.create_user(
+                username=f'critic{index}', email=f'critic{index}@yamdb.fake'
+            ),
+            text=f'Отзыв {index}',
+            score=index % 11,
+        )
+        for index in range(12)
+    ]
+
+
+@pytest.mark.django_db
+class TestCursorPagination:
+
+    def test_page_number_is_default(self, client, title, reviews):
+        response = client.get(f'/api/v1/titles/{title.id}/reviews/')
+        assert response.json()['count'] == len(reviews), (
+            'Проверьте, что без параметра pagination ответ содержит count'
+        )
+
+    def test_cursor_walks_all_reviews(self, client, title, reviews,
+                                      django_assert_max_num_queries):
+        url = f'/api/v1/titles/{title.id}/reviews/?pagination=cursor'
+        seen = []
+        pages = []
+        while url:
+            with django_assert_max_num_queries(2):
+                data = client.get(url).json()
+            assert 'count' not in data, (
+                'Проверьте, что в режиме курсора не выполняется COUNT(*)'
+            )
+            seen.extend(review['id'] for review in data['results'])
+            pages.append(url)
+            url = data['next']
+        assert seen == [review.id for review in reviews], (
+            'Проверьте, что курсор проходит все отзывы по порядку без повторов'
+        )
+
+        previous = client.get(pages[-1]).json()['previous']
+        assert [
+            review['id'] for review in client.get(previous).json()['results']
+        ] == seen[5:10], (
+            'Проверьте, что ссылка previous возвращает предыдущую страницу'
+        )
+
+    def test_invalid_cursor(self, client, title):
+        response = client.get(
+            f'/api/v1/titles/{title.id}/reviews/?cursor=broken'
+        )
+        assert response.status_code == 404
+
+    @pytest.mark.parametrize('position', [
+        ['abc', 1],
+        ['2026-10-18T18:00:00Z', 'abc'],
+        ['2026-10-18T18:00:00Z', [1]],
+        [None, 1],
+    ])
+    def test_tampered_cursor(self, client, title, reviews, position):
+        cursor = urlsafe_b64encode(
+            json.dumps({'p': position}).encode()
+        ).decode()
+        response = client.get(
+            f'/api/v1/titles/{title.id}/reviews/?cursor={cursor}'
+        )
+        assert response.status_code == 404, (
+            'Проверьте, что курсор с некорректными значениями даёт 404'
+        )
+
+    def test_comments_have_stable_order(self, client, title, reviews):
+        from reviews.models import Comment
+
+        review = reviews[0]
+        comments = [
+            Comment.objects.create(review=review, author=reviews[index].author,
+                                   text=f'Комментарий {index}')
+            for index in range(7)
+        ]
+        url = f'/api/v1/titles/{title.id}/reviews/{review.id}/comments/'
+        seen = []
+        while url:
+            data = client.get(url).json()
+            seen.extend(comment['id'] for comment in data['results'])
+            url = data['next']
+        assert seen == [comment.id for comment in comments], (
+            'Проверьте, что комментарии упорядочены по дате и id'
+        )
@@ -0,0 +1,77 @@
+import pytest
+
+
+@pytest.fixture
+def profiles(settings, tmp_path):
+    settings.PROFILING = {**settings.PROFILING, 'DIR': str(tmp_path),
+                          'KEEP': 2}
+    return tmp_path
+
+
+def bearer(user):
+    from rest_framework_simplejwt.tokens import AccessToken
+
+    return {'HTTP_AUTHORIZATION': f'Bearer {AccessToken.for_user(user)}'}
+
+
+@pytest.mark.django_db
+class TestProfiling:
+
+    def test_admin_request_is_profiled(self, client, admin, title,
+                                       profiles):
+        response = client.get(f'/api/v1/titles/?genre={title.genre.first()}'
+                              '&_profile=1', **bearer(admin))
+        assert response.status_code == 200
+        profile_id = response['X-Profile-Id']
+        assert (profiles / f'{profile_id}.prof').exists()
+
+        listing = client.get('/api/v1/profiles/', **bearer(admin))
+        assert listing.status_code == 200
+        assert [item['id'] for item in listing.json()] == [profile_id]
+        assert listing.json()[0]['queries'] > 0
+
+        detail = client.get(f'/api/v1/profiles/{profile_id}/',
+                            **bearer(admin)).json()
+        assert any('reviews_title' in query['sql']
+                   for query in detail['sql']), (
+            'Проверьте, что в профиль попадают SQL-запросы'
+        )
+        assert detail['functions'], (
+            'Проверьте, что в профиль попадают затратные функции'
+        )
+
+    def test_only_admin_can_profile(self, client, user, title, profiles):
+        response = client.get('/api/v1/titles/', HTTP_X_PROFILE='1',
+                              **bearer(user))
+        assert response.status_code == 200
+        assert 'X-Profile-Id' not in response
+        assert not list(profiles.iterdir())
+        assert client.get('/api/v1/profiles/',
+                          **bearer(user)).status_code == 403
+
+    def test_retention(self, client, admin, profiles):
+        ids = [
+            client.get('/api/v1/genres/', HTTP_X_PROFILE='1',
+                       **bearer(admin))['X-Profile-Id']
+            for _ in range(3)
+        ]
+        listing = client.get('/api/v1/profiles/', **bearer(admin)).json()
+        assert len(listing) == 2, (
+            'Проверьте, что хранятся только последние PROFILING["KEEP"] '
+            'профилей'
+        )
+        assert len(set(ids)) == 3
+        assert [item['id'] for item in listing] == ids[:0:-1], (
+            'Проверьте, что сохраняются два последних профиля, '
+            'новый первым'
+        )
+
+    def test_ids_follow_creation_order(self, monkeypatch):
+        from api import profiling
+
+        monkeypatch.setattr(profiling.time, 'time_ns', lambda: 10 ** 18)
+        ids = [profiling.new_profile_id() for _ in range(5)]
+        assert ids == sorted(ids) and len(set(ids)) == 5, (
+            'Проверьте, что идентификаторы профилей одной наносекунды '
+            'упорядочены по времени создания'
+        )
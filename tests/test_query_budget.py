@@ -0,0 +1,179 @@
+import re
+
+import pytest
+
+TITLES_COUNT = 7
+REVIEWS_COUNT = 6
+COMMENTS_COUNT = 6
+
+
+@pytest.fixture
+def catalog(django_user_model):
+    from reviews.models import Categories, Comment, Genres, Review, Title
+
+    authors = [
+        django_user_model.objects.create_user(
+            username=f'reader{index}', email=f'reader{index}@yamdb.fake'
+        )
+        for index in range(REVIEWS_COUNT)
+    ]
+    genres = [
+        Genres.objects.create(name=f'Жанр {index}', slug=f'genre-{index}')
+        for index in range(TITLES_COUNT + 1)
+    ]
+    titles = []
+    for index in range(TITLES_COUNT):
+        category = Categories.objects.create(
+            name=f'Категория {index}', slug=f'category-{index}'
+        )
+        title = Title.objects.create(
+            name=f'Произведение {index}', year=2000, category=category
+        )
+        title.genre.set(genres[index:index + 2])
+        titles.append(title)
+    reviews = [
+        Review.objects.create(
+            title=titles[0], author=author, text='Отзыв', score=index
+        )
+        for index, author in enumerate(authors)
+    ]
+    for author in authors[:COMMENTS_COUNT]:
+        Comment.objects.create(
+            review=reviews[0], author=author, text='Комментарий'
+        )
+    return {'title': titles[0], 'review': reviews[0]}
+
+
+QUERY_BUDGET = (
+    ('/api/v1/titles/', 3),
+    ('/api/v1/titles/{title}/', 2),
+    ('/api/v1/titles/{title}/reviews/', 3),
+    ('/api/v1/titles/{title}/reviews/{review}/', 2),
+    ('/api/v1/titles/{title}/reviews/{review}/comments/', 3),
+    ('/api/v1/titles/{title}/reviews/{review}/comments/{comment}/', 2),
+    ('/api/v1/categories/', 2),
+    ('/api/v1/genres/', 2),
+    ('/api/v1/users/', 2),
+    ('/api/v1/users/me/', 0),
+)
+
+
+@pytest.mark.django_db
+class TestQueryBudget:
+
+    @pytest.mark.parametrize('url, budget', QUERY_BUDGET)
+    def test_endpoint_query_budget(self, admin_client, catalog,
+                                   django_assert_max_num_queries,
+                                   url, budget):
+        url = url.format(
+            title=catalog['title'].id,
+            review=catalog['review'].id,
+            comment=catalog['review'].comments.first().id,
+        )
+        with django_assert_max_num_queries(budget):
+            response = admin_client.get(url)
+        assert response.status_code == 200, (
+            f'Проверьте, что GET-запрос к `{url}` возвращает статус 200'
+        )
+
+
+@pytest.mark.django_db
+class TestTitleWriteQueryBudget:
+
+    def test_create_title_resolves_slugs_from_registry(
+            self, admin_client, category, genres, django_assert_num_queries):
+        data = {
+            'category': category.slug,
+            'genre': [genre.slug for genre in genres],
+            'year': 2001,
+        }
+        admin_client.post(
+            '/api/v1/titles/', data={**data, 'name': 'Первое'}, format='json'
+        )
+        # Вставка произведения, жанров и строки статистики.
+        with django_assert_num_queries(6) as context:
+            response = admin_client.post(
+                '/api/v1/titles/', data={**data, 'name': 'Второе'},
+                format='json'
+            )
+        assert response.status_code == 201
+        assert not any(
+            re.search(r'"slug" (=|IN)', query['sql'])
+            for query in context.captured_queries
+        ), 'Проверьте, что slug жанров и категорий берутся из реестра'
+
+    def test_local_cache_confirms_slugs(self, admin_client, category,
+                                        genres, settings):
+        from django.db import connection
+
+        settings.PROCESS_LOCAL_CACHES = (
+            'django.core.cache.backends.locmem.LocMemCache',
+        )
+        data = {'year': 2001, 'category': category.slug,
+                'genre': [genre.slug for genre in genres]}
+        admin_client.post('/api/v1/titles/',
+                          data={**data, 'name': 'Первое'}, format='json')
+        # Удаление в другом процессе: сигналы этого процесса его не видят.
+        with connection.cursor() as cursor:
+            cursor.execute('DELETE FROM reviews_genretitle')
+            cursor.execute('DELETE FROM reviews_genres WHERE id = %s',
+                           [genres[0].id])
+        response = admin_client.post(
+            '/api/v1/titles/', data={**data, 'name': 'Второе'},
+            format='json'
+        )
+        assert response.status_code == 400, (
+            'Проверьте, что с кэшем в памяти процесса slug из реестра '
+            'сверяются с базой'
+        )
+
+    def test_unknown_genre_slug(self, admin_client, category, genres):
+        response = admin_client.post('/api/v1/titles/', data={
+            'name': 'Произведение',
+            'year': 2001,
+            'category': category.slug,
+            'genre': [genres[0].slug, 'unknown'],
+        }, format='json')
+        assert response.status_code == 400
+        assert response.json()['genre'] == [
+            'Жанр не входит в представленный список'
+        ]
+
+    def test_bulk_create_titles(self, admin_client, category, genres,
+                                django_assert_max_num_queries):
+        from django.db import connection
+        from reviews.models import Title
+
+        data = [
+            {'name': f'Произведение {index}', 'year': 2000 + index,
+             'category': category.slug,
+             'genre': [genre.slug for genre in genres]}
+            for index in range(20)
+        ]
+        budget = 8
+        if not connection.features.can_return_ids_from_bulk_insert:
+            # Произведение и его строка статистики сохраняются по одной.
+            budget += 2 * len(data)
+        with django_assert_max_num_queries(budget):
+            response = admin_client.post(
+                '/api/v1/titles/bulk/', data=data, format='json'
+            )
+        assert response.status_code == 201, response.json()
+        assert Title.objects.count() == 20
+        assert response.json()[0]['genre'][0]['slug'] == genres[0].slug
+
+    def test_bulk_create_reports_item_errors(self, admin_client, category):
+        from reviews.models import Title
+
+        response = admin_client.post('/api/v1/titles/bulk/', data=[
+            {'name': 'Верное', 'year': 2000, 'category': category.slug,
+             'genre': []},
+            {'name': 'Ошибочное', 'year': 2000, 'category': 'unknown',
+             'genre': []},
+        ], format='json')
+        assert response.status_code == 400
+        errors = response.json()
+        assert errors[0] == {} and 'category' in errors[1], (
+            'Проверьте, что ошибки возвращаются для каждого произведения'
+        )
+        assert not Title.objects.exists()
@@ -0,0 +1,64 @@
+import pytest
+
+
+@pytest.mark.django_db
+class TestTitleRating:
+
+    def test_rating_follows_reviews(self, title, authors):
+        from reviews.models import Review
+
+        first = Review.objects.create(
+            title=title, author=authors[0], text='Хорошо', score=10
+        )
+        Review.objects.create(
+            title=title, author=authors[1], text='Так себе', score=5
+        )
+        title.refresh_from_db()
+        assert (title.rating_sum, title.rating_count) == (15, 2), (
+            'Проверьте, что при создании отзыва обновляется рейтинг произведения'
+        )
+
+        first = Review.objects.get(pk=first.pk)
+        first.score = 1
+        first.save()
+        title.refresh_from_db()
+        assert (title.rating_sum, title.rating_count) == (6, 2), (
+            'Проверьте, что при изменении отзыва обновляется рейтинг произведения'
+        )
+
+        first.delete()
+        title.refresh_from_db()
+        assert (title.rating_sum, title.rating_count) == (5, 1), (
+            'Проверьте, что при удалении отзыва обновляется рейтинг произведения'
+        )
+        assert title.rating == 5
+
+    def test_recalculate_ratings_command(self, title, authors):
+        from django.core.management import call_command
+        from reviews.models import Review, Title
+
+        for author, score in zip(authors, (2, 4, 9)):
+            Review.objects.create(
+                title=title, author=author, text='Отзыв', score=score
+            )
+        Title.objects.update(rating_sum=0, rating_count=0)
+        call_command('recalculate_ratings')
+        title.refresh_from_db()
+        assert (title.rating_sum, title.rating_count) == (15, 3), (
+            'Проверьте, что команда recalculate_ratings пересчитывает рейтинг'
+        )
+
+    def test_title_read_does_not_aggregate(self, client, title, authors):
+        from django.db import connection
+        from django.test.utils import CaptureQueriesContext
+        from reviews.models import Review
+
+        Review.objects.create(
+            title=title, author=authors[0], text='Отзыв', score=7
+        )
+        with CaptureQueriesContext(connection) as context:
+            response = client.get(f'/api/v1/titles/{title.id}/')
+        assert response.json()['rating'] == 7
+        assert not any(
+            'reviews_review' in query['sql'] for query in context.captured_queries
+        ), 'Проверьте, что чтение произведения не агрегирует таблицу отзывов'
@@ -0,0 +1,120 @@
+import pytest
+
+
+@pytest.fixture
+def replicas(settings):
+    settings.REPLICA_DATABASES = ['replica1']
+    settings.REPLICA_STICKY_SECONDS = 5
+
+
+def route(request, status=200):
+    """Прогон запроса через middleware; возвращает базу, выбранную
+    роутером для чтения внутри запроса."""
+    from api_yamdb.db.routers import ReplicaRouter, ReplicaRoutingMiddleware
+    from django.http import HttpResponse
+    from reviews.models import Review
+
+    chosen = []
+
+    def view(request):
+        chosen.append(ReplicaRouter().db_for_read(Review))
+        return HttpResponse(status=status)
+
+    ReplicaRoutingMiddleware(view)(request)
+    return chosen[0]
+
+
+def bearer(user_id):
+    import base64
+    import json
+
+    payload = base64.urlsafe_b64encode(
+        json.dumps({'user_id': user_id}).encode()
+    ).decode().rstrip('=')
+    return f'Bearer header.{payload}.signature'
+
+
+class TestReplicaRouter:
+
+    def test_reads_go_to_replica_and_writes_to_primary(self, rf, replicas):
+        from api_yamdb.db.routers import ReplicaRouter
+        from reviews.models import Review
+
+        assert route(rf.get('/api/v1/titles/')) == 'replica1'
+        assert route(rf.post('/api/v1/titles/')) == 'default'
+        assert ReplicaRouter().db_for_write(Review) == 'default'
+        assert ReplicaRouter().db_for_read(Review) == 'default', (
+            'Проверьте, что вне запроса чтение идёт в основную базу'
+        )
+
+    def test_user_reads_primary_after_write(self, rf, replicas):
+        author = {'HTTP_AUTHORIZATION': bearer(1)}
+        other = {'HTTP_AUTHORIZATION': bearer(2)}
+        route(rf.post('/api/v1/titles/1/reviews/', **author), status=201)
+        assert route(rf.get('/api/v1/titles/1/reviews/', **author)) == (
+            'default'
+        ), 'Проверьте, что автор сразу после записи читает основную базу'
+        assert route(rf.get('/api/v1/titles/1/reviews/', **other)) == (
+            'replica1'
+        )
+
+    def test_failed_write_does_not_pin(self, rf, replicas):
+        author = {'HTTP_AUTHORIZATION': bearer(1)}
+        route(rf.post('/api/v1/titles/1/reviews/', **author), status=400)
+        assert route(rf.get('/api/v1/titles/', **author)) == 'replica1'
+
+    def test_without_replicas_everything_uses_primary(self, rf):
+        assert route(rf.get('/api/v1/titles/')) == 'default'
+
+    def test_one_replica_per_request(self, rf, settings):
+        from api_yamdb.db.routers import (ReplicaRouter,
+                                          ReplicaRoutingMiddleware)
+        from django.http import HttpResponse
+        from reviews.models import Review
+
+        settings.REPLICA_DATABASES = [f'replica{index}'
+                                      for index in range(1, 9)]
+        chosen = set()
+
+        def view(request):
+            chosen.update(ReplicaRouter().db_for_read(Review)
+                          for _ in range(20))
+            return HttpResponse()
+
+        ReplicaRoutingMiddleware(view)(rf.get('/api/v1/titles/'))
+        assert len(chosen) == 1, (
+            'Проверьте, что все чтения запроса идут в одну реплику'
+        )
+
+    def test_anonymous_write_does_not_pin(self, rf, replicas):
+        route(rf.post('/api/v1/auth/signup/'), status=200)
+        assert route(rf.get('/api/v1/titles/')) == 'replica1', (
+            'Проверьте, что анонимная запись не закрепляет за основной '
+            'базой всех анонимных клиентов'
+        )
+
+    @pytest.mark.django_db
+    def test_changed_groups_read_primary(self, client, title, replicas,
+                                         monkeypatch):
+        from api.cache import bump_versions
+        from api_yamdb.db import routers
+
+        chosen = []
+        original = routers.ReplicaRouter.db_for_read
+
+        def db_for_read(self, model, **hints):
+            chosen.append(original(self, model, **hints))
+            return 'default'
+
+        monkeypatch.setattr(routers.ReplicaRouter, 'db_for_read',
+                            db_for_read)
+        url = f'/api/v1/titles/{title.id}/'
+        client.get(url)
+        assert set(chosen) == {'replica1'}
+        chosen.clear()
+        bump_versions([f'title:{title.id}'])
+        client.get(url)
+        assert set(chosen) == {'default'}, (
+            'Проверьте, что ответы по недавно изменённым группам читаются '
+            'с основной базы'
+        )
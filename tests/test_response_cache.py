@@ -0,0 +1,95 @@
+import pytest
+
+
+@pytest.mark.django_db(transaction=True)
+class TestResponseCache:
+
+    def test_anonymous_list_is_cached(self, client, title,
+                                      django_assert_num_queries):
+        client.get('/api/v1/titles/?year=1994&name=Побег')
+        with django_assert_num_queries(0):
+            response = client.get('/api/v1/titles/?name=Побег&year=1994')
+        assert response.status_code == 200
+        assert response.json()['count'] == 1, (
+            'Проверьте, что повторный анонимный запрос отдаётся из кэша '
+            'независимо от порядка параметров'
+        )
+
+    def test_review_invalidates_title(self, client, title, authors):
+        from reviews.models import Review
+
+        url = f'/api/v1/titles/{title.id}/'
+        assert client.get(url).json()['rating'] is None
+        Review.objects.create(
+            title=title, author=authors[0], text='Отзыв', score=8
+        )
+        assert client.get(url).json()['rating'] == 8, (
+            'Проверьте, что новый отзыв сбрасывает кэш карточки произведения'
+        )
+
+    def test_genre_change_invalidates_genres(self, client, genres):
+        response = client.get('/api/v1/genres/')
+        assert response.json()['count'] == len(genres)
+        genres[0].delete()
+        assert client.get('/api/v1/genres/').json()['count'] == (
+            len(genres) - 1
+        ), 'Проверьте, что удаление жанра сбрасывает кэш списка жанров'
+
+
+@pytest.mark.django_db(transaction=True)
+class TestConditionalGet:
+
+    def test_not_modified_without_queries(self, client, title, authors,
+                                          django_assert_num_queries):
+        from reviews.models import Review
+
+        review = Review.objects.create(
+            title=title, author=authors[0], text='Отзыв', score=8
+        )
+        url = f'/api/v1/titles/{title.id}/reviews/'
+        etag = client.get(url)['ETag']
+        with django_assert_num_queries(0):
+            response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == 304, (
+            'Проверьте, что при совпадении ETag возвращается 304'
+        )
+
+        comments_url = f'{url}{review.id}/comments/'
+        comments_etag = client.get(comments_url)['ETag']
+        review.text = 'Новый текст'
+        review.save()
+        assert client.get(url, HTTP_IF_NONE_MATCH=etag).status_code == 200, (
+            'Проверьте, что изменение отзыва меняет ETag списка отзывов'
+        )
+        assert client.get(
+            comments_url, HTTP_IF_NONE_MATCH=comments_etag
+        ).status_code == 200, (
+            'Проверьте, что изменение отзыва меняет ETag его комментариев'
+        )
+
+
+class TestSharedVersions:
+
+    def test_local_cache_is_rejected(self, settings):
+        from api.checks import check_response_cache
+
+        settings.CACHES = {'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        }}
+        settings.PROCESS_LOCAL_CACHES = (
+            'django.core.cache.backends.locmem.LocMemCache',
+        )
+        assert [error.id for error in check_response_cache(None)] == [
+            'api.E001'
+        ], 'Проверьте, что кэш ответов нельзя включить на кэше процесса'
+        settings.API_RESPONSE_CACHE = {**settings.API_RESPONSE_CACHE,
+                                       'ENABLED': False}
+        assert check_response_cache(None) == []
+
+    @pytest.mark.django_db
+    def test_disabled_cache_sends_no_etag(self, client, title, settings):
+        settings.API_RESPONSE_CACHE = {**settings.API_RESPONSE_CACHE,
+                                       'ENABLED': False}
+        response = client.get(f'/api/v1/titles/{title.id}/')
+        assert response.status_code == 200
+        assert 'ETag' not in response
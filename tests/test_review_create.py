@@ -0,0 +1,45 @@
+import pytest
+
+
+@pytest.mark.django_db
+class TestReviewCreate:
+
+    def test_create_review_round_trips(self, user_client, title,
+                                       django_assert_max_num_queries):
+        url = f'/api/v1/titles/{title.id}/reviews/'
+        with django_assert_max_num_queries(6) as context:
+            response = user_client.post(
+                url, data={'text': 'Отзыв', 'score': 9}, format='json'
+            )
+        assert response.status_code == 201
+        assert response.json()['title'] == title.name
+        title_lookups = [
+            query for query in context.captured_queries
+            if query['sql'].startswith('SELECT')
+            and 'reviews_title' in query['sql']
+        ]
+        assert len(title_lookups) == 1, (
+            'Проверьте, что произведение загружается один раз'
+        )
+
+    def test_second_review_is_rejected(self, user_client, title):
+        from reviews.models import Review
+
+        url = f'/api/v1/titles/{title.id}/reviews/'
+        user_client.post(url, data={'text': 'Отзыв', 'score': 9})
+        response = user_client.post(url, data={'text': 'Ещё', 'score': 1})
+        assert response.status_code == 400
+        assert response.json() == {
+            'non_field_errors': ['Отзыв уже существует!']
+        }
+        title.refresh_from_db()
+        assert Review.objects.count() == 1
+        assert (title.rating_sum, title.rating_count) == (9, 1), (
+            'Проверьте, что отклонённый отзыв не меняет рейтинг'
+        )
+
+    def test_review_for_missing_title(self, user_client):
+        response = user_client.post(
+            '/api/v1/titles/999/reviews/', data={'text': 'Отзыв', 'score': 9}
+        )
+        assert response.status_code == 404
@@ -0,0 +1,55 @@
+import pytest
+
+
+@pytest.fixture
+def catalog(category):
+    from reviews.models import Title
+
+    return [
+        Title.objects.create(name='Побег из Шоушенка', year=1994,
+                             category=category,
+                             description='Банкир попадает в тюрьму'),
+        Title.objects.create(name='Зелёная миля', year=1999,
+                             category=category,
+                             description='Надзиратель тюрьмы и заключённый'),
+        Title.objects.create(name='Форрест Гамп', year=1994,
+                             category=category,
+                             description='История одного бегуна'),
+    ]
+
+
+def ids(response):
+    return [item['id'] for item in response.json()['results']]
+
+
+@pytest.mark.django_db
+class TestSearch:
+
+    def test_search_by_name(self, client, catalog):
+        response = client.get('/api/v1/titles/?search=Шоушенка')
+        assert response.status_code == 200
+        assert ids(response) == [catalog[0].id], (
+            'Проверьте, что ?search= находит произведение по названию'
+        )
+
+    def test_search_by_description(self, client, catalog):
+        response = client.get('/api/v1/titles/?search=Надзиратель')
+        assert ids(response) == [catalog[1].id], (
+            'Проверьте, что ?search= находит произведение по описанию'
+        )
+
+    def test_blank_search_returns_everything(self, client, catalog):
+        response = client.get('/api/v1/titles/?search=%20')
+        assert response.json()['count'] == len(catalog), (
+            'Проверьте, что пустой ?search= не фильтрует список'
+        )
+
+    def test_search_ignores_cursor_mode(self, client, catalog):
+        response = client.get('/api/v1/titles/?search=Шоушенка'
+                              '&pagination=cursor')
+        data = response.json()
+        assert data['count'] == 1, (
+            'Проверьте, что с ?search= страницы выбираются по номерам, '
+            'а не курсором по названию'
+        )
+        assert ids(response) == [catalog[0].id]
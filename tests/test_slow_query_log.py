@@ -0,0 +1,78 @@
+import json
+from io import StringIO
+
+import pytest
+
+
+@pytest.fixture
+def slow_log(settings, tmp_path):
+    path = tmp_path / 'slow.jsonl'
+    settings.SLOW_QUERY_LOG = {**settings.SLOW_QUERY_LOG,
+                               'ENABLED': True, 'THRESHOLD_MS': 0,
+                               'EXPLAIN': False, 'FILE': str(path)}
+    return path
+
+
+class TestNormalize:
+
+    def test_values_do_not_change_fingerprint(self):
+        from api_yamdb.db.slowlog import fingerprint, normalize
+
+        first = normalize('SELECT * FROM "t" WHERE "id" IN (%s, %s) '
+                          "AND name = 'a' LIMIT 21")
+        second = normalize('SELECT * FROM "t" WHERE "id" IN (%s)   '
+                           "AND name = 'b''c' LIMIT 5")
+        assert first == ('SELECT * FROM "t" WHERE "id" IN (...) '
+                         'AND name = ? LIMIT ?')
+        assert fingerprint(first) == fingerprint(second)
+
+
+@pytest.mark.django_db
+class TestSlowQueryLog:
+
+    def test_slow_queries_are_logged_with_view(self, client, title,
+                                               slow_log):
+        from api_yamdb.db.slowlog import explainer
+
+        client.get('/api/v1/titles/')
+        explainer.wait()
+        entries = [json.loads(line)
+                   for line in slow_log.read_text().splitlines()]
+        assert entries, 'Проверьте, что медленные запросы записываются'
+        entry = entries[0]
+        assert entry['view'] == 'TitlesViewSet.list', (
+            'Проверьте, что в журнале указано представление и действие'
+        )
+        assert entry['path'] == '/api/v1/titles/'
+        assert {'normalized', 'fingerprint', 'params_shape'} <= set(entry)
+        assert 'params' not in entry, (
+            'Проверьте, что значения параметров не попадают в журнал'
+        )
+
+    def test_explain(self, title):
+        from api_yamdb.db.slowlog import explain
+
+        plan = explain('default',
+                       'SELECT * FROM reviews_title WHERE id = %s',
+                       [title.id])
+        assert plan
+
+    def test_report(self, client, title, slow_log):
+        from api_yamdb.db.slowlog import explainer
+        from django.core.management import call_command
+
+        client.get('/api/v1/titles/?year=1994')
+        client.get('/api/v1/titles/?year=2000')
+        explainer.wait()
+        entries = [json.loads(line)
+                   for line in slow_log.read_text().splitlines()]
+        output = StringIO()
+        call_command('slow_query_report', file=str(slow_log), json=True,
+                     stdout=output)
+        report = json.loads(output.getvalue())
+        assert sum(group['count'] for group in report) == len(entries)
+        assert any(group['count'] == 2 and 'year' in group['normalized']
+                   for group in report), (
+            'Проверьте, что запросы с разными значениями группируются '
+            'по отпечатку'
+        )
@@ -0,0 +1,73 @@
+import pytest
+
+
+@pytest.fixture
+def review(title, user):
+    from reviews.models import Comment, Review
+
+    review = Review.objects.create(title=title, author=user, text='Отзыв',
+                                   score=7)
+    Comment.objects.create(review=review, author=user, text='Комментарий')
+    return review
+
+
+@pytest.mark.django_db
+class TestSparseFields:
+
+    def test_titles_fields(self, client, title,
+                           django_assert_num_queries):
+        with django_assert_num_queries(2) as context:
+            response = client.get('/api/v1/titles/?fields=id,name,rating')
+        assert response.status_code == 200
+        assert response.json()['results'] == [
+            {'id': title.id, 'name': title.name, 'rating': None}
+        ], 'Проверьте, что ?fields= оставляет только перечисленные поля'
+        sql = ' '.join(query['sql'] for query in context.captured_queries)
+        assert 'reviews_genres' not in sql
+        assert 'reviews_categories' not in sql
+        assert '"description"' not in sql, (
+            'Проверьте, что выборка не загружает убранные поля'
+        )
+
+    def test_titles_omit(self, client, title, django_assert_num_queries):
+        with django_assert_num_queries(1) as context:
+            response = client.get(f'/api/v1/titles/{title.id}/'
+                                  '?omit=genre,description')
+        data = response.json()
+        assert set(data) == {'id', 'name', 'year', 'rating', 'category'}, (
+            'Проверьте, что ?omit= убирает перечисленные поля'
+        )
+        assert data['category']['slug'] == title.category.slug
+        assert not any('reviews_genretitle' in query['sql']
+                       for query in context.captured_queries), (
+            'Проверьте, что без поля genre жанры не загружаются'
+        )
+
+    def test_unknown_field(self, client, title):
+        response = client.get('/api/v1/titles/?fields=id,secret')
+        assert response.status_code == 400
+        assert response.json() == {'fields': ['Неизвестные поля: secret.']}
+
+    def test_reviews_and_comments(self, client, title, review,
+                                  django_assert_max_num_queries):
+        url = f'/api/v1/titles/{title.id}/reviews/'
+        with django_assert_max_num_queries(3) as context:
+            data = client.get(f'{url}?pagination=cursor&fields=id,score'
+                              ).json()
+        assert data['results'] == [{'id': review.id, 'score': 7}]
+        assert not any('users_user' in query['sql']
+                       for query in context.captured_queries), (
+            'Проверьте, что без поля author автор не загружается'
+        )
+        comments = client.get(f'{url}{review.id}/comments/?omit=author,'
+                              'review').json()
+        assert set(comments['results'][0]) == {'id', 'text', 'pub_date'}
+
+    def test_write_ignores_fields(self, admin_client, title):
+        response = admin_client.patch(f'/api/v1/titles/{title.id}/'
+                                      '?fields=id', data={'year': 1999},
+                                      format='json')
+        assert response.status_code == 200
+        assert response.json()['year'] == 1999, (
+            'Проверьте, что ?fields= не влияет на изменение объектов'
+        )
@@ -0,0 +1,107 @@
+import pytest
+
+
+@pytest.fixture
+def rates(settings):
+    def set_rates(**rates):
+        settings.REST_FRAMEWORK = {
+            **settings.REST_FRAMEWORK,
+            'DEFAULT_THROTTLE_RATES': {
+                **settings.REST_FRAMEWORK['DEFAULT_THROTTLE_RATES'], **rates
+            },
+        }
+    return set_rates
+
+
+@pytest.mark.django_db
+class TestThrottling:
+
+    def test_signup_rejection_is_cheap(self, client, rates,
+                                       django_assert_num_queries):
+        rates(signup='2/min')
+        for index in range(2):
+            client.post('/api/v1/auth/signup/', data={
+                'username': f'user{index}', 'email': f'user{index}@yamdb.fake'
+            })
+        with django_assert_num_queries(0):
+            response = client.post('/api/v1/auth/signup/', data={
+                'username': 'user3', 'email': 'user3@yamdb.fake'
+            })
+        assert response.status_code == 429, (
+            'Проверьте, что регистрация ограничена по частоте'
+        )
+        assert int(response['Retry-After']) > 0
+
+    def test_clients_behind_proxy(self, client, rates, settings):
+        rates(signup='1/min')
+        settings.REST_FRAMEWORK = {**settings.REST_FRAMEWORK,
+                                   'NUM_PROXIES': 1}
+
+        def signup(index, forwarded):
+            return client.post('/api/v1/auth/signup/', data={
+                'username': f'user{index}',
+                'email': f'user{index}@yamdb.fake',
+            }, REMOTE_ADDR='172.18.0.5', HTTP_X_FORWARDED_FOR=forwarded)
+
+        assert signup(1, '203.0.113.1').status_code == 200
+        assert signup(2, '203.0.113.2').status_code == 200, (
+            'Проверьте, что клиенты за прокси ограничиваются по адресу '
+            'из X-Forwarded-For, а не по адресу прокси'
+        )
+        assert signup(3, '198.51.100.7, 203.0.113.1').status_code == 429, (
+            'Проверьте, что адрес, подставленный клиентом в начало '
+            'X-Forwarded-For, не даёт новый лимит'
+        )
+
+    def test_token_attempts_limited_per_username(self, client, rates, user):
+        rates(token_username='2/min')
+        data = {'username': user.username, 'confirmation_code': 'wrong'}
+        for address in ('10.0.0.1', '10.0.0.2'):
+            client.post('/api/v1/auth/token/', data=data,
+                        REMOTE_ADDR=address)
+        response = client.post('/api/v1/auth/token/', data=data,
+                               REMOTE_ADDR='10.0.0.3')
+        assert response.status_code == 429, (
+            'Проверьте, что подбор кода ограничен для каждого пользователя'
+        )
+
+    def test_review_reads_are_not_throttled(self, user_client, title, rates):
+        rates(review_create='1/min')
+        url = f'/api/v1/titles/{title.id}/reviews/'
+        for _ in range(3):
+            assert user_client.get(url).status_code == 200
+        user_client.post(url, data={'text': 'Отзыв', 'score': 5})
+        response = user_client.post(url, data={'text': 'Ещё', 'score': 5})
+        assert response.status_code == 429
+
+
+class TestSlidingWindow:
+
+    def test_previous_window_is_weighted(self):
+        from api.throttling import LocMemWindowStore, SlidingWindowThrottle
+
+        store = LocMemWindowStore()
+
+        class Throttle(SlidingWindowThrottle):
+            rate = '2/min'
+
+            def __init__(self):
+                self.num_requests, self.duration = self.parse_rate(self.rate)
+
+            def get_store(self):
+                return store
+
+            def get_cache_key(self, request, view):
+                return 'key'
+
+        throttle = Throttle()
+        throttle.timer = lambda: 60
+        assert throttle.allow_request(None, None)
+        assert throttle.allow_request(None, None)
+        assert not throttle.allow_request(None, None)
+        throttle.timer = lambda: 150
+        assert throttle.allow_request(None, None), (
+            'Проверьте, что вес предыдущего окна уменьшается со временем'
+        )
+        assert not throttle.allow_request(None, None)
+        assert 0 < throttle.wait() <= 30
@@ -0,0 +1,81 @@
+import pytest
+
+
+@pytest.mark.django_db
+class TestTitleStats:
+
+    def create_reviews(self, title, authors, scores):
+        from reviews.models import Review
+
+        return [
+            Review.objects.create(
+                title=title, author=author, text='Отзыв', score=score
+            )
+            for author, score in zip(authors, scores)
+        ]
+
+    def test_stats_follow_reviews_and_comments(self, title, authors):
+        from reviews.models import Comment, Review, TitleStats
+
+        first, second = self.create_reviews(title, authors, (10, 5))
+        Comment.objects.create(review=first, author=authors[2], text='Да')
+        stats = TitleStats.objects.get(pk=title.pk)
+        assert (stats.review_count, stats.comment_count) == (2, 1), (
+            'Проверьте, что статистика учитывает новые отзывы и комментарии'
+        )
+        assert (stats.score_10, stats.score_5) == (1, 1)
+
+        second = Review.objects.get(pk=second.pk)
+        second.score = 10
+        second.save()
+        second.delete()
+        first.comments.all().delete()
+        stats.refresh_from_db()
+        assert stats.histogram[10] == 1 and stats.histogram[5] == 0, (
+            'Проверьте, что изменение и удаление отзыва обновляют гистограмму'
+        )
+        assert (stats.review_count, stats.comment_count) == (1, 0)
+
+    def test_rebuild_title_stats_command(self, title, authors):
+        from django.core.management import call_command
+        from reviews.models import Comment, TitleStats
+
+        reviews = self.create_reviews(title, authors, (2, 4, 9))
+        Comment.objects.create(review=reviews[0], author=authors[1],
+                               text='Комментарий')
+        TitleStats.objects.all().delete()
+        call_command('rebuild_title_stats')
+        stats = TitleStats.objects.get(pk=title.pk)
+        assert (stats.review_count, stats.comment_count,
+                stats.score_sum) == (3, 1, 15), (
+            'Проверьте, что команда rebuild_title_stats пересчитывает '
+            'статистику'
+        )
+
+    def test_stats_endpoint(self, client, title, authors):
+        from django.db import connection
+        from django.test.utils import CaptureQueriesContext
+
+        self.create_reviews(title, authors, (3, 3, 9))
+        with CaptureQueriesContext(connection) as context:
+            response = client.get(f'/api/v1/titles/{title.id}/stats/')
+        assert response.status_code == 200
+        data = response.json()
+        assert data['review_count'] == 3
+        assert data['average'] == 5
+        assert data['histogram']['3'] == 2
+        assert len(context.captured_queries) == 1, (
+            'Проверьте, что статистика читается одним запросом'
+        )
+
+    def test_stats_endpoint_without_reviews(self, client, title):
+        response = client.get(f'/api/v1/titles/{title.id}/stats/')
+        assert response.status_code == 200
+        assert response.json()['review_count'] == 0
+        assert client.get('/api/v1/titles/0/stats/').status_code == 404
+
+    def test_stats_endpoint_non_numeric_id(self, client):
+        assert client.get('/api/v1/titles/abc/stats/').status_code == 404, (
+            'Проверьте, что нечисловой id произведения возвращает 404'
+        )
+        assert client.get('/api/v1/titles/abc/').status_code == 404